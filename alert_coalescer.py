@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Alert Coalescer
+Collects the alerts of a check cycle (or digest window) and sends each
+subscriber a single merged message instead of one message per event
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from message_templates import RenderedMessage, TELEGRAM_MAX_MESSAGE_LENGTH, split_message
+
+ALERT_SEPARATOR = "\n━━━━━━━━━━━━━━━\n"
+
+
+class AlertCoalescer:
+    def __init__(self, bot_manager, digest_interval: int = 0, max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH):
+        self.bot_manager = bot_manager
+        self.digest_interval = digest_interval  # 0 = flush after every cycle
+        self.max_length = max_length
+        self._pending: List[Dict] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.time()
+
+    def add(self, message: str, wallet_name: str = None, event_type: str = None, usd_value: float = None,
+            priority: int = None):
+        """Queue an alert until the next flush"""
+        with self._lock:
+            self._pending.append({
+                "message": message.strip(),
+                "wallet_name": wallet_name,
+                "event_type": event_type,
+                "usd_value": usd_value,
+                "priority": priority
+            })
+
+    def pending_count(self) -> int:
+        """Number of alerts waiting for the next flush"""
+        with self._lock:
+            return len(self._pending)
+
+    def is_due(self) -> bool:
+        """Whether the current window is over and pending alerts should be sent"""
+        if self.digest_interval <= 0:
+            return True
+        return time.time() - self._last_flush >= self.digest_interval
+
+    def flush(self, submit: Callable = None) -> Dict[str, int]:
+        """
+        Send every subscriber one merged message with the alerts routed to it.
+        submit(jobs, priority, label) queues the per-chat jobs; without it they run right away.
+        """
+        with self._lock:
+            events, self._pending = self._pending, []
+            self._last_flush = time.time()
+
+        results = {"events": len(events), "messages": 0, "total": 0}
+        if not events:
+            return results
+
+        # Public channel: one merged post for everyone
+        if self.bot_manager.broadcasts_to_channel:
+            self._send(submit, events, [], results)
+            results["total"] = 1
+            return results
+
+        # Collect the alerts each chat is interested in
+        per_chat: Dict[int, List[int]] = {}
+        for index, event in enumerate(events):
+            recipients = self.bot_manager.get_recipients(
+                event["wallet_name"], event["event_type"], event["usd_value"]
+            )
+            for chat_id in recipients:
+                per_chat.setdefault(chat_id, []).append(index)
+
+        # Chats with the same alerts share the same rendered messages
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for chat_id, indexes in per_chat.items():
+            groups.setdefault(tuple(indexes), []).append(chat_id)
+
+        results["total"] = len(per_chat)
+        for indexes, chat_ids in groups.items():
+            self._send(submit, [events[i] for i in indexes], chat_ids, results)
+
+        return results
+
+    def _send(self, submit: Optional[Callable], events: List[Dict], chat_ids: List[int], results: Dict[str, int]):
+        # A merged message goes out in the lane of its most urgent alert
+        priorities = [e["priority"] for e in events if e["priority"] is not None]
+        priority = min(priorities) if priorities else None
+        for message in self.merge([e["message"] for e in events]):
+            jobs = self.bot_manager.plan_delivery(message, chat_ids)
+            results["messages"] += len(jobs)
+            if submit:
+                submit(jobs, priority, f"{len(events)} merged alert(s)")
+            else:
+                for job in jobs:
+                    job()
+
+    def merge(self, alerts: List[str]) -> List[RenderedMessage]:
+        """Merge alerts into as few messages as fit in Telegram's length limit"""
+        if len(alerts) == 1:
+            return [RenderedMessage(alerts[0], self.max_length)]
+
+        title = "DIGEST" if self.digest_interval > 0 else "WALLET UPDATES"
+        header = (
+            f"📬 <b>{title}</b> ({len(alerts)} alerts)\n"
+            f"🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        )
+
+        messages = []
+        current = header
+        for alert in alerts:
+            for piece in split_message(alert, self.max_length - len(header) - len(ALERT_SEPARATOR)):
+                candidate = current + ALERT_SEPARATOR + piece
+                if len(candidate) > self.max_length:
+                    messages.append(current)
+                    current = piece
+                else:
+                    current = candidate
+        messages.append(current)
+        return [RenderedMessage(text, self.max_length) for text in messages]
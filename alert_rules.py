@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Alert Rules
+Declarative rules deciding which changes raise alerts. A rule scopes one
+or more events (balance, position, transfer, token_balance) to wallets,
+chains, assets, directions, position sides or counterparties, and puts
+thresholds on the change: amount, percent, USD value, leverage, margin
+usage. Rules are compiled once into a table keyed by (event, wallet,
+asset), so each change is only checked against the rules that can apply.
+
+A passing mute rule of any scope silences a change, and a passing
+critical rule of any scope (defaults included) makes it critical.
+Otherwise the most specific scope with alert rules matching the change
+decides - wallet and asset, then wallet, then asset, then neither, then
+the defaults built from the threshold settings - and it alerts if any of
+them passes.
+"""
+
+import json
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Changes the trackers evaluate
+EVENTS = ("balance", "position", "transfer", "token_balance")
+ACTIONS = ("alert", "critical", "mute")
+
+# Values of the direction field per event
+DIRECTIONS = {
+    "balance": ("up", "down"),
+    "position": ("open", "close", "increase", "decrease", "flip"),
+    "transfer": ("in", "out"),
+    "token_balance": ("up", "down"),
+}
+
+# Threshold -> fact field; a change whose field is unknown (e.g. unpriced) fails it
+LOWER_BOUNDS = {"min_amount": "amount", "min_pct": "pct", "min_usd": "usd",
+                "min_leverage": "leverage", "min_margin_usage": "margin_usage"}
+UPPER_BOUNDS = {"max_amount": "amount", "max_usd": "usd"}
+
+EVENT_LABELS = {"balance": "Balance", "position": "Position", "transfer": "Transfers", "token_balance": "Token balance"}
+
+# Scope fields matched as sets (event, wallet and asset are the table key)
+SCOPE_FIELDS = ("chain", "direction", "side")
+
+RULE_FIELDS = {"event", "wallet", "asset", "counterparty", "action", "unpriced", "name",
+               *SCOPE_FIELDS, *LOWER_BOUNDS, *UPPER_BOUNDS}
+
+
+def _as_list(value) -> List:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+class Rule:
+    """A compiled rule: scope sets and one threshold predicate"""
+    __slots__ = ("index", "name", "action", "scope", "check")
+
+    def __init__(self, index: int, name: str, action: str, scope: Dict[str, frozenset], check: Callable[[Dict], bool]):
+        self.index = index
+        self.name = name
+        self.action = action
+        self.scope = scope
+        self.check = check
+
+    def in_scope(self, fact: Dict) -> bool:
+        for field, values in self.scope.items():
+            if fact.get(field) not in values:
+                return False
+        return True
+
+
+def _compile_check(rule: Dict) -> Callable[[Dict], bool]:
+    checks = []
+    for key, field in LOWER_BOUNDS.items():
+        if key in rule:
+            bound = float(rule[key])
+            checks.append(lambda fact, field=field, bound=bound: fact.get(field) is not None and fact[field] >= bound)
+    for key, field in UPPER_BOUNDS.items():
+        if key in rule:
+            bound = float(rule[key])
+            checks.append(lambda fact, field=field, bound=bound: fact.get(field) is not None and fact[field] <= bound)
+    if "unpriced" in rule:
+        unpriced = bool(rule["unpriced"])
+        checks.append(lambda fact: (fact.get("usd") is None) == unpriced)
+    if not checks:
+        return lambda fact: True
+    if len(checks) == 1:
+        return checks[0]
+    return lambda fact: all(check(fact) for check in checks)
+
+
+def compile_rule(index: int, rule: Dict) -> Tuple[Rule, List[str], List[Optional[str]], List[Optional[str]], List[Optional[str]]]:
+    """Compile a rule dict; returns it with its events, wallets, assets and counterparties (None = any)"""
+    if not isinstance(rule, dict):
+        raise ValueError(f"rule {index}: must be an object")
+    unknown = set(rule) - RULE_FIELDS
+    if unknown:
+        raise ValueError(f"rule {index}: unknown field(s) {', '.join(sorted(unknown))}")
+    if "event" not in rule:
+        raise ValueError(f"rule {index}: event is required ({', '.join(EVENTS)})")
+    events = [str(event).lower() for event in _as_list(rule["event"])]
+    for event in events:
+        if event not in EVENTS:
+            raise ValueError(f"rule {index}: unknown event '{event}' ({', '.join(EVENTS)})")
+    action = str(rule.get("action", "alert")).lower()
+    if action not in ACTIONS:
+        raise ValueError(f"rule {index}: action must be one of {', '.join(ACTIONS)}")
+
+    scope = {}
+    for field in SCOPE_FIELDS:
+        if field in rule:
+            scope[field] = frozenset(str(value).lower() for value in _as_list(rule[field]))
+    for direction in scope.get("direction", ()):
+        if not any(direction in DIRECTIONS[event] for event in events):
+            raise ValueError(f"rule {index}: direction '{direction}' doesn't apply to {', '.join(events)}")
+    try:
+        check = _compile_check(rule)
+    except (TypeError, ValueError):
+        raise ValueError(f"rule {index}: thresholds must be numbers")
+
+    wallets = [str(wallet) for wallet in _as_list(rule["wallet"])] if "wallet" in rule else [None]
+    assets = [str(asset).upper() for asset in _as_list(rule["asset"])] if "asset" in rule else [None]
+    counterparties = [str(address).lower() for address in _as_list(rule["counterparty"])] if "counterparty" in rule else [None]
+    compiled = Rule(index, str(rule.get("name", f"rule {index}")), action, scope, check)
+    return compiled, events, wallets, assets, counterparties
+
+
+def describe_rule(rule: Dict) -> str:
+    """Short text of a rule's scope and thresholds, e.g. 'open/close' or 'unpriced: ≥5%'"""
+    parts = []
+    if "wallet" in rule:
+        parts.append(", ".join(str(wallet) for wallet in _as_list(rule["wallet"])))
+    if "direction" in rule:
+        parts.append("/".join(str(direction) for direction in _as_list(rule["direction"])))
+    unit = "/".join(str(asset).upper() for asset in _as_list(rule["asset"])) if "asset" in rule else ""
+    if "min_amount" in rule:
+        parts.append(f"≥{float(rule['min_amount']):g} {unit or 'native'}")
+    if "max_amount" in rule:
+        parts.append(f"≤{float(rule['max_amount']):g} {unit or 'native'}")
+    if "min_usd" in rule:
+        parts.append(f"≥${float(rule['min_usd']):,.0f}")
+    if "max_usd" in rule:
+        parts.append(f"≤${float(rule['max_usd']):,.0f}")
+    if "min_pct" in rule:
+        parts.append(f"≥{float(rule['min_pct']):g}%")
+    if "min_leverage" in rule:
+        parts.append(f"leverage ≥{float(rule['min_leverage']):g}x")
+    if "min_margin_usage" in rule:
+        parts.append(f"margin usage ≥{float(rule['min_margin_usage']):.0%}")
+    text = " ".join(parts) or "any amount"
+    return f"unpriced: {text}" if rule.get("unpriced") else text
+
+
+class _Bucket:
+    """Rules of one table key; counterparty rules are looked up by address"""
+    __slots__ = ("general", "by_counterparty")
+
+    def __init__(self):
+        self.general: List[Rule] = []
+        self.by_counterparty: Dict[str, List[Rule]] = {}
+
+    def add(self, rule: Rule, counterparty: Optional[str]):
+        if counterparty is None:
+            self.general.append(rule)
+        else:
+            self.by_counterparty.setdefault(counterparty, []).append(rule)
+
+    def candidates(self, fact: Dict) -> List[Rule]:
+        if not self.by_counterparty:
+            return self.general
+        return self.general + self.by_counterparty.get(fact.get("counterparty"), [])
+
+
+class AlertRules:
+    def __init__(self, rules: Iterable[Dict] = (), defaults: Iterable[Dict] = ()):
+        self.load(rules, defaults)
+
+    def describe(self) -> List[str]:
+        """Default thresholds per event and the number of configured rules, for /info"""
+        lines = []
+        for event, label in EVENT_LABELS.items():
+            rules = [describe_rule(rule) for rule in self.default_rules
+                     if event in _as_list(rule["event"]) and rule.get("action", "alert") == "alert"]
+            if rules:
+                lines.append(f"{label}: {' or '.join(rules)}")
+        for rule in self.default_rules:
+            if rule.get("action") == "critical":
+                events = ", ".join(EVENT_LABELS[event].lower() for event in _as_list(rule["event"]))
+                lines.append(f"Critical {events}: {describe_rule(rule)}")
+        if self.count:
+            lines.append(f"{self.count} custom rule(s) (ALERT_RULES) take precedence")
+        return lines
+
+    def load(self, rules: Iterable[Dict] = (), defaults: Iterable[Dict] = ()):
+        """Compile configured rules and the default ones (ValueError for invalid rules)"""
+        # action -> (event, wallet, asset) -> rules; None stands for any wallet/asset
+        tables: Dict[str, Dict[Tuple[str, Optional[str], Optional[str]], _Bucket]] = {action: {} for action in ACTIONS}
+        default_alerts: Dict[str, _Bucket] = {}
+        rules, defaults = list(rules), list(defaults)
+        for index, rule in enumerate(rules):
+            compiled, events, wallets, assets, counterparties = compile_rule(index, rule)
+            table = tables[compiled.action]
+            for key in ((e, w, a) for e in events for w in wallets for a in assets):
+                for counterparty in counterparties:
+                    table.setdefault(key, _Bucket()).add(compiled, counterparty)
+        for offset, rule in enumerate(defaults):
+            compiled, events, wallets, assets, counterparties = compile_rule(len(rules) + offset, rule)
+            compiled.name = rule.get("name", "default")
+            # Defaults are one scope level; their wallet/asset become plain scope sets
+            if wallets != [None]:
+                compiled.scope["wallet"] = frozenset(wallets)
+            if assets != [None]:
+                compiled.scope["asset"] = frozenset(assets)
+            for event in events:
+                for counterparty in counterparties:
+                    if compiled.action == "alert":
+                        default_alerts.setdefault(event, _Bucket()).add(compiled, counterparty)
+                    else:
+                        tables[compiled.action].setdefault((event, None, None), _Bucket()).add(compiled, counterparty)
+        # Swapped in whole so a reload never exposes a half-built table
+        self._alerts, self._critical, self._mutes = tables["alert"], tables["critical"], tables["mute"]
+        self._defaults = default_alerts
+        self.default_rules = defaults
+        self.count = len(rules)
+
+    @staticmethod
+    def _passes(table: Dict, keys: Tuple, fact: Dict) -> bool:
+        for key in keys:
+            bucket = table.get(key)
+            if bucket is not None:
+                for rule in bucket.candidates(fact):
+                    if rule.in_scope(fact) and rule.check(fact):
+                        return True
+        return False
+
+    def evaluate(self, fact: Dict) -> Optional[str]:
+        """
+        Decide on a change: None (no alert), "alert" or "critical". A fact has
+        event, wallet, chain, asset, direction, side and counterparty, and the
+        change's amount, pct, usd, leverage and margin_usage (None if unknown)
+        """
+        event, wallet, asset = fact["event"], fact.get("wallet"), fact.get("asset")
+        keys = ((event, wallet, asset), (event, wallet, None), (event, None, asset), (event, None, None))
+        if self._mutes and self._passes(self._mutes, keys, fact):
+            return None
+        if self._passes(self._critical, keys, fact):
+            return "critical"
+        for key in keys:
+            bucket = self._alerts.get(key)
+            if bucket is not None:
+                scoped = [rule for rule in bucket.candidates(fact) if rule.in_scope(fact)]
+                if scoped:
+                    return "alert" if any(rule.check(fact) for rule in scoped) else None
+        bucket = self._defaults.get(event)
+        if bucket is not None:
+            for rule in bucket.candidates(fact):
+                if rule.in_scope(fact) and rule.check(fact):
+                    return "alert"
+        return None
+
+
+def strongest(decisions: Iterable[Optional[str]]) -> Optional[str]:
+    """Most severe of several decisions ("critical" > "alert" > None)"""
+    result = None
+    for decision in decisions:
+        if decision == "critical":
+            return decision
+        result = result or decision
+    return result
+
+
+def load_rules(rules: List[Dict] = None, rules_file: str = "") -> List[Dict]:
+    """ALERT_RULES followed by the rules in ALERT_RULES_FILE (a JSON list)"""
+    result = list(rules or [])
+    if rules_file:
+        if not os.path.exists(rules_file):
+            raise ValueError(f"ALERT_RULES_FILE {rules_file} not found")
+        with open(rules_file) as f:
+            try:
+                from_file = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"ALERT_RULES_FILE {rules_file} is not valid JSON: {e}")
+        if not isinstance(from_file, list):
+            raise ValueError(f"ALERT_RULES_FILE {rules_file} must hold a JSON list of rules")
+        result.extend(from_file)
+    return result
+
+
+def default_rules(config: Dict) -> List[Dict]:
+    """
+    Rules equivalent to the threshold settings. USD thresholds (0 = off) fall
+    back to the amount/percent ones for changes no price is known for
+    """
+    rules = []
+
+    def usd_or(event: str, usd: float, fallback: Dict):
+        if usd:
+            rules.append({"event": event, "min_usd": usd})
+            rules.append({"event": event, "unpriced": True, **fallback})
+        else:
+            rules.append({"event": event, **fallback})
+
+    usd_or("balance", config.get("balance_change_usd", 0),
+           {"min_amount": config.get("balance_change_threshold", 0.1)})
+    rules.append({"event": "position", "direction": ["open", "close", "flip"]})
+    usd_or("position", config.get("position_change_threshold", 1000),
+           {"min_pct": config.get("position_change_pct", 5)})
+    usd_or("transfer", config.get("transfer_min_usd", 0), {})
+    usd_or("token_balance", config.get("token_balance_change_usd", 100),
+           {"min_pct": config.get("token_balance_change_pct", 5)})
+    rules.append({"event": "position", "min_margin_usage": config.get("critical_margin_usage", 0.8), "action": "critical"})
+    rules.append({"event": "transfer", "asset": "ETH", "direction": "out",
+                  "min_amount": config.get("large_withdrawal_eth", 100), "action": "critical"})
+    return rules
+
+
+RULES = AlertRules(defaults=default_rules({}))
+
+
+def configure_rules(config: Dict) -> AlertRules:
+    """Compile ALERT_RULES/ALERT_RULES_FILE over defaults from the threshold settings"""
+    RULES.load(load_rules(config.get("alert_rules"), config.get("alert_rules_file", "")), default_rules(config))
+    return RULES
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold Start Benchmark
+Measures how long a fresh interpreter takes to import main.py and to run a
+complete `main.py --check` against the fake upstream, and verifies that the
+one-shot check never starts the Telegram bot
+
+Usage: python benchmarks/cold_start.py [--runs 5] [--wallets 1] [--target-import 0.5] [--target-check 1.5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_upstream import FakeUpstream
+
+# Cold-start targets on a developer laptop / small container (seconds)
+DEFAULT_IMPORT_TARGET = 0.5
+DEFAULT_CHECK_TARGET = 1.5
+
+
+def timed_run(command: list, env: dict) -> float:
+    started = time.perf_counter()
+    process = subprocess.run(command, cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{process.stdout[-1000:]}\n{process.stderr[-1000:]}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--wallets", type=int, default=1)
+    parser.add_argument("--target-import", type=float, default=DEFAULT_IMPORT_TARGET)
+    parser.add_argument("--target-check", type=float, default=DEFAULT_CHECK_TARGET)
+    args = parser.parse_args()
+
+    api = FakeUpstream().start()
+    env = dict(os.environ)
+    env.update({
+        "WALLETS": json.dumps({f"Wallet {i}": "0x" + f"{i:040x}" for i in range(1, args.wallets + 1)}),
+        "ETHERSCAN_API_KEY": "BENCHKEY",
+        "ETHERSCAN_API_URL": api.etherscan_url,
+        "HYPERLIQUID_API_URL": api.hyperliquid_url,
+        "TELEGRAM_BOT_TOKEN": "123456:BENCH",
+        "TELEGRAM_API_URL": api.url,
+    })
+
+    try:
+        imports = [timed_run([sys.executable, "-c", "import main"], env) for _ in range(args.runs)]
+        api.reset_stats()
+        checks = [timed_run([sys.executable, "main.py", "--check"], env) for _ in range(args.runs)]
+        telegram_calls = api.upstream_calls()["telegram"] + api.calls.get("getUpdates", 0)
+    finally:
+        api.stop()
+
+    import_time = statistics.median(imports)
+    check_time = statistics.median(checks)
+    print(f"import main        median {import_time:.3f}s  (min {min(imports):.3f}s, target {args.target_import:.2f}s)")
+    print(f"main.py --check    median {check_time:.3f}s  (min {min(checks):.3f}s, target {args.target_check:.2f}s, "
+          f"{args.wallets} wallet(s))")
+    print(f"Telegram requests during --check: {telegram_calls}")
+
+    failures = []
+    if import_time > args.target_import:
+        failures.append("import time above target")
+    if check_time > args.target_check:
+        failures.append("--check time above target")
+    if telegram_calls:
+        failures.append("--check talked to Telegram")
+    if failures:
+        print(f"❌ {', '.join(failures)}")
+        sys.exit(1)
+    print("✅ Cold start within targets")
+
+
+if __name__ == "__main__":
+    main()
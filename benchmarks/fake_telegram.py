@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Fake Telegram Bot API
+Local stand-in for api.telegram.org used by the benchmarks
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qsl
+
+
+class FakeTelegramAPI:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._next_message_id = 1
+        self.reset_stats()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats: Dict[str, int] = {"requests": 0, "bytes_in": 0, "bytes_out": 0}
+            self.calls: Dict[str, int] = {}
+
+    def start(self) -> "FakeTelegramAPI":
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _simulate(self, call: str, request_bytes: int) -> bool:
+        """Apply latency and count the request; False if it should fail"""
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += request_bytes
+            self.calls[call] = self.calls.get(call, 0) + 1
+        return not (self.error_rate and random.random() < self.error_rate)
+
+    def route(self, path: str, query: Dict, payload: Dict, request_bytes: int):
+        """Return (status, response body) for a request"""
+        return self.handle(path.rstrip("/").split("/")[-1], payload, request_bytes)
+
+    def handle(self, method: str, payload: Dict, request_bytes: int):
+        """Return (status, response body) for a Bot API call"""
+        if not self._simulate(method, request_bytes):
+            return 429, {"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1"}
+
+        with self._lock:
+            if method == "getUpdates":
+                return 200, {"ok": True, "result": []}
+            if method in ("sendMessage", "copyMessage", "forwardMessage"):
+                message_id = self._next_message_id
+                self._next_message_id += 1
+                return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": payload.get("chat_id")}}}
+            if method == "sendPhoto":
+                # Uploads are multipart (no JSON payload); a resend names the earlier file_id
+                message_id = self._next_message_id
+                self._next_message_id += 1
+                file_id = payload.get("photo") or f"photo-{message_id}"
+                return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": payload.get("chat_id")},
+                                                    "photo": [{"file_id": f"{file_id}-thumb"}, {"file_id": file_id}]}}
+            if method in ("copyMessages", "forwardMessages"):
+                ids = []
+                for _ in payload.get("message_ids", []):
+                    ids.append({"message_id": self._next_message_id})
+                    self._next_message_id += 1
+                return 200, {"ok": True, "result": ids}
+            if method == "getChatMember":
+                return 200, {"ok": True, "result": {"status": "administrator"}}
+            return 200, {"ok": True, "result": True}
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; avoid Nagle delays
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    payload = json.loads(body) if body else {}
+                except ValueError:
+                    payload = {}
+                path, _, query = self.path.partition("?")
+                request_bytes = len(self.requestline) + len(str(self.headers)) + len(body)
+
+                status, response = api.route(path, dict(parse_qsl(query)), payload, request_bytes)
+                data = json.dumps(response).encode()
+                with api._lock:
+                    api.stats["bytes_out"] += len(data)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (ConnectionResetError, BrokenPipeError):
+                    # Client stopped reading early (e.g. a streamed response)
+                    pass
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
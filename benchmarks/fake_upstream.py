@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Fake Upstream APIs
+Local stand-in for Etherscan (/api), Hyperliquid (/info) and the Telegram
+Bot API (/bot<token>/<method>) that replays recorded fixtures.
+
+Each call to advance() starts a new "cycle": a deterministic share of the
+wallets (change_rate) then reports a new balance, larger positions and a
+fresh transfer, so a benchmark cycle raises alerts like a busy market would.
+Changed wallets also get one fill and one funding payment per cycle
+(userFillsByTime/userFunding honour startTime).
+
+history pads txlist/tokentx to that many rows (a whale's multi-megabyte
+response); page/offset are honoured like Etherscan unless paginate is off.
+"""
+
+import copy
+import json
+import os
+import time
+import zlib
+from typing import Dict
+
+from fake_telegram import FakeTelegramAPI
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ADDRESS_PLACEHOLDER = "{address}"
+
+
+def load_fixtures(directory: str = FIXTURES_DIR) -> Dict[str, Dict]:
+    """Fixture name (e.g. etherscan_balance) -> recorded response"""
+    fixtures = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename)) as f:
+                fixtures[filename[:-5]] = json.load(f)
+    return fixtures
+
+
+class FakeUpstream(FakeTelegramAPI):
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 change_rate: float = 0.0, fixtures_dir: str = FIXTURES_DIR, port: int = 0,
+                 history: int = 0, paginate: bool = True):
+        super().__init__(latency=latency, jitter=jitter, error_rate=error_rate, port=port)
+        self.fixtures = load_fixtures(fixtures_dir)
+        self.change_rate = change_rate
+        self.paginate = paginate
+        self.cycle = 0
+        # Synthetic fills and funding are timestamped from here, one minute per cycle
+        self.started_ms = int(time.time() * 1000)
+        if history:
+            for name in ("etherscan_txlist", "etherscan_tokentx"):
+                rows = self.fixtures[name]["result"]
+                self.fixtures[name]["result"] = [rows[i % len(rows)] for i in range(history)]
+
+    @property
+    def etherscan_url(self) -> str:
+        return f"{self.url}/api"
+
+    @property
+    def hyperliquid_url(self) -> str:
+        return f"{self.url}/info"
+
+    @property
+    def rpc_url(self) -> str:
+        return f"{self.url}/rpc"
+
+    def advance(self):
+        """Start the next cycle; changed wallets report new data from now on"""
+        with self._lock:
+            self.cycle += 1
+
+    def is_changed(self, address: str) -> bool:
+        """Whether this wallet changes in the current cycle (stable per address)"""
+        if self.cycle == 0 or not self.change_rate:
+            return False
+        return zlib.crc32(address.lower().encode()) % 10000 < self.change_rate * 10000
+
+    def route(self, path: str, query: Dict, payload: Dict, request_bytes: int):
+        # Control endpoints for benchmark processes; not counted as traffic
+        if path == "/_control/advance":
+            self.advance()
+            return 200, {"cycle": self.cycle}
+        if path == "/_control/reset":
+            self.reset_stats()
+            return 200, {"ok": True}
+        if path == "/_control/stats":
+            return 200, {"stats": self.stats, "calls": self.calls, "upstream": self.upstream_calls()}
+        if path.rstrip("/").endswith("/api"):
+            return self._etherscan(query, request_bytes)
+        if path.rstrip("/").endswith("/info"):
+            return self._hyperliquid(payload, request_bytes)
+        if path.rstrip("/").endswith("/rpc"):
+            return self._rpc(payload, request_bytes)
+        return super().route(path, query, payload, request_bytes)
+
+    def _etherscan(self, query: Dict, request_bytes: int):
+        action = query.get("action", "")
+        if not self._simulate(f"etherscan.{action}", request_bytes):
+            return 200, {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+
+        fixture = self.fixtures.get(f"etherscan_{action}")
+        if fixture is None:
+            return 200, {"status": "0", "message": "NOTOK", "result": f"Unknown action {action}"}
+
+        address = query.get("address", "").lower()
+        changed = self.is_changed(address)
+        if isinstance(fixture.get("result"), list) and self.paginate and query.get("offset"):
+            page, offset = int(query.get("page", 1)), int(query["offset"])
+            fixture = dict(fixture, result=fixture["result"][(page - 1) * offset:page * offset])
+        response = copy.deepcopy(fixture)
+
+        if action == "balance":
+            if changed:
+                # One more ETH every cycle
+                response["result"] = str(int(response["result"]) + self.cycle * 10**18)
+        elif isinstance(response.get("result"), list):
+            for tx in response["result"]:
+                for field in ("from", "to"):
+                    if tx.get(field) == ADDRESS_PLACEHOLDER:
+                        tx[field] = address
+            if changed and response["result"]:
+                # Newest transfer happened just now
+                response["result"][0]["timeStamp"] = str(int(time.time()))
+        return 200, response
+
+    def _hyperliquid(self, payload: Dict, request_bytes: int):
+        request_type = payload.get("type", "")
+        if not self._simulate(f"hyperliquid.{request_type}", request_bytes):
+            return 429, {"error": "rate limited"}
+
+        if request_type in ("userFillsByTime", "userFunding"):
+            return 200, self._fills(request_type, payload.get("user", ""), int(payload.get("startTime", 0)))
+
+        fixture = self.fixtures.get(f"hyperliquid_{request_type}")
+        if fixture is None:
+            return 422, {"error": f"Unknown request type {request_type}"}
+
+        response = copy.deepcopy(fixture)
+        if request_type == "clearinghouseState" and self.is_changed(payload.get("user", "")):
+            # Grow every position by 10% per cycle
+            factor = 1.1 ** self.cycle
+            for asset in response.get("assetPositions", []):
+                position = asset.get("position") or {}
+                for field in ("szi", "positionValue"):
+                    if field in position:
+                        position[field] = f"{float(position[field]) * factor:.4f}"
+        return 200, response
+
+    def _fills(self, request_type: str, user: str, start_ms: int):
+        """One ETH fill (alternately opening and closing) or funding payment per cycle of a changed wallet"""
+        if not self.is_changed(user):
+            return []
+        base_tid = zlib.crc32(user.lower().encode()) * 1000
+        rows = []
+        for cycle in range(1, self.cycle + 1):
+            at = self.started_ms + cycle * 60000
+            if at < start_ms:
+                continue
+            if request_type == "userFunding":
+                rows.append({"time": at, "hash": "0x" + "0" * 64, "delta": {
+                    "type": "funding", "coin": "ETH", "usdc": "-1.25", "szi": "10.0", "fundingRate": "0.0000125"}})
+                continue
+            closing = cycle % 2 == 0
+            rows.append({
+                "coin": "ETH", "px": "3500.0", "sz": "1.0", "side": "A" if closing else "B", "time": at,
+                "startPosition": "10.0", "dir": "Close Long" if closing else "Open Long",
+                "closedPnl": "120.5" if closing else "0.0", "hash": "0x" + "0" * 64, "oid": base_tid + cycle,
+                "crossed": True, "fee": "1.575", "tid": base_tid + cycle, "feeToken": "USDC"
+            })
+        return rows
+
+    def _rpc(self, payload, request_bytes: int):
+        """JSON-RPC batches of ERC-20 balanceOf eth_calls"""
+        if not self._simulate("rpc.batch", request_bytes):
+            return 429, {"error": "rate limited"}
+        replies = []
+        for call in payload if isinstance(payload, list) else [payload]:
+            params = call.get("params") or [{}]
+            data = params[0].get("data", "")
+            if call.get("method") != "eth_call" or not data.startswith("0x70a08231"):
+                replies.append({"jsonrpc": "2.0", "id": call.get("id"), "error": {"code": -32601, "message": "unsupported"}})
+                continue
+            wallet, contract = "0x" + data[-40:], params[0].get("to", "").lower()
+            # Stable balance per (wallet, token), 100 units more per cycle for changed wallets
+            balance = (zlib.crc32(f"{wallet}{contract}".encode()) % 1000 + 1) * 10**6
+            if self.is_changed(wallet):
+                balance += self.cycle * 100 * 10**6
+            replies.append({"jsonrpc": "2.0", "id": call.get("id"), "result": "0x" + format(balance, "064x")})
+        return 200, replies
+
+    def upstream_calls(self) -> Dict[str, int]:
+        """Requests per upstream (etherscan, hyperliquid, telegram) since the last reset"""
+        totals = {"etherscan": 0, "hyperliquid": 0, "telegram": 0}
+        with self._lock:
+            for call, count in self.calls.items():
+                upstream = call.split(".")[0] if "." in call else "telegram"
+                if call == "getUpdates":
+                    continue  # Background polling, not part of a cycle
+                totals[upstream] = totals.get(upstream, 0) + count
+        return totals
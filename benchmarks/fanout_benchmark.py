@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Fan-out Benchmark
+Compares per-chat sendMessage with staged copyMessage fan-out against a
+local fake Telegram API: bytes sent, requests and total fan-out time
+
+Usage: python benchmarks/fanout_benchmark.py [--subscribers 10 1000] [--latency 0.005]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_telegram import FakeTelegramAPI
+from telegram_bot import TelegramBotManager
+from message_templates import MessageTemplates
+
+STAGING_CHAT_ID = -1000000000001
+
+
+def sample_alert() -> str:
+    """A position alert of realistic size"""
+    templates = MessageTemplates({"Whale": "0x" + "ab" * 20})
+    positions = {
+        "marginSummary": {"accountValue": "2500000", "totalNtlPos": "9000000", "withdrawable": "400000"},
+        "assetPositions": [
+            {"position": {
+                "coin": coin, "szi": "125.5", "entryPx": "3150.2", "positionValue": "400000",
+                "unrealizedPnl": "12000", "leverage": {"value": 10}, "liquidationPx": "2800.1", "marginUsed": "40000"
+            }}
+            for coin in ("BTC", "ETH", "SOL", "HYPE", "DOGE")
+        ]
+    }
+    return templates.render_position_change(positions, "position_changed", "Whale").text
+
+
+def run(api: FakeTelegramAPI, mode: str, subscribers: int, text: str) -> dict:
+    bot = TelegramBotManager(
+        "123:BENCH",
+        api_url=api.url,
+        fanout_mode=mode,
+        staging_chat_id=STAGING_CHAT_ID
+    )
+    bot.subscribers = set(range(1, subscribers + 1))
+
+    api.reset_stats()
+    started = time.perf_counter()
+    results = bot.deliver(text, bot.get_recipients())
+    elapsed = time.perf_counter() - started
+
+    return {
+        "mode": mode,
+        "subscribers": subscribers,
+        "delivered": results["success"],
+        "requests": api.stats["requests"],
+        "bytes_sent": api.stats["bytes_in"],
+        "seconds": elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Telegram fan-out benchmark")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[10, 1000])
+    parser.add_argument("--latency", type=float, default=0.005, help="Fake API latency per request (seconds)")
+    args = parser.parse_args()
+
+    os.environ["SUBSCRIBERS_FILE"] = os.path.join(tempfile.mkdtemp(), "subscribers.json")
+    api = FakeTelegramAPI(latency=args.latency).start()
+    text = sample_alert()
+
+    print(f"Alert size: {len(text)} characters, fake API latency: {args.latency * 1000:.1f} ms\n")
+    print(f"{'mode':<8} {'subs':>7} {'ok':>7} {'requests':>9} {'bytes sent':>12} {'bytes/sub':>10} {'seconds':>9}")
+    try:
+        for subscribers in args.subscribers:
+            for mode in ("direct", "copy"):
+                r = run(api, mode, subscribers, text)
+                print(
+                    f"{r['mode']:<8} {r['subscribers']:>7} {r['delivered']:>7} {r['requests']:>9} "
+                    f"{r['bytes_sent']:>12,} {r['bytes_sent'] // max(subscribers, 1):>10,} {r['seconds']:>9.3f}"
+                )
+    finally:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+JSON Parsing Benchmark
+Latency and peak memory of fetching the 10 newest rows of a large Etherscan
+txlist from the fake upstream, comparing:
+- full:   response.json() of the whole body, then slicing (the old path)
+- orjson: orjson.loads of the whole body (if installed)
+- stream: json_stream.load_object stopping after the rows (server ignores page size)
+- paged:  page/offset request plus streaming (what WalletTracker does)
+
+Usage: python benchmarks/json_benchmark.py [--rows 1000 10000 50000] [--limit 10] [--runs 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+
+from fake_upstream import FakeUpstream
+from json_stream import load_object, orjson
+
+ADDRESS = "0x" + "ab" * 20
+
+
+def serve(history: int, paginate: bool, urls, stop):
+    """Fake upstream in its own process, so its work isn't measured"""
+    api = FakeUpstream(history=history, paginate=paginate).start()
+    urls.put(api.etherscan_url)
+    stop.wait()
+    api.stop()
+
+
+def fetch(url: str, method: str, limit: int) -> list:
+    params = {"module": "account", "action": "txlist", "address": ADDRESS, "sort": "desc", "apikey": "BENCHKEY"}
+    if method == "full":
+        return requests.get(url, params=params).json()["result"][:limit]
+    if method == "orjson":
+        return orjson.loads(requests.get(url, params=params).content)["result"][:limit]
+    if method == "paged":
+        params.update({"page": 1, "offset": limit})
+    with requests.get(url, params=params, stream=True) as response:
+        return load_object(response.iter_content(chunk_size=65536), "result", limit)["result"]
+
+
+def measure(url: str, method: str, limit: int, runs: int) -> dict:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        rows = fetch(url, method, limit)
+        times.append(time.perf_counter() - started)
+    assert len(rows) == limit, f"{method} returned {len(rows)} rows"
+
+    tracemalloc.start()
+    fetch(url, method, limit)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": statistics.median(times) * 1000, "peak_mb": peak / 1024 / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Etherscan JSON parsing benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    methods = ["full", "orjson", "stream", "paged"] if orjson else ["full", "stream", "paged"]
+    print(f"{'rows':>7} {'body MB':>8} " + " ".join(f"{m + ' ms':>10} {m + ' MB':>10}" for m in methods))
+    for rows in args.rows:
+        urls, stop = multiprocessing.Queue(), multiprocessing.Event()
+        servers = [multiprocessing.Process(target=serve, args=(rows, paginate, urls, stop), daemon=True)
+                   for paginate in (False, True)]
+        try:
+            servers[0].start()
+            full_url = urls.get(timeout=30)
+            servers[1].start()
+            paged_url = urls.get(timeout=30)
+
+            body = len(requests.get(full_url, params={"action": "txlist", "address": ADDRESS}).content)
+            results = {
+                method: measure(paged_url if method == "paged" else full_url, method, args.limit, args.runs)
+                for method in methods
+            }
+        finally:
+            stop.set()
+            for server in servers:
+                server.join(timeout=10)
+        print(f"{rows:>7} {body / 1024 / 1024:>8.2f} " + " ".join(
+            f"{results[m]['ms']:>10.1f} {results[m]['peak_mb']:>10.2f}" for m in methods
+        ))
+
+
+if __name__ == "__main__":
+    main()
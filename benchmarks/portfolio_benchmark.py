@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Portfolio Statistics Benchmark
+Time of portfolio_stats() over synthetic clearinghouseState responses
+(default 1,000 wallets × 50 positions), split into building the position
+table and aggregating it, for the NumPy and pure-Python backends.
+
+Usage: python benchmarks/portfolio_benchmark.py [--wallets 1000] [--positions 50] [--runs 5] [--target 0.5]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import portfolio_stats
+from portfolio_stats import PositionTable, _aggregate_numpy, _aggregate_python
+
+COINS = ["BTC", "ETH", "SOL", "HYPE", "ARB", "DOGE", "LINK", "AVAX", "OP", "SUI"] + [f"COIN{i}" for i in range(90)]
+
+
+def synthetic_positions(wallets: int, positions: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    result = {}
+    for w in range(wallets):
+        assets = []
+        for coin in rng.sample(COINS, min(positions, len(COINS))):
+            size = rng.uniform(-100, 100)
+            assets.append({"type": "oneWay", "position": {
+                "coin": coin, "szi": f"{size:.4f}", "positionValue": f"{abs(size) * rng.uniform(1, 1000):.2f}",
+                "unrealizedPnl": f"{rng.uniform(-5000, 5000):.2f}", "liquidationPx": None
+            }})
+        result[f"Wallet {w}"] = {"marginSummary": {"accountValue": f"{rng.uniform(1e4, 1e7):.2f}"},
+                                 "assetPositions": assets}
+    return result
+
+
+def timed(function, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio statistics benchmark")
+    parser.add_argument("--wallets", type=int, default=1000)
+    parser.add_argument("--positions", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target", type=float, default=0.5, help="Seconds allowed for portfolio_stats()")
+    args = parser.parse_args()
+
+    data = synthetic_positions(args.wallets, args.positions)
+    table = PositionTable(data)
+    print(f"{args.wallets} wallets × {args.positions} positions = {len(table)} rows, "
+          f"{len(table.coins)} coins (backend: {portfolio_stats.BACKEND})\n")
+
+    print(f"{'step':<22} {'median ms':>10}")
+    print(f"{'build table':<22} {timed(lambda: PositionTable(data), args.runs) * 1000:>10.1f}")
+    print(f"{'aggregate (python)':<22} {timed(lambda: _aggregate_python(table), args.runs) * 1000:>10.1f}")
+    if portfolio_stats.np is not None:
+        print(f"{'aggregate (numpy)':<22} {timed(lambda: _aggregate_numpy(table), args.runs) * 1000:>10.1f}")
+    total = timed(lambda: portfolio_stats.portfolio_stats(data), args.runs)
+    print(f"{'portfolio_stats()':<22} {total * 1000:>10.1f}")
+
+    if total > args.target:
+        print(f"\n❌ portfolio_stats() took {total:.3f}s (target {args.target:.2f}s)")
+        sys.exit(1)
+    print(f"\n✅ Within target ({args.target:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
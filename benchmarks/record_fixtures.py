@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Record Fixtures
+Captures live Etherscan and Hyperliquid responses for one wallet into
+benchmarks/fixtures, replacing the wallet address with a placeholder so the
+fake upstream can replay them for any number of wallets
+
+Usage: python benchmarks/record_fixtures.py 0xWALLET [--limit 10]
+(uses ETHERSCAN_API_KEY, ETHERSCAN_API_URL and HYPERLIQUID_API_URL from the environment)
+"""
+
+import argparse
+import json
+import os
+
+import requests
+
+from fake_upstream import ADDRESS_PLACEHOLDER, FIXTURES_DIR
+
+
+def anonymize(value, address: str):
+    """Replace the recorded wallet address with the placeholder"""
+    if isinstance(value, dict):
+        return {k: anonymize(v, address) for k, v in value.items()}
+    if isinstance(value, list):
+        return [anonymize(v, address) for v in value]
+    if isinstance(value, str) and value.lower() == address:
+        return ADDRESS_PLACEHOLDER
+    return value
+
+
+def save(name: str, data, address: str):
+    path = os.path.join(FIXTURES_DIR, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(anonymize(data, address), f, indent=2)
+    print(f"✅ Saved {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record API fixtures for the benchmarks")
+    parser.add_argument("address", help="Wallet address to record")
+    parser.add_argument("--limit", type=int, default=10, help="Transactions kept per list")
+    args = parser.parse_args()
+
+    address = args.address.lower()
+    api_key = os.getenv("ETHERSCAN_API_KEY", "")
+    etherscan_url = os.getenv("ETHERSCAN_API_URL", "https://api.etherscan.io/v2/api")
+    hyperliquid_url = os.getenv("HYPERLIQUID_API_URL", "https://api.hyperliquid.xyz/info")
+
+    for action, params in (
+        ("balance", {"tag": "latest"}),
+        ("txlist", {"sort": "desc"}),
+        ("tokentx", {"sort": "desc"}),
+    ):
+        response = requests.get(etherscan_url, params={
+            "chainid": 1, "module": "account", "action": action, "address": address, "apikey": api_key, **params
+        }, timeout=30)
+        data = response.json()
+        if data.get("status") != "1":
+            print(f"⚠️  Etherscan {action}: {data.get('message')} - {data.get('result')}")
+            continue
+        if isinstance(data["result"], list):
+            data["result"] = data["result"][:args.limit]
+        save(f"etherscan_{action}", data, address)
+
+    response = requests.post(hyperliquid_url, json={"type": "clearinghouseState", "user": address}, timeout=30)
+    save("hyperliquid_clearinghouseState", response.json(), address)
+
+    response = requests.post(hyperliquid_url, json={"type": "allMids"}, timeout=30)
+    save("hyperliquid_allMids", response.json(), address)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Alert Rules Benchmark
+Time of compiling synthetic alert rules (default 10,000 over 1,000 wallets,
+some with counterparty lists) and of evaluating changes against them,
+compared with the defaults alone.
+
+Usage: python benchmarks/rules_benchmark.py [--rules 10000] [--wallets 1000] [--facts 100000] [--target 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from alert_rules import DIRECTIONS, EVENTS, AlertRules, default_rules
+
+ASSETS = ["ETH", "BTC", "SOL", "USDC", "USDT", "HYPE", "ARB", "LINK"] + [f"TOKEN{i}" for i in range(42)]
+
+
+def synthetic_rules(count: int, wallets: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    rules = []
+    for _ in range(count):
+        event = rng.choice(EVENTS)
+        rule = {"event": event, rng.choice(["min_usd", "min_amount", "min_pct"]): rng.uniform(1, 1000)}
+        if rng.random() < 0.8:
+            rule["wallet"] = f"Wallet {rng.randrange(wallets)}"
+        if rng.random() < 0.5:
+            rule["asset"] = rng.choice(ASSETS)
+        if rng.random() < 0.3:
+            rule["direction"] = rng.choice(DIRECTIONS[event])
+        if event == "transfer" and rng.random() < 0.2:
+            rule["counterparty"] = [f"0x{rng.getrandbits(160):040x}" for _ in range(rng.randint(1, 20))]
+        rule["action"] = rng.choices(["alert", "critical", "mute"], [8, 1, 1])[0]
+        rules.append(rule)
+    return rules
+
+
+def synthetic_facts(count: int, wallets: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    facts = []
+    for _ in range(count):
+        event = rng.choice(EVENTS)
+        facts.append({
+            "event": event,
+            "wallet": f"Wallet {rng.randrange(wallets)}",
+            "chain": "ethereum",
+            "asset": rng.choice(ASSETS),
+            "direction": rng.choice(DIRECTIONS[event]),
+            "side": rng.choice(["long", "short"]),
+            "counterparty": f"0x{rng.getrandbits(160):040x}",
+            "amount": rng.uniform(0, 100),
+            "pct": rng.uniform(0, 50),
+            "usd": rng.choice([None, rng.uniform(0, 100000)]),
+            "leverage": rng.uniform(1, 50),
+            "margin_usage": rng.random()
+        })
+    return facts
+
+
+def per_fact_us(rules: AlertRules, facts: list) -> float:
+    started = time.perf_counter()
+    for fact in facts:
+        rules.evaluate(fact)
+    return (time.perf_counter() - started) / len(facts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alert rules benchmark")
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--wallets", type=int, default=1000)
+    parser.add_argument("--facts", type=int, default=100000)
+    parser.add_argument("--target", type=float, default=50, help="Microseconds allowed per evaluated change")
+    args = parser.parse_args()
+
+    defaults = default_rules({})
+    rules = synthetic_rules(args.rules, args.wallets)
+    facts = synthetic_facts(args.facts, args.wallets)
+
+    started = time.perf_counter()
+    compiled = AlertRules(rules, defaults)
+    compile_ms = (time.perf_counter() - started) * 1000
+    baseline = per_fact_us(AlertRules(defaults=defaults), facts)
+    evaluated = per_fact_us(compiled, facts)
+
+    print(f"{args.rules} rules over {args.wallets} wallets, {args.facts} changes\n")
+    print(f"{'step':<22} {'time':>12}")
+    print(f"{'compile':<22} {compile_ms:>9.1f} ms")
+    print(f"{'evaluate (defaults)':<22} {baseline:>9.2f} µs")
+    print(f"{'evaluate (rules)':<22} {evaluated:>9.2f} µs")
+
+    if evaluated > args.target:
+        print(f"\n❌ {evaluated:.2f} µs per change (target {args.target:.0f} µs)")
+        sys.exit(1)
+    print(f"\n✅ Within target ({args.target:.0f} µs per change)")
+
+
+if __name__ == "__main__":
+    main()
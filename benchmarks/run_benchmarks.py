@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Benchmark Suite
+Runs full monitor cycles against the fake upstream (recorded Etherscan,
+Hyperliquid and Telegram responses) and reports wall time, requests per
+cycle, CPU time and peak memory for each wallets x subscribers scenario.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # quick matrix
+    python benchmarks/run_benchmarks.py --full               # 1-10,000 wallets, 10-50,000 subscribers
+    python benchmarks/run_benchmarks.py --save baseline.json
+    python benchmarks/run_benchmarks.py --compare baseline.json --tolerance 0.2
+
+Each scenario runs in its own process (configuration is read at import).
+The first cycle records baselines; the timed cycle then sees change_rate of
+the wallets move, and a third cycle runs under tracemalloc for peak memory.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_upstream import FakeUpstream
+
+QUICK_WALLETS = [1, 100, 1000]
+QUICK_SUBSCRIBERS = [10, 1000]
+FULL_WALLETS = [1, 100, 1000, 10000]
+FULL_SUBSCRIBERS = [10, 1000, 50000]
+
+# Compared against a saved baseline; requests are deterministic, times are not
+COMPARED_FIELDS = ("cycle_seconds", "delivery_seconds", "cpu_seconds", "peak_memory_mb", "requests_per_cycle")
+
+
+def wallet_address(index: int) -> str:
+    return "0x" + f"{index:040x}"
+
+
+def scenario_env(api: FakeUpstream, wallets: int, subscribers: int, workdir: str, fanout_mode: str) -> dict:
+    """Environment for a monitor process pointed at the fake upstream"""
+    subscribers_file = os.path.join(workdir, f"subscribers_{subscribers}.json")
+    with open(subscribers_file, "w") as f:
+        json.dump({"subscribers": list(range(1, subscribers + 1)), "preferences": {}}, f)
+
+    env = dict(os.environ)
+    env.update({
+        "WALLETS": json.dumps({f"Wallet {i}": wallet_address(i) for i in range(1, wallets + 1)}),
+        "ETHERSCAN_API_KEY": "BENCHKEY",
+        "ETHERSCAN_API_URL": api.etherscan_url,
+        "HYPERLIQUID_API_URL": api.hyperliquid_url,
+        "ETH_RPC_URL": api.rpc_url,
+        "TELEGRAM_BOT_TOKEN": "123456:BENCH",
+        "TELEGRAM_API_URL": api.url,
+        "TELEGRAM_FANOUT_MODE": fanout_mode,
+        "TELEGRAM_STAGING_CHAT_ID": "-1000000000001",
+        "SUBSCRIBERS_FILE": subscribers_file,
+        "TOKEN_CACHE_FILE": os.path.join(workdir, "token_metadata.json"),
+        "HISTORY_DB": os.path.join(workdir, f"history_{wallets}.db"),
+        # The fake API has no rate limit; measure the code, not Telegram's budget
+        "TELEGRAM_GLOBAL_RATE": "1000000",
+        "TELEGRAM_LANE_RATES": json.dumps({lane: 1000000 for lane in ("critical", "alert", "balance", "info")}),
+        "METRICS_PORT": "0",
+        "TRACE_FILE": "",
+        "BENCH_UPSTREAM_URL": api.url,
+    })
+    return env
+
+
+def run_scenario() -> dict:
+    """Body of a scenario process: baseline cycle, timed cycle, memory cycle"""
+    control = os.environ["BENCH_UPSTREAM_URL"] + "/_control"
+    os.chdir(ROOT_DIR)
+    sys.path.insert(0, ROOT_DIR)
+
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+        started = time.perf_counter()
+        from main import CryptoWalletMonitor
+        monitor = CryptoWalletMonitor()
+        startup = time.perf_counter() - started
+
+        # Baseline cycle: trackers record balances and positions
+        monitor.check_wallet_changes()
+        monitor.notifier.wait_for_delivery(timeout=600)
+
+        # Timed cycle
+        requests.post(f"{control}/reset")
+        requests.post(f"{control}/advance")
+        cpu_started = time.process_time()
+        started = time.perf_counter()
+        monitor.check_wallet_changes()
+        cycle = time.perf_counter() - started
+        monitor.notifier.wait_for_delivery(timeout=600)
+        delivery = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        stats = requests.get(f"{control}/stats").json()
+
+        # Memory cycle (tracemalloc slows everything down, so it is not timed)
+        requests.post(f"{control}/advance")
+        tracemalloc.start()
+        monitor.check_wallet_changes()
+        monitor.notifier.wait_for_delivery(timeout=600)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    upstream = stats["upstream"]
+    return {
+        "startup_seconds": round(startup, 4),
+        "cycle_seconds": round(cycle, 4),
+        "delivery_seconds": round(delivery, 4),
+        "cpu_seconds": round(cpu, 4),
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+        "requests_per_cycle": sum(upstream.values()),
+        "etherscan_requests": upstream.get("etherscan", 0),
+        "hyperliquid_requests": upstream.get("hyperliquid", 0),
+        "rpc_requests": upstream.get("rpc", 0),
+        "telegram_requests": upstream.get("telegram", 0),
+        "bytes_sent": stats["stats"]["bytes_in"],
+    }
+
+
+def run_matrix(args) -> list:
+    api = FakeUpstream(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, change_rate=args.change_rate,
+        history=args.history
+    ).start()
+    workdir = tempfile.mkdtemp(prefix="whalewallet-bench-")
+    results = []
+
+    print(
+        f"Fake upstream: latency {args.latency * 1000:.1f} ms ± {args.jitter * 1000:.1f} ms, "
+        f"errors {args.error_rate:.0%}, changed wallets per cycle {args.change_rate:.0%}, fan-out {args.fanout}\n"
+    )
+    print(f"{'wallets':>8} {'subs':>7} {'cycle s':>9} {'deliver s':>10} {'cpu s':>8} {'peak MB':>8} "
+          f"{'requests':>9} {'ethscan':>8} {'hyperliq':>8} {'rpc':>5} {'telegram':>9}")
+    try:
+        for wallets in args.wallets:
+            for subscribers in args.subscribers:
+                api.cycle = 0
+                env = scenario_env(api, wallets, subscribers, workdir, args.fanout)
+                process = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--scenario"],
+                    env=env, capture_output=True, text=True
+                )
+                if process.returncode != 0:
+                    print(f"{wallets:>8} {subscribers:>7}  ❌ failed:\n{process.stderr[-2000:]}")
+                    continue
+                result = json.loads(process.stdout.strip().splitlines()[-1])
+                result.update({"wallets": wallets, "subscribers": subscribers})
+                results.append(result)
+                print(
+                    f"{wallets:>8} {subscribers:>7} {result['cycle_seconds']:>9.3f} {result['delivery_seconds']:>10.3f} "
+                    f"{result['cpu_seconds']:>8.3f} {result['peak_memory_mb']:>8.2f} {result['requests_per_cycle']:>9} "
+                    f"{result['etherscan_requests']:>8} {result['hyperliquid_requests']:>8} {result.get('rpc_requests', 0):>5} {result['telegram_requests']:>9}"
+                )
+    finally:
+        api.stop()
+    return results
+
+
+def compare(results: list, baseline_file: str, tolerance: float) -> list:
+    """Fields that got worse than the baseline by more than the tolerance"""
+    with open(baseline_file) as f:
+        baseline = {(r["wallets"], r["subscribers"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["wallets"], result["subscribers"]))
+        if not previous:
+            continue
+        for field in COMPARED_FIELDS:
+            before, after = previous.get(field), result.get(field)
+            if not before or after is None:
+                continue
+            if after > before * (1 + tolerance):
+                regressions.append(
+                    f"{result['wallets']} wallets / {result['subscribers']} subscribers: "
+                    f"{field} {before} -> {after} (+{(after / before - 1):.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WhaleWallet benchmark suite")
+    parser.add_argument("--wallets", type=int, nargs="+", default=None)
+    parser.add_argument("--subscribers", type=int, nargs="+", default=None)
+    parser.add_argument("--full", action="store_true", help="Run the full wallets x subscribers matrix")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake upstream latency per request (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- latency (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream requests that fail")
+    parser.add_argument("--change-rate", type=float, default=0.1, help="Share of wallets that change each cycle")
+    parser.add_argument("--history", type=int, default=0, help="Rows in every txlist/tokentx response (whales)")
+    parser.add_argument("--fanout", default="direct", choices=["direct", "copy", "forward"])
+    parser.add_argument("--save", help="Write results to a JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline")
+    parser.add_argument("--scenario", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario()))
+        return
+
+    args.wallets = args.wallets or (FULL_WALLETS if args.full else QUICK_WALLETS)
+    args.subscribers = args.subscribers or (FULL_SUBSCRIBERS if args.full else QUICK_SUBSCRIBERS)
+    results = run_matrix(args)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({"settings": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+                       "results": results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.save}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print(f"   • {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
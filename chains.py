@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Chains
+EVM chains a wallet can be tracked on. All of them are read through the
+Etherscan V2 API (one key, chainid parameter), so trackers of every chain
+share one HTTP pool and one request quota; a per-chain concurrency limit
+keeps a busy chain from starving the others
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+
+from delivery_queue import TokenBucket
+
+# Chain name -> Etherscan V2 chainid, native asset and block explorer
+CHAINS = {
+    "ethereum": {"chain_id": 1, "label": "Ethereum", "native": "ETH", "explorer": "https://etherscan.io", "explorer_name": "Etherscan"},
+    "arbitrum": {"chain_id": 42161, "label": "Arbitrum", "native": "ETH", "explorer": "https://arbiscan.io", "explorer_name": "Arbiscan"},
+    "base": {"chain_id": 8453, "label": "Base", "native": "ETH", "explorer": "https://basescan.org", "explorer_name": "BaseScan"},
+    "optimism": {"chain_id": 10, "label": "Optimism", "native": "ETH", "explorer": "https://optimistic.etherscan.io", "explorer_name": "Optimism Explorer"},
+    "linea": {"chain_id": 59144, "label": "Linea", "native": "ETH", "explorer": "https://lineascan.build", "explorer_name": "LineaScan"},
+    "scroll": {"chain_id": 534352, "label": "Scroll", "native": "ETH", "explorer": "https://scrollscan.com", "explorer_name": "ScrollScan"},
+    "polygon": {"chain_id": 137, "label": "Polygon", "native": "POL", "explorer": "https://polygonscan.com", "explorer_name": "PolygonScan"},
+    "bsc": {"chain_id": 56, "label": "BNB Chain", "native": "BNB", "explorer": "https://bscscan.com", "explorer_name": "BscScan"},
+    "avalanche": {"chain_id": 43114, "label": "Avalanche", "native": "AVAX", "explorer": "https://snowtrace.io", "explorer_name": "Snowtrace"},
+}
+DEFAULT_CHAIN = "ethereum"
+
+# Well-known token contracts of each chain: address -> (symbol, name, decimals).
+# Verified on their own chain only; elsewhere the same symbol from another contract is spam
+KNOWN_TOKENS = {
+    "ethereum": {
+        "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48": ("USDC", "USD Coin", 6),
+        "0xdac17f958d2ee523a2206206994597c13d831ec7": ("USDT", "Tether USD", 6),
+        "0x6b175474e89094c44da98b954eedeac495271d0f": ("DAI", "Dai Stablecoin", 18),
+        "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2": ("WETH", "Wrapped Ether", 18),
+        "0x2260fac5e5542a773aa44fbcfedf7c193bc2c599": ("WBTC", "Wrapped BTC", 8),
+        "0x514910771af9ca656af840dff83e8264ecf986ca": ("LINK", "ChainLink Token", 18),
+        "0x1f9840a85d5af5bf1d1762f925bdaddc4201f984": ("UNI", "Uniswap", 18),
+        "0xae7ab96520de3a18e5e111b5eaab095312d7fe84": ("stETH", "Liquid staked Ether 2.0", 18),
+        "0x7fc66500c84a76ad7e9c93437bfc5ac33e2ddae9": ("AAVE", "Aave Token", 18),
+    },
+    "arbitrum": {
+        "0xaf88d065e77c8cc2239327c5edb3a432268e5831": ("USDC", "USD Coin", 6),
+        "0xff970a61a04b1ca14834a43f5de4533ebddb5cc8": ("USDC.e", "Bridged USDC", 6),
+        "0xfd086bc7cd5c481dcc9c85ebe478a1c0b69fcbb9": ("USDT", "Tether USD", 6),
+        "0xda10009cbd5d07dd0cecc66161fc93d7c9000da1": ("DAI", "Dai Stablecoin", 18),
+        "0x82af49447d8a07e3bd95bd0d56f35241523fbab1": ("WETH", "Wrapped Ether", 18),
+        "0x2f2a2543b76a4166549f7aab2e75bef0aefc5b0f": ("WBTC", "Wrapped BTC", 8),
+        "0xf97f4df75117a78c1a5a0dbb814af92458539fb4": ("LINK", "ChainLink Token", 18),
+        "0x912ce59144191c1204e64559fe8253a0e49e6548": ("ARB", "Arbitrum", 18),
+    },
+    "base": {
+        "0x833589fcd6edb6e08f4c7c32d4f71b54bda02913": ("USDC", "USD Coin", 6),
+        "0xd9aaec86b65d86f6a7b5b1b0c42ffa531710b6ca": ("USDbC", "USD Base Coin", 6),
+        "0x50c5725949a6f0c72e6c4a641f24049a917db0cb": ("DAI", "Dai Stablecoin", 18),
+        "0x4200000000000000000000000000000000000006": ("WETH", "Wrapped Ether", 18),
+        "0x2ae3f1ec7f1f5012cfeab0185bfc7aa3cf0dec22": ("cbETH", "Coinbase Wrapped Staked ETH", 18),
+    },
+    "optimism": {
+        "0x0b2c639c533813f4aa9d7837caf62653d097ff85": ("USDC", "USD Coin", 6),
+        "0x7f5c764cbc14f9669b88837ca1490cca17c31607": ("USDC.e", "Bridged USDC", 6),
+        "0x94b008aa00579c1307b0ef2c499ad98a8ce58e58": ("USDT", "Tether USD", 6),
+        "0xda10009cbd5d07dd0cecc66161fc93d7c9000da1": ("DAI", "Dai Stablecoin", 18),
+        "0x4200000000000000000000000000000000000006": ("WETH", "Wrapped Ether", 18),
+        "0x68f180fcce6836688e9084f035309e29bf0a2095": ("WBTC", "Wrapped BTC", 8),
+        "0x4200000000000000000000000000000000000042": ("OP", "Optimism", 18),
+    },
+    "linea": {
+        "0x176211869ca2b568f2a7d4ee941e073a821ee1ff": ("USDC", "USD Coin", 6),
+        "0xa219439258ca9da29e9cc4ce5596924745e12b93": ("USDT", "Tether USD", 6),
+        "0xe5d7c2a44ffddf6b295a15c148167daaaf5cf34f": ("WETH", "Wrapped Ether", 18),
+    },
+    "scroll": {
+        "0x06efdbff2a14a7c8e15944d1f4a48f9f95f663a4": ("USDC", "USD Coin", 6),
+        "0xf55bec9cafdbe8730f096aa55dad6d22d44099df": ("USDT", "Tether USD", 6),
+        "0x5300000000000000000000000000000000000004": ("WETH", "Wrapped Ether", 18),
+    },
+    "polygon": {
+        "0x3c499c542cef5e3811e1192ce70d8cc03d5c3359": ("USDC", "USD Coin", 6),
+        "0x2791bca1f2de4661ed88a30c99a7a9449aa84174": ("USDC.e", "Bridged USDC", 6),
+        "0xc2132d05d31c914a87c6611c10748aeb04b58e8f": ("USDT", "Tether USD", 6),
+        "0x8f3cf7ad23cd3cadbd9735aff958023239c6a063": ("DAI", "Dai Stablecoin", 18),
+        "0x7ceb23fd6bc0add59e62ac25578270cff1b9f619": ("WETH", "Wrapped Ether", 18),
+        "0x1bfd67037b42cf73acf2047067bd4f2c47d9bfd6": ("WBTC", "Wrapped BTC", 8),
+        "0x0d500b1d8e8ef31e21c99d1db9a6444d3adf1270": ("WPOL", "Wrapped Polygon Ecosystem Token", 18),
+    },
+    "bsc": {
+        "0x55d398326f99059ff775485246999027b3197955": ("USDT", "Tether USD", 18),
+        "0x8ac76a51cc950d9822d68b83fe1ad97b32cd580d": ("USDC", "USD Coin", 18),
+        "0x1af3f329e8be154074d8769d1ffa4ee058b1dbc3": ("DAI", "Dai Token", 18),
+        "0x2170ed0880ac9a755fd29b2688956bd959f933f8": ("ETH", "Ethereum Token", 18),
+        "0x7130d2a12b9bcbfae4f2634d864a1ee1ce3ead9c": ("BTCB", "BTCB Token", 18),
+        "0xbb4cdb9cbd36b01bd1cbaebf2de08d9173bc095c": ("WBNB", "Wrapped BNB", 18),
+    },
+    "avalanche": {
+        "0xb97ef9ef8734c71904d8002f8b6bc66dd9c48a6e": ("USDC", "USD Coin", 6),
+        "0x9702230a8ea53601f5cd2dc00fdbc13d4df4a8c7": ("USDT", "TetherToken", 6),
+        "0xd586e7f844cea2f87f50152665bcbc2c279d8d70": ("DAI.e", "Dai Stablecoin", 18),
+        "0x49d5c2bdffac6ce2bfdb6640f4f80f226bc10bab": ("WETH.e", "Wrapped Ether", 18),
+        "0x152b9d0fdc40c096757f570a51e494bd4b943e50": ("BTC.b", "Bitcoin", 8),
+        "0xb31f66aa3c1e785363f0875a1b74e27b85fd66c7": ("WAVAX", "Wrapped AVAX", 18),
+    },
+}
+
+# Etherscan requests in flight per chain unless CHAIN_CONCURRENCY says otherwise
+DEFAULT_CHAIN_CONCURRENCY = 2
+
+
+def chain_info(chain: str) -> Dict:
+    """Registry entry of a chain (ValueError for unknown names)"""
+    try:
+        return CHAINS[chain]
+    except KeyError:
+        raise ValueError(f"Unknown chain '{chain}' (known: {', '.join(CHAINS)})")
+
+
+def explorer_url(chain: str, address: str) -> str:
+    return f"{chain_info(chain)['explorer']}/address/{address}"
+
+
+def wallet_chains(wallets: Dict[str, str], default_chains: List[str], overrides: Dict[str, List[str]] = None) -> Dict[str, List[str]]:
+    """Chains of every wallet: WALLET_CHAINS entry, else CHAINS; the first one also tracks Hyperliquid"""
+    overrides = overrides or {}
+    result = {}
+    for wallet_name in wallets:
+        chains = [chain.lower() for chain in (overrides.get(wallet_name) or default_chains or [DEFAULT_CHAIN])]
+        for chain in chains:
+            chain_info(chain)
+        # Keep the configured order, without duplicates
+        result[wallet_name] = list(dict.fromkeys(chains))
+    return result
+
+
+class RequestQuota:
+    """Shared Etherscan budget: a global rate (0 = unlimited) plus in-flight limits per chain"""
+
+    def __init__(self, rate: float = 0, concurrency: Dict[str, int] = None):
+        self._bucket = TokenBucket(rate) if rate > 0 else None
+        self._lock = threading.Lock()
+        concurrency = concurrency or {}
+        self._slots = {
+            chain: threading.BoundedSemaphore(max(1, int(concurrency.get(chain, DEFAULT_CHAIN_CONCURRENCY))))
+            for chain in CHAINS
+        }
+
+    def _wait_for_rate(self):
+        if self._bucket is None:
+            return
+        while True:
+            with self._lock:
+                delay = self._bucket.delay(time.monotonic())
+                if delay == 0:
+                    self._bucket.take()
+                    return
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self, chain: str):
+        """Hold one of the chain's request slots and a token of the shared rate"""
+        with self._slots[chain]:
+            self._wait_for_rate()
+            yield
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Chart Renderer
+PNG charts of a wallet's account value and unrealized PnL from the history
+store for /chart. Uses matplotlib (Agg, imported on first render) when it
+is installed and a small built-in line renderer otherwise. Rendered images
+are cached per (wallet, range, latest sample), so repeated requests reuse
+one render - and after the first upload, Telegram's file_id instead of the
+bytes - until a new sample arrives
+"""
+
+import importlib.util
+import io
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# /chart ranges in seconds
+RANGES = {"1h": 3600, "6h": 6 * 3600, "1d": 86400, "7d": 7 * 86400, "30d": 30 * 86400, "1y": 365 * 86400}
+DEFAULT_RANGE = "1d"
+
+# Chart backend in use ("matplotlib" or "builtin")
+BACKEND = "matplotlib" if importlib.util.find_spec("matplotlib") is not None else "builtin"
+
+WIDTH, HEIGHT = 800, 400
+
+# Renders share matplotlib's font cache and the CPU; one at a time
+_render_lock = threading.Lock()
+
+
+def _render_matplotlib(points: List[Dict], title: str) -> bytes:
+    import matplotlib
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    times = [datetime.fromtimestamp(point["ts"]) for point in points]
+    figure = Figure(figsize=(WIDTH / 100, HEIGHT / 100), dpi=100)
+    value_axes, pnl_axes = figure.subplots(2, 1, sharex=True, gridspec_kw={"height_ratios": [3, 1]})
+    value_axes.plot(times, [point["account_value"] for point in points], color="#1f77b4", linewidth=1.5)
+    value_axes.fill_between(times, [point["account_value_min"] for point in points],
+                            [point["account_value_max"] for point in points], color="#1f77b4", alpha=0.15)
+    value_axes.set_title(title)
+    value_axes.set_ylabel("Account value ($)")
+    value_axes.grid(alpha=0.3)
+    pnl_axes.plot(times, [point["unrealized_pnl"] for point in points], color="#2ca02c", linewidth=1.2)
+    pnl_axes.axhline(0, color="grey", linewidth=0.8)
+    pnl_axes.set_ylabel("uPnL ($)")
+    pnl_axes.grid(alpha=0.3)
+    figure.autofmt_xdate()
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _png(width: int, height: int, pixels: bytearray) -> bytes:
+    """Encode RGB rows as a PNG"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    stride = width * 3
+    raw = b"".join(b"\x00" + bytes(pixels[y * stride:(y + 1) * stride]) for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 6))
+            + chunk(b"IEND", b""))
+
+
+def _render_builtin(points: List[Dict], title: str) -> bytes:
+    """Account value line over its min/max band and a PnL strip; the caption carries the numbers"""
+    pixels = bytearray(b"\xff" * (WIDTH * HEIGHT * 3))
+
+    def plot(x: int, y: int, color: Tuple[int, int, int]):
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            offset = (y * WIDTH + x) * 3
+            pixels[offset:offset + 3] = bytes(color)
+
+    def line(x0: int, y0: int, x1: int, y1: int, color: Tuple[int, int, int], width: int = 1):
+        dx, dy = abs(x1 - x0), -abs(y1 - y0)
+        sx, sy = (1 if x0 < x1 else -1), (1 if y0 < y1 else -1)
+        error = dx + dy
+        while True:
+            for offset in range(width):
+                plot(x0, y0 + offset, color)
+            if x0 == x1 and y0 == y1:
+                return
+            doubled = 2 * error
+            if doubled >= dy:
+                error += dy
+                x0 += sx
+            if doubled <= dx:
+                error += dx
+                y0 += sy
+
+    def panel(top: int, bottom: int, series: List[float], band: Optional[Tuple[List[float], List[float]]],
+              color: Tuple[int, int, int], zero_line: bool = False):
+        left, right = 40, WIDTH - 20
+        values = series + (band[0] + band[1] if band else []) + ([0.0] if zero_line else [])
+        low, high = min(values), max(values)
+        if high == low:
+            # A flat line is drawn across the middle
+            low, high = low - 1, high + 1
+        span = high - low
+        to_y = lambda value: int(bottom - (value - low) / span * (bottom - top))
+        to_x = lambda i: int(left + i * (right - left) / max(1, len(series) - 1))
+        for i in range(5):
+            y = top + i * (bottom - top) // 4
+            line(left, y, right, y, (230, 230, 230))
+        line(left, top, left, bottom, (150, 150, 150))
+        line(left, bottom, right, bottom, (150, 150, 150))
+        if zero_line:
+            line(left, to_y(0.0), right, to_y(0.0), (170, 170, 170))
+        if band:
+            fill = tuple(255 - (255 - c) // 5 for c in color)
+            for i, (low_value, high_value) in enumerate(zip(*band)):
+                line(to_x(i), to_y(high_value), to_x(i), to_y(low_value), fill)
+        for i in range(1, len(series)):
+            line(to_x(i - 1), to_y(series[i - 1]), to_x(i), to_y(series[i]), color, 2)
+
+    if len(points) == 1:
+        points = points * 2
+    panel(20, 280, [point["account_value"] for point in points],
+          ([point["account_value_min"] for point in points], [point["account_value_max"] for point in points]),
+          (31, 119, 180))
+    panel(300, 380, [point["unrealized_pnl"] for point in points], None, (44, 160, 44), zero_line=True)
+    return _png(WIDTH, HEIGHT, pixels)
+
+
+def render_chart(points: List[Dict], title: str) -> bytes:
+    """PNG of history points (HistoryStore.series) with the available backend"""
+    with _render_lock:
+        if BACKEND == "matplotlib":
+            return _render_matplotlib(points, title)
+        return _render_builtin(points, title)
+
+
+def parse_chart_args(text: str, wallets: List[str]) -> Tuple[Optional[str], str]:
+    """Wallet name (case-insensitive, may contain spaces) and range from '/chart <wallet> [range]'"""
+    args = text.split()[1:]
+    chart_range = DEFAULT_RANGE
+    if args and args[-1].lower() in RANGES:
+        chart_range = args.pop().lower()
+    requested = " ".join(args).lower()
+    if not requested:
+        return (wallets[0] if len(wallets) == 1 else None), chart_range
+    for wallet_name in wallets:
+        if wallet_name.lower() == requested:
+            return wallet_name, chart_range
+    return None, chart_range
+
+
+class ChartCache:
+    """LRU of rendered charts; an entry holds the PNG and, once uploaded, its Telegram file_id"""
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, png: bytes, caption: str) -> Dict:
+        with self._lock:
+            # Older renders of the same wallet and range are outdated by this one
+            for old_key in [k for k in self._entries if k[:2] == key[:2]]:
+                del self._entries[old_key]
+            entry = self._entries[key] = {"png": png, "caption": caption, "file_id": None}
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return entry
@@ -5,6 +5,14 @@ WALLET_ADDRESS = "YOUR_WALLET_ADDRESS"
 
 # Etherscan API configuration
 ETHERSCAN_API_KEY = "YOUR_ETHERSCAN_API_KEY"  # Get from https://etherscan.io/apis
+ETHERSCAN_API_URL = "https://api.etherscan.io/v2/api"  # V2: one key for every chain
+
+# Chains tracked for every wallet (see chains.py) and per-wallet overrides; the first chain also tracks Hyperliquid
+CHAINS = ["ethereum"]
+WALLET_CHAINS = {}  # e.g. {"Trading": ["arbitrum", "base"]}
+CHAIN_CONCURRENCY = {}  # Etherscan requests in flight per chain (default 2)
+ETHERSCAN_RATE = 0  # Requests/second shared by all chains (0 = unlimited, 5 on the free plan)
+CHAIN_WORKERS = 8  # Threads checking additional chains
 
 # Hyperliquid API configuration
 HYPERLIQUID_API_URL = "https://api.hyperliquid.xyz/info"
@@ -14,7 +22,15 @@ NOTIFICATION_SETTINGS = {
     "telegram": {
         "enabled": False,
         "bot_token": "YOUR_BOT_TOKEN",
-        "chat_id": ""  # Optional - bot will accept /start from any user/group
+        "chat_id": "",  # Optional - bot will accept /start from any user/group
+        "api_url": "https://api.telegram.org",
+        "fanout_mode": "direct",  # direct, copy, forward or channel
+        "staging_chat_id": "",  # Required for copy/forward fan-out
+        "alert_channel_id": "",  # Required for channel fan-out
+        "coalesce": True,  # One merged message per subscriber per check cycle
+        "digest_interval": 0,  # Send a digest every N seconds instead (0 = every cycle)
+        "lane_rates": {"critical": 30, "alert": 20, "balance": 10, "info": 5},  # Messages/second per lane
+        "global_rate": 30  # Telegram allows ~30 messages/second
     },
     "console": {
         "enabled": True
@@ -24,6 +40,77 @@ NOTIFICATION_SETTINGS = {
 # Tracking intervals (in seconds)
 CHECK_INTERVAL = 600  # Check every 10 minutes
 
+# Wallets fetched in parallel at startup (keep within the Etherscan rate limit)
+STARTUP_WORKERS = 4
+
+# Summaries (/analysis, --check) reuse data fetched within this many seconds
+SUMMARY_CACHE_TTL = 60
+
+# Sharding: split WALLETS across worker processes (0 or 1 = single process)
+SHARD_COUNT = 0
+SHARD_ROLE = ""  # "", "coordinator" or "worker"
+SHARD_INDEX = 0
+SHARD_HUB_ADDRESS = "127.0.0.1:50055"
+SHARD_HUB_AUTHKEY = ""
+ETHERSCAN_API_KEYS = []  # Optional per-shard Etherscan keys
+
+# Token metadata cache and which token transfers alert ("spam", "verified" or "off")
+TOKEN_CACHE_FILE = "token_metadata.json"
+TOKEN_FILTER = "spam"
+VERIFIED_TOKENS = []  # Extra verified token contracts ("0x..." on every chain, "arbitrum:0x..." on one)
+
+# ERC-20 balances via JSON-RPC batches of balanceOf ("" = off)
+ETH_RPC_URL = ""
+TOKEN_BALANCE_CHANGE_USD = 100
+TOKEN_BALANCE_CHANGE_PCT = 5  # Unpriced tokens
+TOKEN_BALANCE_BATCH_SIZE = 500
+TOKEN_BALANCE_WORKERS = 4
+
+# Replicas: only the leader lease holder polls the bot and broadcasts ("", "file" or "sqlite")
+LEADER_LEASE = ""
+LEADER_LEASE_PATH = "leader.lease"
+LEADER_LEASE_TTL = 10
+
 # Thresholds for notifications
 BALANCE_CHANGE_THRESHOLD = 0.1  # Notify if balance changes more than 0.1 ETH
-POSITION_CHANGE_THRESHOLD = 1000  # Notify if position changes more than $1000
+BALANCE_CHANGE_USD = 0  # Compare balance changes in USD instead (0 = off)
+POSITION_CHANGE_THRESHOLD = 1000  # Notify if a position changes more than $1000 (0 = off)
+POSITION_CHANGE_PCT = 5  # Unpriced (or USD threshold off): % of position size
+TRANSFER_MIN_USD = 0  # Ignore priced transfers worth less than this
+
+# Alert rules checked before the thresholds above (see alert_rules.py), inline and/or from a JSON file
+ALERT_RULES = []
+ALERT_RULES_FILE = ""
+
+# Prices: Hyperliquid allMids cache lifetime and fixed prices for unlisted assets
+PRICE_CACHE_TTL = 30
+PRICE_OVERRIDES = {}
+
+# Critical alerts skip coalescing and jump ahead of other deliveries
+CRITICAL_MARGIN_USAGE = 0.8  # Margin usage close to liquidation
+LARGE_WITHDRAWAL_ETH = 100  # Withdrawal size treated as critical
+
+# Account value/PnL/position history (SQLite with 1m/1h/1d rollups, "" = off) and raw sample retention
+HISTORY_DB = "history.db"
+HISTORY_RETENTION_DAYS = 7
+# Days of Hyperliquid fills/funding backfilled the first time a wallet is synced (realized PnL totals)
+FILLS_LOOKBACK_DAYS = 7
+
+# Liquidation risk tiers (% from liquidation price) and fast recheck of at-risk wallets (seconds, 0 = off)
+LIQUIDATION_WARNING_PCT = 20
+LIQUIDATION_DANGER_PCT = 10
+LIQUIDATION_CRITICAL_PCT = 5
+RISK_RECHECK_INTERVAL = 30
+
+# Prometheus-style /metrics endpoint (0 = disabled)
+METRICS_PORT = 0
+METRICS_HOST = "0.0.0.0"
+
+# Tracing: spans of sampled cycles/commands appended as JSON lines (empty = disabled)
+TRACE_FILE = ""
+TRACE_SAMPLE_RATE = 1.0
+
+# Logging: level, text or json lines, and share of per-wallet "No changes" lines kept
+LOG_LEVEL = "INFO"
+LOG_FORMAT = "text"
+LOG_SAMPLE_RATE = 1.0
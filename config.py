@@ -1,11 +1,22 @@
 import os
 from dotenv import load_dotenv
 import json
-
-# Load environment variables from .env file
-load_dotenv()
+from typing import Any, Dict
 
 # Configuration file for crypto wallet tracker
+#
+# Nothing is read at import time: load_settings() (or the first access to a
+# constant such as config.WALLETS) loads .env and the environment once.
+# validate_config() is only called by entry points that need a complete setup.
+
+
+def _json_env(name: str, default: str = "{}"):
+    """JSON setting from the environment; unset or empty gives the default"""
+    try:
+        return json.loads(os.getenv(name, "") or default)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{name} is not valid JSON: {e}")
+
 
 # Multiple wallet support
 # Format: WALLETS={"Main Wallet":"0x123...","Trading":"0x456...","Savings":"0x789..."}
@@ -31,54 +42,196 @@ def parse_wallets():
     
     return {}
 
-WALLETS = parse_wallets()
-# Legacy support
-WALLET_ADDRESS = list(WALLETS.values())[0] if WALLETS else os.getenv("WALLET_ADDRESS", "YOUR_WALLET_ADDRESS")
-
-# Etherscan API configuration
-ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY", "YOUR_ETHERSCAN_API_KEY")
-
-# Hyperliquid API configuration
-HYPERLIQUID_API_URL = "https://api.hyperliquid.xyz/info"
-
-# Telegram configuration
-TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "YOUR_BOT_TOKEN")
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")  # Optional - bot will accept /start from any user
-
-# Notification settings
-NOTIFICATION_SETTINGS = {
-    "telegram": {
-        "enabled": True if TELEGRAM_BOT_TOKEN and TELEGRAM_BOT_TOKEN != "YOUR_BOT_TOKEN" else False,
-        "bot_token": TELEGRAM_BOT_TOKEN,
-        "chat_id": TELEGRAM_CHAT_ID  # Legacy support - not required anymore
-    },
-    "console": {
-        "enabled": True
+
+def _read_settings() -> Dict[str, Any]:
+    """Read every configuration constant from the environment"""
+    WALLETS = parse_wallets()
+    # Legacy support
+    WALLET_ADDRESS = list(WALLETS.values())[0] if WALLETS else os.getenv("WALLET_ADDRESS", "YOUR_WALLET_ADDRESS")
+
+    # Etherscan API configuration (V2: one key for every chain, selected by chainid)
+    ETHERSCAN_API_KEY = os.getenv("ETHERSCAN_API_KEY", "YOUR_ETHERSCAN_API_KEY")
+    ETHERSCAN_API_URL = os.getenv("ETHERSCAN_API_URL", "https://api.etherscan.io/v2/api")
+
+    # Chains tracked for every wallet (comma-separated, see chains.py), per-wallet overrides
+    # (JSON, e.g. {"Trading": ["arbitrum", "base"]}); a wallet's first chain also tracks Hyperliquid
+    CHAINS = [chain.strip().lower() for chain in os.getenv("CHAINS", "ethereum").split(",") if chain.strip()]
+    WALLET_CHAINS = _json_env("WALLET_CHAINS")
+    # Etherscan requests in flight per chain (JSON, default 2 each), shared requests/second across
+    # all chains (0 = unlimited; 5 on the free plan) and threads checking additional chains
+    CHAIN_CONCURRENCY = _json_env("CHAIN_CONCURRENCY")
+    ETHERSCAN_RATE = float(os.getenv("ETHERSCAN_RATE", "0"))
+    CHAIN_WORKERS = int(os.getenv("CHAIN_WORKERS", "8"))
+
+    # Hyperliquid API configuration
+    HYPERLIQUID_API_URL = os.getenv("HYPERLIQUID_API_URL", "https://api.hyperliquid.xyz/info")
+
+    # Telegram configuration
+    TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "YOUR_BOT_TOKEN")
+    TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")  # Optional - bot will accept /start from any user
+    TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "https://api.telegram.org")
+
+    # Alert fan-out: direct (sendMessage per chat), copy/forward (post once to a
+    # staging chat, then copy/forward by message id) or channel (public channel only)
+    TELEGRAM_FANOUT_MODE = os.getenv("TELEGRAM_FANOUT_MODE", "direct").lower()
+    TELEGRAM_STAGING_CHAT_ID = os.getenv("TELEGRAM_STAGING_CHAT_ID", "")
+    TELEGRAM_ALERT_CHANNEL_ID = os.getenv("TELEGRAM_ALERT_CHANNEL_ID", "")
+
+    # Notification settings
+    NOTIFICATION_SETTINGS = {
+        "telegram": {
+            "enabled": True if TELEGRAM_BOT_TOKEN and TELEGRAM_BOT_TOKEN != "YOUR_BOT_TOKEN" else False,
+            "bot_token": TELEGRAM_BOT_TOKEN,
+            "chat_id": TELEGRAM_CHAT_ID,  # Legacy support - not required anymore
+            "api_url": TELEGRAM_API_URL,
+            "fanout_mode": TELEGRAM_FANOUT_MODE,
+            "staging_chat_id": TELEGRAM_STAGING_CHAT_ID,
+            "alert_channel_id": TELEGRAM_ALERT_CHANNEL_ID,
+            # Merge all alerts of a check cycle into one message per subscriber
+            "coalesce": os.getenv("ALERT_COALESCING", "true").lower() == "true",
+            # Hold alerts and send a digest every N seconds instead (0 = every cycle)
+            "digest_interval": int(os.getenv("ALERT_DIGEST_INTERVAL", "0")),
+            # Delivery lanes (messages/second): critical > alert > balance > info
+            "lane_rates": _json_env("TELEGRAM_LANE_RATES"),
+            "global_rate": float(os.getenv("TELEGRAM_GLOBAL_RATE", "30"))  # Telegram allows ~30 messages/second
+        },
+        "console": {
+            "enabled": True
+        }
     }
-}
 
-# Tracking intervals (in seconds)
-CHECK_INTERVAL = 600  # Check every 10 minutes
+    # Tracking intervals (in seconds)
+    CHECK_INTERVAL = 600  # Check every 10 minutes
+
+    # Wallets fetched in parallel at startup (keep within the Etherscan rate limit, 5/s on the free plan)
+    STARTUP_WORKERS = int(os.getenv("STARTUP_WORKERS", "4"))
+
+    # Summaries (/analysis, --check) reuse data fetched within this many seconds
+    SUMMARY_CACHE_TTL = float(os.getenv("SUMMARY_CACHE_TTL", "60"))
+
+    # Thresholds for notifications (USD values use one Hyperliquid allMids fetch per cycle)
+    BALANCE_CHANGE_THRESHOLD = float(os.getenv("BALANCE_CHANGE_THRESHOLD", "0.1"))  # Notify if balance changes more than 0.1 ETH
+    BALANCE_CHANGE_USD = float(os.getenv("BALANCE_CHANGE_USD", "0"))  # Compare balance changes in USD instead (0 = off)
+    POSITION_CHANGE_THRESHOLD = float(os.getenv("POSITION_CHANGE_THRESHOLD", "1000"))  # Notify if a position changes more than $1000 (0 = off)
+    POSITION_CHANGE_PCT = float(os.getenv("POSITION_CHANGE_PCT", "5"))  # Unpriced (or USD threshold off): % of position size
+    TRANSFER_MIN_USD = float(os.getenv("TRANSFER_MIN_USD", "0"))  # Ignore priced transfers worth less than this
+
+    # Alert rules (JSON list, see alert_rules.py) checked before the thresholds above;
+    # ALERT_RULES_FILE adds the rules of a JSON file
+    ALERT_RULES = _json_env("ALERT_RULES", "[]")
+    ALERT_RULES_FILE = os.getenv("ALERT_RULES_FILE", "")
+
+    # Prices: allMids cache lifetime, and fixed USD prices for unlisted assets (JSON, e.g. {"FOO": 0.5})
+    PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "30"))
+    PRICE_OVERRIDES = _json_env("PRICE_OVERRIDES")
+
+    # Critical alerts skip coalescing and jump ahead of other deliveries
+    CRITICAL_MARGIN_USAGE = float(os.getenv("CRITICAL_MARGIN_USAGE", "0.8"))  # Margin usage close to liquidation
+    LARGE_WITHDRAWAL_ETH = float(os.getenv("LARGE_WITHDRAWAL_ETH", "100"))  # Withdrawal size treated as critical
+
+    # Time series of account value, PnL, margin usage and position sizes per wallet
+    # (SQLite with 1m/1h/1d rollups; empty = not recorded). Raw samples are kept this many days
+    HISTORY_DB = os.getenv("HISTORY_DB", "history.db")
+    HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "7"))
+    # Hyperliquid fills/funding are ingested into HISTORY_DB every cycle, starting this many
+    # days back for a wallet without stored fills (realized PnL in position alerts)
+    FILLS_LOOKBACK_DAYS = float(os.getenv("FILLS_LOOKBACK_DAYS", "7"))
+
+    # Liquidation risk: alert when a position gets within these % of its liquidation price,
+    # and recheck wallets in the danger band every RISK_RECHECK_INTERVAL seconds (0 = off)
+    LIQUIDATION_WARNING_PCT = float(os.getenv("LIQUIDATION_WARNING_PCT", "20"))
+    LIQUIDATION_DANGER_PCT = float(os.getenv("LIQUIDATION_DANGER_PCT", "10"))
+    LIQUIDATION_CRITICAL_PCT = float(os.getenv("LIQUIDATION_CRITICAL_PCT", "5"))
+    RISK_RECHECK_INTERVAL = float(os.getenv("RISK_RECHECK_INTERVAL", "30"))
+
+    # Prometheus-style /metrics endpoint (0 = disabled)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+
+    # Tracing: spans of sampled cycles/commands appended as JSON lines (empty = disabled)
+    TRACE_FILE = os.getenv("TRACE_FILE", "")
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
 
-# Thresholds for notifications
-BALANCE_CHANGE_THRESHOLD = 0.1  # Notify if balance changes more than 0.1 ETH
-POSITION_CHANGE_THRESHOLD = 1000  # Notify if position changes more than $1000
+    # Logging: level, text or json lines, and share of per-wallet "No changes" lines kept
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
 
+    # Sharding: split WALLETS across worker processes/containers (0 or 1 = single process)
+    # SHARD_ROLE: "" = this process coordinates SHARD_COUNT local workers,
+    # "coordinator" = workers run elsewhere, "worker" = check shard SHARD_INDEX only
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))
+    SHARD_ROLE = os.getenv("SHARD_ROLE", "").lower()
+    SHARD_INDEX = int(os.getenv("SHARD_INDEX", "0"))
+    # Where the coordinator listens for worker events (and workers connect to)
+    SHARD_HUB_ADDRESS = os.getenv("SHARD_HUB_ADDRESS", "127.0.0.1:50055")
+    SHARD_HUB_AUTHKEY = os.getenv("SHARD_HUB_AUTHKEY", "")
+    # Optional extra Etherscan keys so each shard has its own quota (shard i uses key i % count)
+    ETHERSCAN_API_KEYS = [key.strip() for key in os.getenv("ETHERSCAN_API_KEYS", "").split(",") if key.strip()]
 
-def validate_config():
+    # Token metadata (decimals, symbol, verified/spam) learnt per contract and kept across restarts
+    TOKEN_CACHE_FILE = os.getenv("TOKEN_CACHE_FILE", "token_metadata.json")
+    # Token transfers that raise alerts: spam (drop spam/zero-value), verified (well-known only) or off
+    TOKEN_FILTER = os.getenv("TOKEN_FILTER", "spam").lower()
+    # Extra token contracts to treat as verified (comma-separated)
+    VERIFIED_TOKENS = [token.strip().lower() for token in os.getenv("VERIFIED_TOKENS", "").split(",") if token.strip()]
+
+    # ERC-20 balances of tokens each wallet has touched, read as JSON-RPC batches of
+    # balanceOf calls from an Ethereum node (empty = token balances not tracked)
+    ETH_RPC_URL = os.getenv("ETH_RPC_URL", "")
+    TOKEN_BALANCE_CHANGE_USD = float(os.getenv("TOKEN_BALANCE_CHANGE_USD", "100"))  # Unpriced tokens: TOKEN_BALANCE_CHANGE_PCT
+    TOKEN_BALANCE_CHANGE_PCT = float(os.getenv("TOKEN_BALANCE_CHANGE_PCT", "5"))
+    TOKEN_BALANCE_BATCH_SIZE = int(os.getenv("TOKEN_BALANCE_BATCH_SIZE", "500"))  # balanceOf calls per request
+    TOKEN_BALANCE_WORKERS = int(os.getenv("TOKEN_BALANCE_WORKERS", "4"))  # Batches sent in parallel
+
+    # Replicas: only the holder of the leader lease polls the bot and broadcasts
+    # ("" = off, "file" = flock on a shared volume, "sqlite" = lease row with expiry)
+    LEADER_LEASE = os.getenv("LEADER_LEASE", "").lower()
+    LEADER_LEASE_PATH = os.getenv("LEADER_LEASE_PATH", "leader.lease")
+    LEADER_LEASE_TTL = float(os.getenv("LEADER_LEASE_TTL", "10"))  # Standbys retry every TTL/3 seconds
+    
+    return {name: value for name, value in locals().items() if name.isupper()}
+
+
+_settings = None
+
+
+def load_settings(reload: bool = False) -> Dict[str, Any]:
+    """Load .env and the environment into the configuration constants (cached)"""
+    global _settings
+    if _settings is None or reload:
+        load_dotenv()
+        _settings = _read_settings()
+    return _settings
+
+
+def __getattr__(name: str):
+    # Legacy access (config.WALLETS, from config import ...) loads on first use
+    settings = load_settings()
+    if name in settings:
+        return settings[name]
+    raise AttributeError(f"module 'config' has no attribute '{name}'")
+
+
+def validate_config(settings: Dict[str, Any] = None, require_telegram: bool = True):
     """
     Validate configuration to ensure all required values are set properly.
     Raises ValueError if configuration is invalid.
     """
+    settings = settings or load_settings()
+    wallets = settings["WALLETS"]
+    
     # Check for required environment variables
     required_vars = {
-        "ETHERSCAN_API_KEY": ETHERSCAN_API_KEY,
-        "TELEGRAM_BOT_TOKEN": TELEGRAM_BOT_TOKEN,
+        "ETHERSCAN_API_KEY": settings["ETHERSCAN_API_KEY"],
     }
+    # Sharding workers hand alerts to the coordinator and never talk to Telegram
+    if require_telegram and settings["SHARD_ROLE"] != "worker":
+        required_vars["TELEGRAM_BOT_TOKEN"] = settings["TELEGRAM_BOT_TOKEN"]
     
     # Check wallets
-    if not WALLETS:
-        required_vars["WALLET_ADDRESS"] = WALLET_ADDRESS
+    if not wallets:
+        required_vars["WALLET_ADDRESS"] = settings["WALLET_ADDRESS"]
     
     # TELEGRAM_CHAT_ID is now optional - bot accepts /start from any user
     
@@ -88,12 +241,51 @@ def validate_config():
     errors = []
     
     # Validate wallets
-    if not WALLETS:
+    if not wallets:
         errors.append("❌ No wallets configured. Set WALLETS or WALLET_ADDRESS")
-    else:
-        print(f"✅ Monitoring {len(WALLETS)} wallet(s):")
-        for name, address in WALLETS.items():
-            print(f"   📍 {name}: {address[:6]}...{address[-4:]}")
+    
+    if settings["SHARD_ROLE"] not in ("", "coordinator", "worker"):
+        errors.append(f"❌ SHARD_ROLE must be empty, coordinator or worker (got {settings['SHARD_ROLE']})")
+    elif settings["SHARD_ROLE"]:
+        if settings["SHARD_COUNT"] < 1:
+            errors.append("❌ SHARD_COUNT must be set when SHARD_ROLE is used")
+        elif settings["SHARD_ROLE"] == "worker" and not 0 <= settings["SHARD_INDEX"] < settings["SHARD_COUNT"]:
+            errors.append(f"❌ SHARD_INDEX must be between 0 and {settings['SHARD_COUNT'] - 1}")
+        # The event hub accepts connections from other hosts/containers
+        if not settings["SHARD_HUB_AUTHKEY"]:
+            errors.append("❌ SHARD_HUB_AUTHKEY is not set (required with SHARD_ROLE)")
+    
+    from chains import wallet_chains
+    try:
+        wallet_chains(wallets, settings["CHAINS"], settings["WALLET_CHAINS"])
+    except ValueError as e:
+        errors.append(f"❌ CHAINS/WALLET_CHAINS: {e}")
+    
+    from alert_rules import AlertRules, load_rules
+    try:
+        rules = load_rules(settings["ALERT_RULES"], settings["ALERT_RULES_FILE"])
+        AlertRules(rules)
+        named = set()
+        for rule in rules:
+            named.update(rule["wallet"] if isinstance(rule.get("wallet"), list) else [rule.get("wallet")])
+        unknown = {str(wallet_name) for wallet_name in named if wallet_name is not None and wallet_name not in wallets}
+        if unknown:
+            errors.append(f"❌ ALERT_RULES name unknown wallet(s): {', '.join(sorted(unknown))}")
+    except (ValueError, TypeError) as e:
+        errors.append(f"❌ ALERT_RULES: {e}")
+    
+    if settings["TOKEN_FILTER"] not in ("off", "spam", "verified"):
+        errors.append(f"❌ TOKEN_FILTER must be off, spam or verified (got {settings['TOKEN_FILTER']})")
+    
+    if settings["LEADER_LEASE"] not in ("", "file", "sqlite"):
+        errors.append(f"❌ LEADER_LEASE must be empty, file or sqlite (got {settings['LEADER_LEASE']})")
+    
+    if not settings["LIQUIDATION_WARNING_PCT"] > settings["LIQUIDATION_DANGER_PCT"] > settings["LIQUIDATION_CRITICAL_PCT"] >= 0:
+        errors.append("❌ LIQUIDATION_WARNING_PCT > LIQUIDATION_DANGER_PCT > LIQUIDATION_CRITICAL_PCT must hold")
+    
+    overrides = settings["PRICE_OVERRIDES"]
+    if not isinstance(overrides, dict) or not all(isinstance(v, (int, float)) for v in overrides.values()):
+        errors.append("❌ PRICE_OVERRIDES must be a JSON object of symbol to USD price")
     
     for var_name, var_value in required_vars.items():
         if not var_value:
@@ -115,12 +307,3 @@ def validate_config():
         )
     
     return True
-
-
-# Validate configuration on import
-try:
-    validate_config()
-except ValueError as e:
-    import sys
-    print(str(e))
-    sys.exit(1)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Priority Delivery Queue
+Delivers Telegram messages through prioritized lanes with separate rate
+budgets; a broadcast is queued as one job per chat so higher-priority
+alerts overtake the rest of a lower-priority fan-out
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_CRITICAL = 0  # Liquidation risk, large withdrawals
+PRIORITY_ALERT = 1     # Position and deposit/withdrawal alerts
+PRIORITY_BALANCE = 2   # Balance changes
+PRIORITY_INFO = 3      # Startup summary, /analysis replies
+
+LANE_NAMES = {
+    PRIORITY_CRITICAL: "critical",
+    PRIORITY_ALERT: "alert",
+    PRIORITY_BALANCE: "balance",
+    PRIORITY_INFO: "info"
+}
+
+# Messages per second per lane; Telegram allows ~30/s in total
+DEFAULT_LANE_RATES = {
+    "critical": 30,
+    "alert": 20,
+    "balance": 10,
+    "info": 5
+}
+DEFAULT_GLOBAL_RATE = 30
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class DeliveryTicket:
+    """Tracks the per-chat jobs of one queued message"""
+
+    def __init__(self, label: str, priority: int, total: int, on_done: Callable = None):
+        self.label = label
+        self.priority = priority
+        self.total = total
+        self.success = 0
+        self.failed = 0
+        self.queued_at = time.time()
+        self.on_done = on_done
+        self._done = threading.Event()
+        if total == 0:
+            self._done.set()
+
+    @property
+    def results(self) -> Dict[str, int]:
+        return {"success": self.success, "failed": self.failed, "total": self.total}
+
+    def record(self, delivered: bool):
+        if delivered:
+            self.success += 1
+        else:
+            self.failed += 1
+        if self.success + self.failed >= self.total:
+            self._done.set()
+            if self.on_done:
+                try:
+                    self.on_done(self)
+                except Exception as e:
+                    logger.warning(f"⚠️  Error in delivery callback: {e}")
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class PriorityDeliveryQueue:
+    def __init__(self, lane_rates: Dict[str, float] = None, global_rate: float = DEFAULT_GLOBAL_RATE):
+        rates = dict(DEFAULT_LANE_RATES)
+        rates.update(lane_rates or {})
+        self._lanes: Dict[int, Deque] = {priority: deque() for priority in LANE_NAMES}
+        self._buckets = {priority: TokenBucket(rates[name]) for priority, name in LANE_NAMES.items()}
+        self._global_bucket = TokenBucket(global_rate)
+        self._cond = threading.Condition()
+        self._active = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Start the delivery worker thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Stop the worker, delivering what is queued within the timeout"""
+        self.join(timeout)
+        with self._cond:
+            self.running = False
+            self._cond.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def submit(self, priority: int, jobs: List[Callable[[], bool]], label: str = "message",
+               on_done: Callable = None) -> DeliveryTicket:
+        """Queue one delivery job per chat in the lane of the given priority"""
+        priority = priority if priority in self._lanes else PRIORITY_INFO
+        ticket = DeliveryTicket(label, priority, len(jobs), on_done)
+        with self._cond:
+            lane = self._lanes[priority]
+            for job in jobs:
+                lane.append((ticket, job))
+            self._cond.notify_all()
+        return ticket
+
+    def depth(self, priority: int = None) -> int:
+        """Number of queued jobs in one lane (or all lanes)"""
+        with self._cond:
+            if priority is not None:
+                return len(self._lanes.get(priority, ()))
+            return sum(len(lane) for lane in self._lanes.values())
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait until every queued job has been delivered"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._active or any(self._lanes.values()):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def _next_job(self):
+        """Pick the highest-priority job whose lane and the global budget allow sending now"""
+        while self.running:
+            now = time.monotonic()
+            wait = None
+            global_delay = self._global_bucket.delay(now)
+            for priority in sorted(self._lanes):
+                lane = self._lanes[priority]
+                if not lane:
+                    continue
+                delay = max(self._buckets[priority].delay(now), global_delay)
+                if delay == 0:
+                    self._buckets[priority].take()
+                    self._global_bucket.take()
+                    self._active += 1
+                    return lane.popleft()
+                wait = delay if wait is None else min(wait, delay)
+            # Woken early when a new (possibly higher-priority) job arrives
+            self._cond.wait(wait)
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                item = self._next_job()
+            if item is None:
+                return
+            ticket, job = item
+            try:
+                delivered = bool(job())
+            except Exception as e:
+                logger.warning(
+                    f"⚠️  Delivery job failed: {type(e).__name__}: {e}",
+                    extra={"stage": "deliver", "lane": LANE_NAMES[ticket.priority], "error": type(e).__name__}
+                )
+                delivered = False
+            ticket.record(delivered)
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+History Store
+Account value, unrealized PnL, margin usage and per-coin position size of
+every wallet, sampled each cycle into SQLite. Samples are buffered during a
+cycle and written in one transaction; 1m/1h/1d rollups are updated by the
+same insert (upserts, no rescans), and raw samples expire after
+HISTORY_RETENTION_DAYS so charts and stats read small, pre-aggregated tables.
+Hyperliquid fills and funding payments are kept too (deduped by fill id),
+with per-coin realized PnL, fees and funding totals updated as they arrive
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from message_templates import position_metrics
+
+logger = logging.getLogger(__name__)
+
+# Rollup bucket (seconds) -> days kept (None = forever)
+ROLLUPS = {60: 30, 3600: 365, 86400: None}
+
+# Prune expired rows at most this often
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    wallet TEXT NOT NULL, ts INTEGER NOT NULL,
+    account_value REAL, unrealized_pnl REAL, margin_usage REAL, total_ntl_pos REAL,
+    PRIMARY KEY (wallet, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS position_samples (
+    wallet TEXT NOT NULL, coin TEXT NOT NULL, ts INTEGER NOT NULL,
+    size REAL, position_value REAL,
+    PRIMARY KEY (wallet, coin, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    wallet TEXT NOT NULL, bucket INTEGER NOT NULL, ts INTEGER NOT NULL, count INTEGER NOT NULL,
+    av_open REAL, av_close REAL, av_min REAL, av_max REAL, av_sum REAL,
+    pnl_close REAL, pnl_min REAL, pnl_max REAL, margin_max REAL, ntl_close REAL,
+    PRIMARY KEY (wallet, bucket, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS position_rollups (
+    wallet TEXT NOT NULL, coin TEXT NOT NULL, bucket INTEGER NOT NULL, ts INTEGER NOT NULL,
+    size_close REAL, value_close REAL, value_max REAL,
+    PRIMARY KEY (wallet, coin, bucket, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fills (
+    wallet TEXT NOT NULL, tid INTEGER NOT NULL, ts INTEGER NOT NULL, coin TEXT NOT NULL,
+    side TEXT, dir TEXT, px REAL, sz REAL, closed_pnl REAL, fee REAL,
+    PRIMARY KEY (wallet, tid)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS funding (
+    wallet TEXT NOT NULL, coin TEXT NOT NULL, ts INTEGER NOT NULL, usdc REAL, szi REAL, rate REAL,
+    PRIMARY KEY (wallet, coin, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS realized (
+    wallet TEXT NOT NULL, coin TEXT NOT NULL,
+    closed_pnl REAL NOT NULL, fees REAL NOT NULL, funding REAL NOT NULL, volume REAL NOT NULL, fills INTEGER NOT NULL,
+    PRIMARY KEY (wallet, coin)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cursors (
+    wallet TEXT NOT NULL, kind TEXT NOT NULL, ts INTEGER NOT NULL,
+    PRIMARY KEY (wallet, kind)
+) WITHOUT ROWID;
+"""
+
+ROLLUP_UPSERT = """
+INSERT INTO rollups VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (wallet, bucket, ts) DO UPDATE SET
+    count = count + 1,
+    av_close = excluded.av_close, av_min = min(av_min, excluded.av_min),
+    av_max = max(av_max, excluded.av_max), av_sum = av_sum + excluded.av_sum,
+    pnl_close = excluded.pnl_close, pnl_min = min(pnl_min, excluded.pnl_min),
+    pnl_max = max(pnl_max, excluded.pnl_max), margin_max = max(margin_max, excluded.margin_max),
+    ntl_close = excluded.ntl_close
+"""
+
+POSITION_ROLLUP_UPSERT = """
+INSERT INTO position_rollups VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (wallet, coin, bucket, ts) DO UPDATE SET
+    size_close = excluded.size_close, value_close = excluded.value_close,
+    value_max = max(value_max, excluded.value_max)
+"""
+
+REALIZED_UPSERT = """
+INSERT INTO realized VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (wallet, coin) DO UPDATE SET
+    closed_pnl = closed_pnl + excluded.closed_pnl, fees = fees + excluded.fees,
+    funding = funding + excluded.funding, volume = volume + excluded.volume, fills = fills + excluded.fills
+"""
+
+REALIZED_FIELDS = ("closed_pnl", "fees", "funding", "volume", "fills")
+
+
+def resolution_for(seconds: float) -> int:
+    """Rollup bucket giving a few hundred points over a time range (0 = raw samples)"""
+    if seconds <= 6 * 3600:
+        return 0 if seconds <= 3600 else 60
+    return 3600 if seconds <= 30 * 86400 else 86400
+
+
+class HistoryStore:
+    def __init__(self, path: str = None, retention_days: float = 7):
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self.configure(path, retention_days)
+
+    def configure(self, path: str = None, retention_days: float = 7):
+        """Use the database at path ("" or None = history is not recorded)"""
+        self.path = path or None
+        self.retention_days = retention_days
+        self._last_prune = 0.0
+        # The database is created on first use, so --check leaves no file behind
+        self._created = False
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """One transaction on a connection that is closed afterwards"""
+        if not self._created:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with closing(sqlite3.connect(self.path, timeout=10)) as db:
+                # Shard workers share the file; WAL lets readers run alongside their writes
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(SCHEMA)
+            self._created = True
+        # sqlite3's own context manager commits or rolls back but never closes
+        with closing(sqlite3.connect(self.path, timeout=10)) as db:
+            with db:
+                yield db
+
+    def add(self, wallet_name: str, positions: Optional[Dict], ts: float = None):
+        """Buffer one clearinghouseState sample until the next flush()"""
+        if not self.enabled or not positions or "marginSummary" not in positions:
+            return
+        metrics = position_metrics(positions)
+        coins = []
+        for asset in metrics["asset_positions"]:
+            position = asset.get("position") or {}
+            if position.get("coin"):
+                coins.append((position["coin"], float(position.get("szi", 0)),
+                              float(position.get("positionValue", 0))))
+        with self._lock:
+            self._pending.append((
+                wallet_name, int(ts or time.time()), metrics["account_value"],
+                metrics["total_unrealized_pnl"], metrics["margin_usage"], metrics["total_ntl_pos"], coins
+            ))
+
+    def flush(self):
+        """Write buffered samples and update their rollups in one transaction"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.enabled:
+            return
+        try:
+            with self._connect() as db:
+                for wallet, ts, account_value, pnl, margin_usage, ntl, coins in pending:
+                    inserted = db.execute(
+                        "INSERT OR IGNORE INTO samples VALUES (?, ?, ?, ?, ?, ?)",
+                        (wallet, ts, account_value, pnl, margin_usage, ntl)
+                    ).rowcount
+                    # A second sample within the same second is dropped, not counted twice
+                    if not inserted:
+                        continue
+                    db.executemany(
+                        "INSERT OR IGNORE INTO position_samples VALUES (?, ?, ?, ?, ?)",
+                        [(wallet, coin, ts, size, value) for coin, size, value in coins]
+                    )
+                    for bucket in ROLLUPS:
+                        start = ts - ts % bucket
+                        db.execute(ROLLUP_UPSERT, (
+                            wallet, bucket, start, account_value, account_value, account_value, account_value,
+                            account_value, pnl, pnl, pnl, margin_usage, ntl
+                        ))
+                        db.executemany(POSITION_ROLLUP_UPSERT, [
+                            (wallet, coin, bucket, start, size, value, abs(value)) for coin, size, value in coins
+                        ])
+            if time.time() - self._last_prune > PRUNE_INTERVAL:
+                self.prune()
+        except Exception as e:
+            logger.warning(f"⚠️  Error saving history ({len(pending)} sample(s)): {e}")
+
+    def prune(self):
+        """Drop raw samples, fills and rollups past their retention"""
+        now = time.time()
+        self._last_prune = now
+        with self._connect() as db:
+            cutoff = now - self.retention_days * 86400
+            db.execute("DELETE FROM samples WHERE ts < ?", (cutoff,))
+            db.execute("DELETE FROM position_samples WHERE ts < ?", (cutoff,))
+            # Fills and funding only need to outlive their cursors; realized totals are kept
+            db.execute("DELETE FROM fills WHERE ts < ?", (cutoff * 1000,))
+            db.execute("DELETE FROM funding WHERE ts < ?", (cutoff * 1000,))
+            for bucket, days in ROLLUPS.items():
+                if days is not None:
+                    db.execute("DELETE FROM rollups WHERE bucket = ? AND ts < ?", (bucket, now - days * 86400))
+                    db.execute("DELETE FROM position_rollups WHERE bucket = ? AND ts < ?",
+                               (bucket, now - days * 86400))
+
+    def fill_cursor(self, wallet_name: str, kind: str) -> Optional[int]:
+        """Time (ms) of the newest stored "fills" or "funding" row of a wallet"""
+        if not self.enabled:
+            return None
+        with self._connect() as db:
+            row = db.execute("SELECT ts FROM cursors WHERE wallet = ? AND kind = ?", (wallet_name, kind)).fetchone()
+        return row[0] if row else None
+    
+    def record_fills(self, wallet_name: str, fills: List[Dict], funding: List[Dict]) -> Dict[str, Dict]:
+        """
+        Store userFills/userFunding rows and advance the wallet's cursors in one
+        transaction. Rows already stored are skipped; returns the per-coin
+        closed PnL, fees, funding, volume and fill count of the new ones
+        """
+        new: Dict[str, Dict] = {}
+        if not self.enabled or not (fills or funding):
+            return new
+        
+        def totals(coin: str) -> Dict:
+            return new.setdefault(coin, dict.fromkeys(REALIZED_FIELDS, 0))
+        
+        with self._connect() as db:
+            for fill in fills:
+                px, sz = float(fill.get("px", 0)), float(fill.get("sz", 0))
+                closed_pnl, fee = float(fill.get("closedPnl", 0)), float(fill.get("fee", 0))
+                if db.execute(
+                    "INSERT OR IGNORE INTO fills VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (wallet_name, fill["tid"], fill["time"], fill["coin"], fill.get("side"), fill.get("dir"),
+                     px, sz, closed_pnl, fee)
+                ).rowcount:
+                    coin = totals(fill["coin"])
+                    coin["closed_pnl"] += closed_pnl
+                    coin["fees"] += fee
+                    coin["volume"] += px * sz
+                    coin["fills"] += 1
+            for payment in funding:
+                delta = payment.get("delta") or {}
+                usdc = float(delta.get("usdc", 0))
+                if db.execute(
+                    "INSERT OR IGNORE INTO funding VALUES (?, ?, ?, ?, ?, ?)",
+                    (wallet_name, delta.get("coin", ""), payment["time"], usdc, float(delta.get("szi", 0)),
+                     float(delta.get("fundingRate", 0)))
+                ).rowcount:
+                    totals(delta.get("coin", ""))["funding"] += usdc
+            
+            db.executemany(REALIZED_UPSERT, [
+                (wallet_name, coin, *(values[field] for field in REALIZED_FIELDS)) for coin, values in new.items()
+            ])
+            for kind, rows in (("fills", fills), ("funding", funding)):
+                if rows:
+                    db.execute(
+                        "INSERT INTO cursors VALUES (?, ?, ?) "
+                        "ON CONFLICT (wallet, kind) DO UPDATE SET ts = max(ts, excluded.ts)",
+                        (wallet_name, kind, max(row["time"] for row in rows))
+                    )
+        return new
+    
+    def realized(self, wallet_name: str) -> Dict[str, Dict]:
+        """Per-coin closed PnL, fees, funding, volume and fill count of a wallet since ingestion began"""
+        if not self.enabled:
+            return {}
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT coin, closed_pnl, fees, funding, volume, fills FROM realized WHERE wallet = ?", (wallet_name,)
+            ).fetchall()
+        return {coin: dict(zip(REALIZED_FIELDS, values)) for coin, *values in rows}
+    
+    def last_sample(self, wallet_name: str) -> Optional[int]:
+        """Time of a wallet's newest sample (changes whenever new data is recorded)"""
+        if not self.enabled:
+            return None
+        with self._connect() as db:
+            return db.execute("SELECT max(ts) FROM samples WHERE wallet = ?", (wallet_name,)).fetchone()[0]
+
+    def series(self, wallet_name: str, start: float, end: float = None, bucket: int = None) -> List[Dict]:
+        """
+        Account value/PnL points of a wallet between start and end, from raw
+        samples (bucket 0) or a rollup (60, 3600, 86400; chosen from the range
+        by default)
+        """
+        if not self.enabled:
+            return []
+        end = end or time.time()
+        bucket = resolution_for(end - start) if bucket is None else bucket
+        with self._connect() as db:
+            if bucket == 0:
+                rows = db.execute(
+                    "SELECT ts, account_value, account_value, account_value, account_value, unrealized_pnl, "
+                    "margin_usage, total_ntl_pos "
+                    "FROM samples WHERE wallet = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                    (wallet_name, int(start), int(end))
+                ).fetchall()
+            else:
+                rows = db.execute(
+                    "SELECT ts, av_open, av_close, av_min, av_max, pnl_close, margin_max, ntl_close "
+                    "FROM rollups WHERE wallet = ? AND bucket = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                    (wallet_name, bucket, int(start) - int(start) % bucket, int(end))
+                ).fetchall()
+        return [
+            {"ts": ts, "account_value_open": open_value, "account_value": value, "account_value_min": low,
+             "account_value_max": high, "unrealized_pnl": pnl, "margin_usage": margin, "total_ntl_pos": ntl}
+            for ts, open_value, value, low, high, pnl, margin, ntl in rows
+        ]
+
+    def stats(self, wallet_name: str, since: float) -> Optional[Dict]:
+        """Account value change, range and latest PnL of a wallet since a time"""
+        points = self.series(wallet_name, since)
+        if not points:
+            return None
+        first, last = points[0], points[-1]
+        return {
+            "since": first["ts"],
+            "until": last["ts"],
+            "samples": len(points),
+            "account_value": last["account_value"],
+            "change": last["account_value"] - first["account_value_open"],
+            "change_pct": ((last["account_value"] / first["account_value_open"] - 1) * 100)
+            if first["account_value_open"] else 0,
+            "high": max(point["account_value_max"] for point in points),
+            "low": min(point["account_value_min"] for point in points),
+            "unrealized_pnl": last["unrealized_pnl"]
+        }
+
+    def position_sizes(self, wallet_name: str, start: float, end: float = None, bucket: int = None) -> Dict[str, List]:
+        """Per-coin (ts, size, position value) points between start and end"""
+        if not self.enabled:
+            return {}
+        end = end or time.time()
+        bucket = resolution_for(end - start) if bucket is None else bucket
+        with self._connect() as db:
+            if bucket == 0:
+                rows = db.execute(
+                    "SELECT coin, ts, size, position_value FROM position_samples "
+                    "WHERE wallet = ? AND ts BETWEEN ? AND ? ORDER BY coin, ts",
+                    (wallet_name, int(start), int(end))
+                ).fetchall()
+            else:
+                rows = db.execute(
+                    "SELECT coin, ts, size_close, value_close FROM position_rollups "
+                    "WHERE wallet = ? AND bucket = ? AND ts BETWEEN ? AND ? ORDER BY coin, ts",
+                    (wallet_name, bucket, int(start) - int(start) % bucket, int(end))
+                ).fetchall()
+        sizes: Dict[str, List] = {}
+        for coin, ts, size, value in rows:
+            sizes.setdefault(coin, []).append((ts, size, value))
+        return sizes
+
+
+HISTORY = HistoryStore()
+
+
+def configure_history(path: str = None, retention_days: float = 7) -> HistoryStore:
+    """Point the shared store at its database (flushed after each cycle)"""
+    HISTORY.configure(path, retention_days)
+    return HISTORY
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+JSON Stream
+Decoding helpers for upstream responses: orjson when it is installed, and
+an incremental parser that reads a JSON object chunk by chunk and stops
+after the first rows of a large array (e.g. an Etherscan txlist), so the
+rest of the body is neither downloaded nor turned into dicts
+"""
+
+import codecs
+import json
+from typing import Any, Dict, Iterable, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # Optional faster decoder
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson else "json"
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a complete JSON document with the fastest available backend"""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _ChunkReader:
+    """Text buffer over an iterable of byte chunks that is refilled on demand"""
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next chunk; False at the end of the body"""
+        if self.eof:
+            return False
+        # Drop what has been consumed so the buffer stays about one chunk long
+        if self.pos > 65536:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            text = chunk if isinstance(chunk, str) else self._utf8.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at the end of the body)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of JSON stream")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more chunks as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+
+def load_object(chunks: Iterable[Union[bytes, str]], array_key: str = "result",
+                limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Parse a JSON object from byte chunks. If the value of array_key is an
+    array, only its first `limit` items are decoded and parsing stops there
+    (keys after it are not read); other values are decoded in full.
+    """
+    reader = _ChunkReader(chunks)
+    result: Dict[str, Any] = {}
+    reader.expect("{")
+    if reader.peek() == "}":
+        return result
+
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == array_key and limit is not None and reader.peek() == "[":
+            reader.pos += 1
+            items = result[key] = []
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while len(items) < limit:
+                    items.append(reader.value())
+                    separator = reader.peek()
+                    reader.pos += 1
+                    if separator == "]":
+                        break
+                    if separator != ",":
+                        raise ValueError(f"Expected ',' or ']' at offset {reader.pos - 1} of JSON stream")
+                else:
+                    # Enough rows: leave the rest of the body unread
+                    return result
+        else:
+            result[key] = reader.value()
+
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == "}":
+            return result
+        if separator != ",":
+            raise ValueError(f"Expected ',' or '}}' at offset {reader.pos - 1} of JSON stream")
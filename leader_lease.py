@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Leader Lease
+Lets several replicas of the monitor share one deployment: only the replica
+holding the lease polls the Telegram bot and broadcasts alerts, the others
+keep checking wallets as hot standbys and take over when the leader dies.
+
+Backends:
+- file: flock() on a file in the shared data volume. The kernel drops the
+  lock the moment the leader process exits, so failover takes one retry
+  interval. Needs all replicas on one host (local volume, not NFS).
+- sqlite: a lease row with an expiry that the leader renews. A crashed or
+  hung leader is replaced once the lease expires.
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the sqlite backend is available
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+LEASE_BACKENDS = ("file", "sqlite")
+
+
+def holder_id() -> str:
+    """Identifies this replica in the lease (host:pid:random)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class FileLease:
+    def __init__(self, path: str, holder: str = None):
+        self.path = path
+        self.holder = holder or holder_id()
+        self._fd = None
+
+    def acquire(self) -> bool:
+        """Take or keep the lease; False while another replica holds it"""
+        if self._fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        # Who holds the lock, for humans looking at the volume
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{self.holder}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+class SQLiteLease:
+    def __init__(self, path: str, ttl: float = 10.0, name: str = "leader", holder: str = None):
+        self.path = path
+        self.ttl = ttl
+        self.name = name
+        self.holder = holder or holder_id()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # sqlite3's own context manager only commits; closing() also closes the connection
+        with closing(self._connect()) as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+    def acquire(self) -> bool:
+        """Take, renew or keep waiting for the lease (expired leases can be taken over)"""
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute("SELECT holder, expires_at FROM lease WHERE name = ?", (self.name,)).fetchone()
+            if row and row[0] != self.holder and row[1] > now:
+                db.execute("COMMIT")
+                return False
+            db.execute(
+                "INSERT OR REPLACE INTO lease (name, holder, expires_at) VALUES (?, ?, ?)",
+                (self.name, self.holder, now + self.ttl)
+            )
+            db.execute("COMMIT")
+            return True
+        finally:
+            db.close()
+
+    def release(self):
+        with closing(self._connect()) as db:
+            db.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (self.name, self.holder))
+
+
+class LeaderElector:
+    """
+    Keeps trying to take (or renew) the lease in a background thread and
+    reports changes of leadership through the callbacks
+    """
+
+    def __init__(self, lease, interval: float = 3.0, on_elected: Callable[[], None] = None,
+                 on_demoted: Callable[[], None] = None):
+        self.lease = lease
+        self.interval = interval
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.is_leader = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _update(self):
+        try:
+            leader = self.lease.acquire()
+        except Exception as e:
+            # Can't confirm the lease: stepping down is safer than broadcasting twice
+            logger.warning(f"⚠️  Leader lease check failed: {e}")
+            leader = False
+
+        if leader == self.is_leader:
+            return
+        self.is_leader = leader
+        if leader:
+            logger.info(f"👑 Leader lease acquired ({self.lease.holder})")
+            callback = self.on_elected
+        else:
+            logger.warning("💤 Leader lease lost, switching to standby")
+            callback = self.on_demoted
+        if callback:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"❌ Error switching leadership: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._update()
+
+    def start(self) -> "LeaderElector":
+        """First attempt happens right away so the caller knows its role"""
+        self._update()
+        if not self.is_leader:
+            logger.info("💤 Another replica holds the leader lease, running as standby")
+        self._thread = threading.Thread(target=self._run, name="leader-lease", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 5)
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                self.lease.release()
+            except Exception as e:
+                logger.warning(f"⚠️  Error releasing leader lease: {e}")
+
+
+def create_lease(backend: str, path: str, ttl: float = 10.0):
+    """Lease for the LEADER_LEASE backend (None when leader election is off)"""
+    if not backend:
+        return None
+    if backend not in LEASE_BACKENDS:
+        raise ValueError(f"Unknown leader lease backend '{backend}' (use file or sqlite)")
+    if backend == "file":
+        if fcntl is None:
+            raise ValueError("The file leader lease needs fcntl (not available on Windows), use sqlite")
+        return FileLease(path)
+    return SQLiteLease(path, ttl=ttl)
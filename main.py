@@ -4,257 +4,803 @@ Crypto Wallet Tracker
 Monitors Ethereum wallet and Hyperliquid positions for changes
 """
 
+import logging
+import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import schedule
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
 from wallet_tracker import WalletTracker
-from notification_system import NotificationSystem
+from message_templates import MessageTemplates, position_change_notional, position_metrics
+from metrics import (
+    CYCLE_DURATION, WALLET_CHECK_DURATION, ALERTS, WALLETS as WALLETS_GAUGE, STARTUP_DURATION,
+    start_metrics_server
+)
+from tracing import bind, configure_tracing, span
+from structured_logging import setup_logging
+from leader_lease import LeaderElector, create_lease
+from token_metadata import TOKENS, configure_token_cache
+from price_service import PRICES, configure_prices
+from token_balances import create_reader
+from risk_monitor import RiskMonitor
+from history_store import HISTORY, configure_history
+from chains import CHAINS, DEFAULT_CHAIN, RequestQuota, wallet_chains
+from alert_rules import RULES, configure_rules
 try:
     from secure_config import load_config, save_transaction_log
 except ImportError:
     # Fallback to old config if secure_config is not available
     from utils import load_config, save_transaction_log
 
+logger = logging.getLogger(__name__)
+
 class CryptoWalletMonitor:
-    def __init__(self):
-        self.config = load_config()
-        self.wallets = self.config.get("wallets", {})
+    def __init__(self, config: dict = None, wallets: dict = None):
+        self.created_at = time.perf_counter()
+        self.config = config or load_config()
+        setup_logging(self.config["log_level"], self.config["log_format"], self.config["log_sample_rate"])
+        # A sharding worker only monitors its own share of the configured wallets
+        self.wallets = wallets if wallets is not None else self.config.get("wallets", {})
+        self.templates = MessageTemplates(self.wallets)
+        self.check_interval = self.config["check_interval"]
         
-        # Create trackers for each wallet
+        # One connection pool and Etherscan quota shared by every wallet and chain
+        self.http = requests.Session()
+        pool_size = max(10, self.config["chain_workers"] + self.config["startup_workers"])
+        self.http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_size))
+        self.http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_size))
+        self.quota = RequestQuota(self.config["etherscan_rate"], self.config["chain_concurrency"])
+        
+        # Create trackers for each wallet: its first chain (with Hyperliquid positions) in
+        # self.trackers, further chains (balance and transfers) in self.chain_trackers
+        self.wallet_chains = wallet_chains(self.wallets, self.config["chains"], self.config["wallet_chains"])
         self.trackers = {}
+        self.chain_trackers: Dict[str, Dict[str, WalletTracker]] = {}
         for wallet_name, wallet_address in self.wallets.items():
-            self.trackers[wallet_name] = WalletTracker(
-                wallet_address, 
-                self.config["etherscan_api_key"]
-            )
+            first_chain, *other_chains = self.wallet_chains[wallet_name]
+            self.trackers[wallet_name] = self._create_tracker(wallet_name, wallet_address, first_chain)
+            if other_chains:
+                self.chain_trackers[wallet_name] = {
+                    chain: self._create_tracker(wallet_name, wallet_address, chain, track_positions=False)
+                    for chain in other_chains
+                }
+        # Additional chains are checked on this pool while the first-chain loop runs
+        self._chain_pool = None
         
-        # Pass wallets to notification system
-        self.notifier = NotificationSystem(
-            self.config["notification_settings"],
-            wallets=self.wallets
+        # ERC-20 balances of all wallets are read in bulk once per cycle (off without ETH_RPC_URL)
+        self.token_balance_reader = create_reader(
+            self.config["eth_rpc_url"],
+            self.config["token_balance_batch_size"],
+            self.config["token_balance_workers"]
         )
-        self.check_interval = self.config["check_interval"]
+        self._token_balances = {}
+        
+        # Liquidation distance tiers; wallets in the danger band are rechecked more often
+        self.risk = RiskMonitor(
+            self.config["liquidation_warning_pct"] / 100,
+            self.config["liquidation_danger_pct"] / 100,
+            self.config["liquidation_critical_pct"] / 100
+        )
+        self.risk_recheck_interval = self.config["risk_recheck_interval"]
+        # Wallets whose fills were synced by this process; the first sync seeds the cursors silently
+        self._fills_synced = set()
+        # Rendered /chart images (chart_renderer.ChartCache, created on first request)
+        self._charts = None
+        
+        # Notifications and the Telegram bot start on first use (not for --check); the lock
+        # keeps the lease and schedule threads from creating two (two getUpdates pollers)
+        self._notifier = None
+        self._notifier_lock = threading.Lock()
+        # Leader election between replicas (start_monitoring, LEADER_LEASE)
+        self.leader = None
         
-        print(f"🚀 Starting Multi-Wallet Tracker")
-        print(f"📍 Monitoring {len(self.wallets)} wallet(s):")
+        configure_tracing(self.config["trace_file"], self.config["trace_sample_rate"])
+        configure_token_cache(
+            self.config["token_cache_file"],
+            self.config["verified_tokens"],
+            self.config["token_filter"]
+        )
+        configure_prices(
+            self.config["hyperliquid_api_url"],
+            self.config["price_cache_ttl"],
+            self.config["price_overrides"],
+            session=self.http
+        )
+        configure_history(self.config["history_db"], self.config["history_retention_days"])
+        configure_rules(self.config)
+        
+        logger.info(f"🚀 Starting Multi-Wallet Tracker")
+        logger.info(f"📍 Monitoring {len(self.wallets)} wallet(s):")
         for name, address in self.wallets.items():
-            print(f"   • {name}: {address[:6]}...{address[-4:]}")
-        print(f"⏰ Check interval: {self.check_interval} seconds")
-        
-        # Show bot status
-        if self.notifier.bot_manager:
-            subscriber_count = self.notifier.bot_manager.get_subscriber_count()
-            print(f"🤖 Telegram Bot: Active ({subscriber_count} subscribers)")
-            print(f"💡 Users can send /start to subscribe to notifications")
+            logger.info(f"   • {name}: {address[:6]}...{address[-4:]}")
+        logger.info(f"⏰ Check interval: {self.check_interval} seconds")
+        if RULES.count:
+            logger.info(f"📐 {RULES.count} alert rule(s) loaded")
+    
+    def _create_tracker(self, wallet_name: str, wallet_address: str, chain: str, track_positions: bool = True) -> WalletTracker:
+        return WalletTracker(
+            wallet_address, 
+            self.config["etherscan_api_key"],
+            base_url=self.config["etherscan_api_url"],
+            hyperliquid_url=self.config["hyperliquid_api_url"],
+            cache_ttl=self.config["summary_cache_ttl"],
+            wallet_name=wallet_name,
+            transfer_lookback=self.check_interval,
+            chain=chain,
+            track_positions=track_positions,
+            session=self.http,
+            quota=self.quota
+        )
+    
+    @property
+    def notifier(self):
+        """Notification system, created (and the bot started) on first use"""
+        if self._notifier is not None:
+            return self._notifier
+        with self._notifier_lock:
+            if self._notifier is not None:
+                return self._notifier
+            from notification_system import NotificationSystem
             
-            # Set bot callbacks
-            self.notifier.bot_manager.on_new_subscriber = self.send_analysis_to_new_subscriber
-            self.notifier.bot_manager.on_analysis_request = self.send_analysis_to_new_subscriber
+            # Pass wallets to notification system (a standby replica doesn't poll the bot)
+            notifier = NotificationSystem(
+                self.config["notification_settings"],
+                wallets=self.wallets,
+                start_polling=self.is_leader,
+                wallet_chains=self.wallet_chains
+            )
             
-            # Set callback for new subscribers
-            self.notifier.bot_manager.on_new_subscriber = self.send_analysis_to_new_subscriber
-        else:
-            print(f"📵 Telegram notifications: Disabled")
+            # Show bot status
+            if notifier.bot_manager:
+                subscriber_count = notifier.bot_manager.get_subscriber_count()
+                logger.info(f"🤖 Telegram Bot: Active ({subscriber_count} subscribers)")
+                logger.info(f"💡 Users can send /start to subscribe to notifications")
+                
+                # Set bot callbacks
+                notifier.bot_manager.on_new_subscriber = self.send_analysis_to_new_subscriber
+                notifier.bot_manager.on_analysis_request = self.send_analysis_to_new_subscriber
+                notifier.bot_manager.on_portfolio_request = self.send_portfolio
+                notifier.bot_manager.on_chart_request = self.send_chart
+                notifier.bot_manager.check_interval = self.check_interval
+            else:
+                logger.info(f"📵 Telegram notifications: Disabled")
+            # Published only once complete; readers outside the lock see it fully set up
+            self._notifier = notifier
+            return notifier
+    
+    @property
+    def is_leader(self) -> bool:
+        """Whether this replica broadcasts alerts (always, without LEADER_LEASE)"""
+        return self.leader is None or self.leader.is_leader
+    
+    def _on_elected(self):
+        # A standby that never needed the notifier creates it (and starts polling) now;
+        # start_polling() reloads the subscribers the previous leader saved
+        bot_manager = self.notifier.bot_manager
+        if bot_manager and not bot_manager.running:
+            bot_manager.start_polling()
+    
+    def _on_demoted(self):
+        if self._notifier and self._notifier.bot_manager:
+            self._notifier.bot_manager.stop_polling()
+    
+    def start_leader_election(self):
+        """Join the leader election if LEADER_LEASE is set"""
+        lease = create_lease(
+            self.config["leader_lease"],
+            self.config["leader_lease_path"],
+            self.config["leader_lease_ttl"]
+        )
+        if lease is None:
+            return
+        self.leader = LeaderElector(
+            lease,
+            interval=self.config["leader_lease_ttl"] / 3,
+            on_elected=self._on_elected,
+            on_demoted=self._on_demoted
+        ).start()
         
     def check_wallet_changes(self):
         """Main check function for all wallets"""
+        started = time.perf_counter()
         try:
-            print(f"\n🔍 Checking {len(self.wallets)} wallet(s) at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            logger.info(f"🔍 Checking {len(self.wallets)} wallet(s) at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            # Collect alerts of this cycle so each subscriber gets one message
+            self.notifier.begin_batch()
             
             # Check each wallet
-            for wallet_name, tracker in self.trackers.items():
-                self._check_single_wallet(wallet_name, tracker)
+            with CYCLE_DURATION.time(), span("check_cycle", wallets=len(self.trackers)):
+                self.prepare_cycle()
+                chain_checks = self.start_chain_checks()
+                for wallet_name, tracker in self.trackers.items():
+                    with WALLET_CHECK_DURATION.time(wallet=wallet_name), span("check_wallet", wallet=wallet_name):
+                        self._check_single_wallet(wallet_name, tracker)
+                for wallet_name, events in self.finish_chain_checks(chain_checks).items():
+                    self._deliver_wallet_events(wallet_name, events, started)
+                
+                # Send merged alerts once every wallet has been checked
+                with span("flush_alerts"):
+                    self.notifier.end_batch()
+                PRICES.release()
             
-            print("✅ All wallet checks completed")
+            # Keep tokens learnt and samples recorded this cycle
+            TOKENS.save()
+            HISTORY.flush()
+            
+            logger.info(
+                "✅ All wallet checks completed",
+                extra={"stage": "cycle", "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+            )
             
         except Exception as e:
-            print(f"❌ Error during wallet check: {e}")
+            logger.error(f"❌ Error during wallet check: {e}", extra={"stage": "cycle", "error": type(e).__name__})
+            PRICES.release()
+            self.notifier.end_batch()
+    
+    def prepare_cycle(self):
+        """Bulk reads shared by every wallet of a cycle: prices, then token balances"""
+        # One price snapshot for every wallet, token and position of the cycle (released when it ends)
+        PRICES.refresh()
+        if self.token_balance_reader is None:
+            return
+        # ETH_RPC_URL is an Ethereum node; other chains' tokens aren't read
+        pairs = [(tracker.wallet_address, contract)
+                 for tracker in self.trackers.values() if tracker.chain == DEFAULT_CHAIN
+                 for contract in tracker.tokens_held]
+        if not pairs:
+            return
+        with span("token_balances", calls=len(pairs)):
+            raw = self.token_balance_reader.fetch(pairs)
+        balances = {}
+        for wallet_name, tracker in self.trackers.items():
+            if tracker.chain != DEFAULT_CHAIN:
+                continue
+            balances[wallet_name] = {contract: raw[(tracker.wallet_address, contract)]
+                                     for contract in tracker.tokens_held
+                                     if (tracker.wallet_address, contract) in raw}
+        self._token_balances = balances
+    
+    def start_chain_checks(self) -> list:
+        """Submit this cycle's checks of additional chains; they run alongside the first-chain loop"""
+        if not self.chain_trackers:
+            return []
+        if self._chain_pool is None:
+            self._chain_pool = ThreadPoolExecutor(
+                max_workers=max(1, self.config["chain_workers"]), thread_name_prefix="chains"
+            )
+        # Chain checks are spans of this cycle's trace, not traces of their own
+        check_chain = bind(self.check_chain)
+        return [
+            (wallet_name, self._chain_pool.submit(check_chain, wallet_name, tracker))
+            for wallet_name, trackers in self.chain_trackers.items() for tracker in trackers.values()
+        ]
+    
+    def finish_chain_checks(self, chain_checks: list) -> Dict[str, list]:
+        """Wait for start_chain_checks() and return their events per wallet"""
+        events = {}
+        for wallet_name, future in chain_checks:
+            wallet_events = future.result()
+            if wallet_events:
+                events.setdefault(wallet_name, []).extend(wallet_events)
+        return events
+    
+    def check_chain(self, wallet_name: str, tracker: WalletTracker) -> list:
+        """Fetch and diff a wallet on one of its additional chains; returns its alert events"""
+        try:
+            with span("check_chain", wallet=wallet_name, chain=tracker.chain):
+                return self.collect_chain_events(wallet_name, tracker)
+        except Exception as e:
+            logger.error(
+                f"   ❌ Error checking {wallet_name} on {tracker.chain}: {e}",
+                extra={"wallet": wallet_name, "chain": tracker.chain, "stage": "check", "error": type(e).__name__}
+            )
+            return []
     
     def _check_single_wallet(self, wallet_name: str, tracker: WalletTracker):
-        """Check a single wallet for changes"""
+        """Check a single wallet for changes and deliver its alerts"""
+        started = time.perf_counter()
+        self._deliver_wallet_events(wallet_name, self.check_wallet(wallet_name, tracker), started)
+    
+    def _deliver_wallet_events(self, wallet_name: str, events: list, started: float):
+        if not events:
+            return
+        if not self.is_leader:
+            # Standby replicas keep their baselines current; the leader sends the alerts
+            logger.info(
+                f"   💤 {wallet_name}: {len(events)} change(s) left to the leader",
+                extra={"wallet": wallet_name, "stage": "diff", "sample": True}
+            )
+            return
         try:
-            print(f"   Checking {wallet_name}...")
-            
-            # Check balance changes
-            balance_changed, current_balance, change = tracker.check_balance_change()
-            if balance_changed:
-                message = self.notifier.format_balance_change(
-                    tracker.last_known_balance - change, 
-                    current_balance, 
-                    change,
-                    wallet_name=wallet_name
-                )
-                self.notifier.send_notification(message, f"BALANCE CHANGE - {wallet_name}")
-                save_transaction_log({
-                    "wallet_name": wallet_name,
-                    "type": "balance_change",
-                    "old_balance": tracker.last_known_balance - change,
-                    "new_balance": current_balance,
-                    "change": change
-                })
+            for event in events:
+                self.deliver_event(event)
             
-            # Check position changes
-            positions_changed, positions, change_type = tracker.check_position_changes()
-            if positions_changed:
-                message = self.notifier.format_position_change(
-                    positions, 
+            event_types = [event["event_type"] for event in events]
+            logger.info(
+                f"   📢 {wallet_name}: Notification sent ({', '.join(event_types)})",
+                extra={
+                    "wallet": wallet_name, "stage": "deliver", "events": event_types,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+                }
+            )
+        except Exception as e:
+            logger.error(
+                f"   ❌ Error delivering alerts for {wallet_name}: {e}",
+                extra={"wallet": wallet_name, "stage": "deliver", "error": type(e).__name__}
+            )
+    
+    def check_wallet(self, wallet_name: str, tracker: WalletTracker) -> list:
+        """Fetch and diff a single wallet; returns its alert events (empty on error)"""
+        started = time.perf_counter()
+        try:
+            logger.debug(f"   Checking {wallet_name}...", extra={"wallet": wallet_name, "stage": "check"})
+            events = self.collect_wallet_events(wallet_name, tracker)
+        except Exception as e:
+            logger.error(
+                f"   ❌ Error checking {wallet_name}: {e}",
+                extra={"wallet": wallet_name, "stage": "check", "error": type(e).__name__}
+            )
+            return []
+        
+        if not events:
+            # One line per wallet per cycle; sampled by LOG_SAMPLE_RATE
+            logger.info(
+                f"   ✅ {wallet_name}: No changes",
+                extra={
+                    "wallet": wallet_name, "stage": "diff", "sample": True,
+                    "latency_ms": round((time.perf_counter() - started) * 1000, 1)
+                }
+            )
+        return events
+    
+    def collect_wallet_events(self, wallet_name: str, tracker: WalletTracker) -> list:
+        """
+        Diff balance, positions and transfers of a wallet against its last
+        check. Each change becomes a plain dict (rendered message, routing
+        fields and transaction log entry) so it can be delivered here or
+        sent to a sharding coordinator (see sharding.py)
+        """
+        events = []
+        
+        # Check balance changes
+        balance_event = self._balance_event(wallet_name, tracker)
+        if balance_event:
+            events.append(balance_event)
+        
+        # Check position changes
+        previous_positions = tracker.last_known_positions
+        snapshot_ms = int(time.time() * 1000)
+        with span("position.fetch_diff", wallet=wallet_name) as stage:
+            position_alert, positions, change_type = tracker.check_position_changes()
+            if stage:
+                stage.set_attribute("change_type", change_type)
+        # Synced every cycle, so these are the fills/funding since the previous position
+        # snapshot: the realized result of what changed (if it alerts)
+        realized = self.sync_fills(wallet_name, tracker, until_ms=snapshot_ms)
+        if position_alert:
+            with span("position.format", wallet=wallet_name):
+                message = self.templates.render_position_change(
+                    positions,
                     change_type,
-                    wallet_name=wallet_name
-                )
-                self.notifier.send_notification(message, f"POSITION {change_type.upper()} - {wallet_name}")
-                save_transaction_log({
+                    wallet_name,
+                    realized=realized
+                ).text
+            events.append({
+                "event_type": "position",
+                "wallet_name": wallet_name,
+                "title": f"POSITION {change_type.upper()} - {wallet_name}",
+                "message": message,
+                # Size of the change, not the account's total open notional
+                "usd_value": position_change_notional(previous_positions, positions),
+                # Critical rules (by default margin usage close to liquidation)
+                "critical": position_alert == "critical",
+                "log": {
                     "wallet_name": wallet_name,
                     "type": "position_change",
                     "change_type": change_type,
-                    "positions": positions
-                })
-            
-            # Check for deposit/withdrawal transactions
-            has_deposit_withdrawal, deposit_txs = tracker.check_deposit_withdrawal()
-            if has_deposit_withdrawal:
-                message = self.notifier.format_deposit_withdrawal(
-                    deposit_txs,
-                    wallet_name=wallet_name
-                )
-                self.notifier.send_notification(message, f"DEPOSIT/WITHDRAWAL - {wallet_name}")
-                save_transaction_log({
+                    "positions": positions,
+                    "realized": realized
+                }
+            })
+        
+        # Every cycle's account value/PnL/sizes go to the time-series store
+        HISTORY.add(wallet_name, positions)
+        
+        # Check how close positions are to liquidation at current mids
+        with span("risk.assess", wallet=wallet_name):
+            risks = self.risk.assess(wallet_name, positions)
+        if risks:
+            events.append(self._risk_event(wallet_name, risks))
+        
+        # Check for deposit/withdrawal transactions
+        deposit_event, deposit_txs = self._deposit_event(wallet_name, tracker)
+        if deposit_event:
+            events.append(deposit_event)
+        
+        # Check ERC-20 balances read for this cycle (prepare_cycle)
+        token_balances = self._token_balances.pop(wallet_name, None)
+        if token_balances:
+            with span("token_balance.diff", wallet=wallet_name):
+                changes = tracker.check_token_balances(token_balances)
+                # Transfers just alerted above already explain these
+                transferred = {tx.get("contractAddress", "").lower() for tx in deposit_txs}
+                changes = [change for change in changes if change["contract"] not in transferred]
+            if changes:
+                with span("token_balance.format", wallet=wallet_name):
+                    message = self.templates.render_token_balance_change(changes, wallet_name).text
+                events.append({
+                    "event_type": "balance",
                     "wallet_name": wallet_name,
-                    "type": "deposit_withdrawal",
-                    "transactions": deposit_txs
+                    "title": f"TOKEN BALANCE CHANGE - {wallet_name}",
+                    "message": message,
+                    "usd_value": sum(abs(change["usd_value"] or 0) for change in changes) or None,
+                    "critical": any(change["alert"] == "critical" for change in changes),
+                    "log": {
+                        "wallet_name": wallet_name,
+                        "type": "token_balance_change",
+                        "changes": changes
+                    }
                 })
-            
-            if not (balance_changed or positions_changed or has_deposit_withdrawal):
-                print(f"      ✅ No changes")
-            else:
-                print(f"      📢 Notification sent")
-            
+        
+        return events
+    
+    def collect_chain_events(self, wallet_name: str, tracker: WalletTracker) -> list:
+        """Balance and transfer events of a wallet on one of its additional chains"""
+        events = []
+        balance_event = self._balance_event(wallet_name, tracker)
+        if balance_event:
+            events.append(balance_event)
+        deposit_event, _ = self._deposit_event(wallet_name, tracker)
+        if deposit_event:
+            events.append(deposit_event)
+        return events
+    
+    def _chain_label(self, wallet_name: str, tracker: WalletTracker) -> str:
+        """Chain shown in a wallet's alerts ("" for wallets only tracked on Ethereum)"""
+        if self.wallet_chains.get(wallet_name, [DEFAULT_CHAIN]) == [DEFAULT_CHAIN]:
+            return ""
+        return CHAINS[tracker.chain]["label"]
+    
+    def _balance_event(self, wallet_name: str, tracker: WalletTracker) -> Optional[dict]:
+        """Native balance change of a wallet's tracker, if significant"""
+        with span("balance.fetch_diff", wallet=wallet_name, chain=tracker.chain) as stage:
+            balance_alert, current_balance, change = tracker.check_balance_change()
+            if stage:
+                stage.set_attribute("changed", bool(balance_alert))
+        if not balance_alert:
+            return None
+        chain = self._chain_label(wallet_name, tracker)
+        old_balance = current_balance - change
+        change_usd = PRICES.usd_value(tracker.native_symbol, change)
+        with span("balance.format", wallet=wallet_name):
+            message = self.templates.render_balance_change(
+                old_balance,
+                current_balance,
+                change,
+                wallet_name,
+                change_usd=change_usd,
+                symbol=tracker.native_symbol,
+                chain=chain
+            ).text
+        return {
+            "event_type": "balance",
+            "wallet_name": wallet_name,
+            "title": f"BALANCE CHANGE - {wallet_name}" + (f" ({chain})" if chain else ""),
+            "message": message,
+            "usd_value": change_usd,
+            "critical": balance_alert == "critical",
+            "log": {
+                "wallet_name": wallet_name,
+                "chain": tracker.chain,
+                "type": "balance_change",
+                "old_balance": old_balance,
+                "new_balance": current_balance,
+                "change": change
+            }
+        }
+    
+    def _deposit_event(self, wallet_name: str, tracker: WalletTracker) -> Tuple[Optional[dict], list]:
+        """New deposits/withdrawals of a wallet's tracker, and the transactions behind them"""
+        with span("deposit.fetch_diff", wallet=wallet_name, chain=tracker.chain) as stage:
+            deposit_alert, deposit_txs = tracker.check_deposit_withdrawal()
+            if stage:
+                stage.set_attribute("transactions", len(deposit_txs))
+        if not deposit_alert:
+            return None, deposit_txs
+        chain = self._chain_label(wallet_name, tracker)
+        with span("deposit.format", wallet=wallet_name):
+            message = self.templates.render_deposit_withdrawal(
+                deposit_txs,
+                wallet_name,
+                chain=chain
+            ).text
+        return {
+            "event_type": "deposit",
+            "wallet_name": wallet_name,
+            "title": f"DEPOSIT/WITHDRAWAL - {wallet_name}" + (f" ({chain})" if chain else ""),
+            "message": message,
+            "usd_value": sum(tx.get("usd_value") or 0 for tx in deposit_txs) or None,
+            "critical": deposit_alert == "critical",
+            "log": {
+                "wallet_name": wallet_name,
+                "chain": tracker.chain,
+                "type": "deposit_withdrawal",
+                "transactions": deposit_txs
+            }
+        }, deposit_txs
+    
+    def sync_fills(self, wallet_name: str, tracker: WalletTracker, until_ms: int = None) -> dict:
+        """
+        Ingest a wallet's Hyperliquid fills and funding since its stored cursors
+        (FILLS_LOOKBACK_DAYS back the first time) up to until_ms; later rows
+        are left for the next sync. Returns the realized PnL, fees and funding
+        of the new rows per coin, with each coin's running totals under
+        "total". The first sync of a wallet in this process only seeds the
+        store and returns nothing, so backfilled history isn't reported as
+        the result of one change
+        """
+        if not HISTORY.enabled:
+            return {}
+        default_start = int((time.time() - self.config["fills_lookback_days"] * 86400) * 1000)
+        try:
+            with span("fills.sync", wallet=wallet_name) as stage:
+                fills = tracker.get_user_fills(HISTORY.fill_cursor(wallet_name, "fills") or default_start)
+                funding = tracker.get_user_funding(HISTORY.fill_cursor(wallet_name, "funding") or default_start)
+                if until_ms is not None:
+                    fills = [fill for fill in fills if fill["time"] <= until_ms]
+                    funding = [payment for payment in funding if payment["time"] <= until_ms]
+                new = HISTORY.record_fills(wallet_name, fills, funding)
+                if stage:
+                    stage.set_attribute("fills", sum(coin["fills"] for coin in new.values()))
+            seeded = wallet_name not in self._fills_synced
+            self._fills_synced.add(wallet_name)
+            if not new or seeded:
+                return {}
+            totals = HISTORY.realized(wallet_name)
+        except Exception as e:
+            logger.warning(f"⚠️  Error syncing fills for {wallet_name}: {e}", extra={"wallet": wallet_name, "stage": "fills"})
+            return {}
+        return {coin: dict(result, total=totals.get(coin)) for coin, result in new.items()}
+    
+    def _risk_event(self, wallet_name: str, risks: list) -> dict:
+        """Alert event for positions that moved closer to liquidation"""
+        with span("risk.format", wallet=wallet_name):
+            message = self.templates.render_liquidation_risk(risks, wallet_name).text
+        return {
+            "event_type": "position",
+            "wallet_name": wallet_name,
+            "title": f"LIQUIDATION RISK - {wallet_name}",
+            "message": message,
+            "usd_value": sum(abs(risk["position_value"]) for risk in risks),
+            "critical": any(risk["tier"] == "critical" for risk in risks),
+            "log": {
+                "wallet_name": wallet_name,
+                "type": "liquidation_risk",
+                "risks": risks
+            }
+        }
+    
+    def recheck_at_risk(self) -> list:
+        """
+        Fast path between cycles: refetch mids and positions of the wallets in
+        the danger band only, and return alert events for worsened tiers
+        """
+        wallets = [name for name in self.risk.at_risk() if name in self.trackers]
+        if not wallets:
+            return []
+        events = []
+        with span("risk_recheck", wallets=len(wallets)):
+            PRICES.prices(max_age=self.risk_recheck_interval / 2)
+            for wallet_name in wallets:
+                try:
+                    positions = self.trackers[wallet_name].get_hyperliquid_positions()
+                    HISTORY.add(wallet_name, positions)
+                    risks = self.risk.assess(wallet_name, positions)
+                    if risks:
+                        events.append(self._risk_event(wallet_name, risks))
+                except Exception as e:
+                    logger.error(f"   ❌ Error rechecking {wallet_name}: {e}",
+                                 extra={"wallet": wallet_name, "stage": "risk", "error": type(e).__name__})
+        HISTORY.flush()
+        logger.info(f"⚡ Rechecked {len(wallets)} at-risk wallet(s), {len(events)} alert(s)",
+                    extra={"stage": "risk"})
+        return events
+    
+    def check_risky_wallets(self):
+        """Scheduled fast recheck; only the leader alerts"""
+        if not self.is_leader:
+            return
+        try:
+            events = self.recheck_at_risk()
+            if not events:
+                return
+            self.notifier.begin_batch()
+            try:
+                for event in events:
+                    self.deliver_event(event)
+            finally:
+                self.notifier.end_batch()
         except Exception as e:
-            print(f"   ❌ Error checking {wallet_name}: {e}")
+            logger.error(f"❌ Error in risk recheck: {e}", extra={"stage": "risk", "error": type(e).__name__})
+    
+    def deliver_event(self, event: dict):
+        """Send an alert event to interested subscribers and log it"""
+        ALERTS.inc(event_type=event["event_type"])
+        with span(f"{event['event_type']}.deliver", wallet=event["wallet_name"], critical=event["critical"]):
+            self.notifier.send_notification(
+                event["message"],
+                event["title"],
+                wallet_name=event["wallet_name"],
+                event_type=event["event_type"],
+                usd_value=event["usd_value"],
+                critical=event["critical"]
+            )
+        save_transaction_log(event["log"])
     
     def send_analysis_to_new_subscriber(self, chat_id: int):
         """Send detailed wallet analysis to a new subscriber"""
         try:
-            print(f"📊 Generating analysis for new subscriber: {chat_id}")
+            logger.info(f"📊 Generating analysis for new subscriber: {chat_id}")
             
             for wallet_name, tracker in self.trackers.items():
                 try:
-                    # Get wallet summary
-                    summary = tracker.get_summary()
-                    
-                    # Build detailed analysis message
-                    message = f"📊 <b>WALLET ANALYSIS - {wallet_name}</b>\n\n"
-                    
-                    # ETH Balance
-                    if summary.get('eth_balance'):
-                        message += f"💰 <b>ETH Balance:</b> {summary['eth_balance']:.4f} ETH\n"
-                    
-                    # Wallet Address
-                    wallet_addr = summary.get('wallet_address', '')
-                    if wallet_addr:
-                        message += f"🔗 <b>Address:</b> <code>{wallet_addr[:10]}...{wallet_addr[-8:]}</code>\n\n"
+                    # Only what the analysis shows; fresh data from the last cycle is reused
+                    summary = tracker.get_summary(("balance", "positions", "transactions"))
                     
-                    # Hyperliquid Positions
-                    if summary.get('hyperliquid_positions'):
-                        positions = summary['hyperliquid_positions']
-                        if positions.get('marginSummary'):
-                            margin = positions['marginSummary']
-                            account_value = float(margin.get('accountValue', 0))
-                            total_ntl_pos = float(margin.get('totalNtlPos', 0))
-                            total_raw_usd = float(margin.get('totalRawUsd', 0))
-                            withdrawable = float(margin.get('withdrawable', 0))
-                            
-                            # Calculate total unrealized PnL from all positions
-                            total_unrealized_pnl = 0
-                            asset_positions = positions.get('assetPositions', [])
-                            for pos_data in asset_positions:
-                                if pos_data.get('position'):
-                                    pos = pos_data['position']
-                                    if pos.get('szi') and float(pos['szi']) != 0:
-                                        total_unrealized_pnl += float(pos.get('unrealizedPnl', 0))
-                            
-                            # Calculate margin usage
-                            margin_used = account_value - withdrawable if account_value > 0 else 0
-                            margin_usage = (margin_used / account_value) if account_value > 0 else 0
-                            
-                            message += f"📈 <b>Hyperliquid Positions:</b>\n"
-                            message += f"💵 <b>Account Value:</b> ${account_value:,.2f}\n"
-                            message += f"📊 <b>Position Value:</b> ${abs(total_ntl_pos):,.2f}\n"
-                            message += f"💰 <b>Unrealized PnL:</b> ${total_unrealized_pnl:,.2f}\n"
-                            message += f"📉 <b>Margin Usage:</b> {margin_usage*100:.2f}%\n\n"
-                            
-                            # Individual positions
-                            asset_positions = positions.get('assetPositions', [])
-                            if asset_positions:
-                                active_positions = [p for p in asset_positions if p.get('position') and p['position'].get('szi') and float(p['position']['szi']) != 0]
-                                if active_positions:
-                                    message += f"🔍 <b>Active Positions ({len(active_positions)}):</b>\n"
-                                    for pos in active_positions[:3]:  # Show top 3
-                                        position = pos['position']
-                                        coin = position.get('coin', 'Unknown')
-                                        size = float(position.get('szi', 0))
-                                        entry_px = float(position.get('entryPx', 0))
-                                        unrealized = float(position.get('unrealizedPnl', 0))
-                                        leverage = position.get('leverage', {}).get('value', 0)
-                                        
-                                        side = "🟢 Long" if size > 0 else "🔴 Short"
-                                        message += f"\n  {side} <b>{coin}</b>\n"
-                                        message += f"    Size: {abs(size):.2f} @ ${entry_px:,.2f}\n"
-                                        message += f"    PnL: ${unrealized:,.2f} | Lev: {leverage}x\n"
+                    # Render detailed analysis message
+                    message = self.notifier.templates.render_wallet_analysis(wallet_name, summary)
                     
-                    # Recent transactions
-                    if summary.get('recent_transactions'):
-                        txs = summary['recent_transactions'][:3]
-                        if txs:
-                            message += f"\n💸 <b>Recent Transactions ({len(txs)}):</b>\n"
-                            for tx in txs:
-                                value_eth = float(tx.get('value', 0)) / 10**18
-                                tx_hash = tx.get('hash', '')[:12]
-                                message += f"  • {value_eth:.4f} ETH - <code>{tx_hash}...</code>\n"
-                    
-                    message += f"\n🕐 <b>Analysis Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-                    message += f"\n\n<i>You're all set! You'll receive updates when changes occur.</i> 🎯"
-                    
-                    # Send directly to the new subscriber
-                    if self.notifier.bot_manager:
-                        self.notifier.bot_manager.send_message(chat_id, message)
-                        print(f"   ✅ Analysis sent for {wallet_name}")
+                    # Queue for the subscriber in the informational lane
+                    if self.notifier.send_to_chat(chat_id, message, label=f"analysis - {wallet_name}"):
+                        logger.info(f"   ✅ Analysis queued for {wallet_name}")
                     
                 except Exception as e:
-                    error_msg = f"⚠️ <b>Error loading analysis for {wallet_name}</b>\n\n{str(e)}"
-                    if self.notifier.bot_manager:
-                        self.notifier.bot_manager.send_message(chat_id, error_msg)
-                    print(f"   ❌ Error generating analysis for {wallet_name}: {e}")
+                    templates = self.notifier.templates
+                    error_msg = f"⚠️ <b>Error loading analysis for {templates.escape(wallet_name)}</b>\n\n{templates.escape(e)}"
+                    self.notifier.send_to_chat(chat_id, error_msg, label=f"analysis - {wallet_name}")
+                    logger.error(f"   ❌ Error generating analysis for {wallet_name}: {e}")
             
-            print(f"✅ Analysis complete for subscriber {chat_id}")
+            logger.info(f"✅ Analysis complete for subscriber {chat_id}")
             
         except Exception as e:
-            print(f"❌ Error sending analysis to {chat_id}: {e}")
+            logger.error(f"❌ Error sending analysis to {chat_id}: {e}")
+    
+    def collect_positions(self) -> dict:
+        """Positions of every wallet, reusing data from the last cycle and fetching the rest in parallel"""
+        workers = max(1, min(self.config["startup_workers"], len(self.trackers)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="positions") as pool:
+            futures = {name: pool.submit(bind(tracker.get_summary), ("positions",))
+                       for name, tracker in self.trackers.items()}
+        positions = {}
+        for wallet_name, future in futures.items():
+            try:
+                positions[wallet_name] = future.result()["hyperliquid_positions"]
+            except Exception as e:
+                logger.error(f"   ❌ Error loading positions of {wallet_name}: {e}")
+                positions[wallet_name] = None
+        return positions
+    
+    def send_portfolio(self, chat_id: int):
+        """Cross-wallet exposure for /portfolio"""
+        # NumPy (when installed) is only imported when statistics are asked for
+        from portfolio_stats import portfolio_stats
+        
+        with span("portfolio", wallets=len(self.trackers)):
+            stats = portfolio_stats(self.collect_positions())
+            message = self.notifier.templates.render_portfolio(stats)
+        self.notifier.send_to_chat(chat_id, message, label="portfolio")
+        logger.info(f"🧮 Portfolio sent to {chat_id} ({stats['totals']['positions']} positions, {stats['backend']})")
     
-    def send_initial_summary(self):
-        """Send initial wallet summary on startup"""
+    def send_chart(self, chat_id: int, text: str):
+        """
+        Account value chart for /chart <wallet> [range]. A render is reused
+        until the wallet records a new sample, and once uploaded it is resent
+        by Telegram file_id
+        """
+        import chart_renderer
+        from history_store import resolution_for
+        
+        templates = self.notifier.templates
+        wallet_name, chart_range = chart_renderer.parse_chart_args(text, list(self.trackers))
+        if wallet_name is None:
+            names = ", ".join(templates.escape(name) for name in self.trackers)
+            self.notifier.send_to_chat(
+                chat_id,
+                f"📈 <b>Usage:</b> /chart &lt;wallet&gt; [{'|'.join(chart_renderer.RANGES)}]\n\n"
+                f"<b>Wallets:</b> {names}",
+                label="chart"
+            )
+            return
+        if not HISTORY.enabled:
+            self.notifier.send_to_chat(chat_id, "⚠️ History is not recorded (HISTORY_DB is empty).", label="chart")
+            return
+        
+        seconds = chart_renderer.RANGES[chart_range]
+        bucket = resolution_for(seconds)
+        if self._charts is None:
+            self._charts = chart_renderer.ChartCache()
+        key = (wallet_name, chart_range, bucket, HISTORY.last_sample(wallet_name))
+        entry = self._charts.get(key)
+        if entry is None:
+            points = HISTORY.series(wallet_name, time.time() - seconds, bucket=bucket)
+            if not points:
+                self.notifier.send_to_chat(
+                    chat_id, f"📭 No history recorded for {templates.escape(wallet_name)} in the last {chart_range}.",
+                    label="chart"
+                )
+                return
+            with span("chart_render", wallet=wallet_name, points=len(points), backend=chart_renderer.BACKEND):
+                png = chart_renderer.render_chart(points, f"{wallet_name} - {chart_range}")
+            entry = self._charts.put(key, png, templates.render_chart_caption(wallet_name, chart_range, points))
+            logger.info(f"📈 Chart rendered for {wallet_name} ({chart_range}, {len(points)} points, {len(png)} bytes)")
+        
+        def remember(file_id: str):
+            entry["file_id"] = file_id
+        
+        # The first send uploads the PNG; later ones only reference it
+        self.notifier.send_photo_to_chat(
+            chat_id, entry["file_id"] or entry["png"], entry["caption"], on_sent=remember, label=f"chart - {wallet_name}"
+        )
+    
+    def warm_up(self) -> list:
+        """
+        Fetch balance and positions of every wallet in parallel, seeding the
+        trackers' baselines; returns (wallet_name, summary, error) entries
+        """
+        started = time.perf_counter()
+        workers = max(1, min(self.config["startup_workers"], len(self.trackers)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm-up") as pool:
+            futures = {
+                name: pool.submit(bind(self._warm_up_wallet), name, tracker) for name, tracker in self.trackers.items()
+            }
+            # Additional chains only need their balance baseline
+            chain_futures = [
+                (wallet_name, tracker.chain, pool.submit(bind(tracker.warm_up)))
+                for wallet_name, trackers in self.chain_trackers.items() for tracker in trackers.values()
+            ]
+        for wallet_name, chain, future in chain_futures:
+            try:
+                future.result()
+            except Exception as e:
+                logger.warning(f"⚠️  Warm-up of {wallet_name} on {chain} failed: {e}")
+        
+        wallet_summaries = []
+        for wallet_name, future in futures.items():
+            try:
+                wallet_summaries.append((wallet_name, future.result(), None))
+            except Exception as e:
+                wallet_summaries.append((wallet_name, None, str(e)))
+        
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"⚡ Warm-up of {len(self.trackers)} wallet(s) finished in {elapsed:.2f}s ({workers} workers)",
+            extra={"stage": "warm_up", "latency_ms": round(elapsed * 1000, 1)}
+        )
+        return wallet_summaries
+    
+    def _warm_up_wallet(self, wallet_name: str, tracker: WalletTracker) -> dict:
+        """Baseline balance/positions and seed the fill cursors, so the first cycle only reports new fills"""
+        summary = tracker.warm_up()
+        self.sync_fills(wallet_name, tracker, until_ms=int(time.time() * 1000))
+        return summary
+    
+    def send_initial_summary(self, wallet_summaries: list = None):
+        """Send initial wallet summary on startup (warm-up results from sharding workers if given)"""
         try:
-            print("📊 Generating initial wallet summary...")
+            logger.info("📊 Generating initial wallet summary...")
             
-            message = f"🚀 <b>WALLET TRACKER STARTED</b>\n\n"
-            message += f"💼 <b>Monitoring {len(self.wallets)} wallet(s):</b>\n\n"
+            # Balances and positions for every wallet (also the first cycle's baseline)
+            if wallet_summaries is None:
+                wallet_summaries = self.warm_up()
             
-            # Get summary for each wallet
-            for wallet_name, tracker in self.trackers.items():
-                try:
-                    summary = tracker.get_summary()
-                    eth_balance = f"{summary['eth_balance']:.4f} ETH" if summary['eth_balance'] else 'N/A'
-                    
-                    message += f"📍 <b>{wallet_name}</b>\n"
-                    message += f"   � Balance: {eth_balance}\n"
-                    message += f"   🔗 {summary['wallet_address'][:10]}...{summary['wallet_address'][-6:]}\n\n"
-                except Exception as e:
-                    message += f"📍 <b>{wallet_name}</b>\n"
-                    message += f"   ⚠️ Error loading: {str(e)}\n\n"
-            
-            message += f"⏰ <b>Check Interval:</b> {self.check_interval} seconds\n"
-            message += f"🕐 <b>Start Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-            message += f"<i>Monitoring active... 🟢</i>"
+            message = self.notifier.templates.render_startup_summary(
+                wallet_summaries,
+                self.check_interval
+            ).text
             
             self.notifier.send_notification(message, "TRACKER STARTED")
             
@@ -265,10 +811,10 @@ class CryptoWalletMonitor:
                 "timestamp": datetime.now().isoformat()
             })
             
-            print("✅ Initial summary sent successfully")
+            logger.info("✅ Initial summary sent successfully")
             
         except Exception as e:
-            print(f"❌ Error sending initial summary: {e}")
+            logger.error(f"❌ Error sending initial summary: {e}")
     
     def run_manual_check(self):
         """Run a one-time check and display full summary"""
@@ -278,9 +824,11 @@ class CryptoWalletMonitor:
         print(f"📊 MULTI-WALLET SUMMARY - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"{'='*60}\n")
         
+        all_positions = {}
         for wallet_name, tracker in self.trackers.items():
             try:
-                summary = tracker.get_summary()
+                summary = tracker.get_summary(("balance", "positions", "transactions"))
+                all_positions[wallet_name] = summary['hyperliquid_positions']
                 
                 print(f"💼 {wallet_name}")
                 print(f"   Address: {summary['wallet_address']}")
@@ -289,22 +837,11 @@ class CryptoWalletMonitor:
                 if summary['hyperliquid_positions']:
                     positions = summary['hyperliquid_positions']
                     if 'marginSummary' in positions:
-                        margin = positions['marginSummary']
-                        
-                        # Calculate total unrealized PnL from positions
-                        total_unrealized_pnl = 0
-                        asset_positions = positions.get('assetPositions', [])
-                        for pos_data in asset_positions:
-                            if pos_data.get('position'):
-                                pos = pos_data['position']
-                                if pos.get('szi') and float(pos['szi']) != 0:
-                                    total_unrealized_pnl += float(pos.get('unrealizedPnl', 0))
-                        
-                        account_value = float(margin.get('accountValue', 0))
-                        total_ntl_pos = float(margin.get('totalNtlPos', 0))
-                        withdrawable = float(margin.get('withdrawable', 0))
-                        margin_used = account_value - withdrawable if account_value > 0 else 0
-                        margin_usage = (margin_used / account_value) if account_value > 0 else 0
+                        metrics = position_metrics(positions)
+                        account_value = metrics["account_value"]
+                        total_ntl_pos = metrics["total_ntl_pos"]
+                        total_unrealized_pnl = metrics["total_unrealized_pnl"]
+                        margin_usage = metrics["margin_usage"]
                         
                         print(f"   📈 Hyperliquid:")
                         print(f"      Account Value: ${account_value:,.2f}")
@@ -323,34 +860,86 @@ class CryptoWalletMonitor:
             except Exception as e:
                 print(f"   ❌ Error loading {wallet_name}: {e}\n")
         
+        if len(all_positions) > 1:
+            from portfolio_stats import portfolio_stats
+            stats = portfolio_stats(all_positions)
+            totals = stats["totals"]
+            print(f"🧮 Portfolio ({totals['wallets']} wallets, {totals['positions']} positions)")
+            print(f"   Account Value: ${totals['account_value']:,.2f}")
+            print(f"   Long: ${totals['long_value']:,.2f} | Short: ${totals['short_value']:,.2f} | "
+                  f"Net: ${totals['net_value']:+,.2f}")
+            print(f"   Leverage: {totals['leverage']:.2f}x | Unrealized PnL: ${totals['unrealized_pnl']:,.2f}")
+            print(f"   Concentration (HHI): {totals['concentration']:.2f}")
+            for coin, exposure in list(stats["coins"].items())[:5]:
+                print(f"      • {coin}: ${exposure['net_value']:+,.0f} net ({exposure['share']:.1%} of exposure)")
+            print()
+        
         print(f"{'='*60}")
     
     def start_monitoring(self):
         """Start continuous monitoring"""
-        self.send_initial_summary()
+        import schedule
+        
+        # Expose /metrics for the long-running monitor
+        WALLETS_GAUGE.set(len(self.wallets))
+        self.metrics_server = start_metrics_server(
+            self.config["metrics_port"],
+            self.config["metrics_host"]
+        )
+        
+        self.start_leader_election()
+        if self.is_leader:
+            self.send_initial_summary()
+        else:
+            # Hot standby: baselines ready for the first cycle after a failover
+            self.warm_up()
         
         # Schedule regular checks
         schedule.every(self.check_interval).seconds.do(self.check_wallet_changes)
+        if self.risk_recheck_interval > 0:
+            schedule.every(self.risk_recheck_interval).seconds.do(self.check_risky_wallets)
         
-        print(f"🔄 Monitoring started. Checking every {self.check_interval} seconds.")
-        print("Press Ctrl+C to stop")
+        ready = time.perf_counter() - self.created_at
+        STARTUP_DURATION.set(ready)
+        logger.info(f"🟢 Ready in {ready:.2f}s", extra={"stage": "startup", "latency_ms": round(ready * 1000, 1)})
+        logger.info(f"🔄 Monitoring started. Checking every {self.check_interval} seconds.")
+        logger.info("Press Ctrl+C to stop")
         
         try:
             while True:
                 schedule.run_pending()
                 time.sleep(1)
         except KeyboardInterrupt:
-            print("\n👋 Monitoring stopped by user")
+            # Don't lose alerts held for the next digest or still queued
+            self.notifier.end_batch(force=True)
+            self.notifier.wait_for_delivery(timeout=10)
+            if self.leader:
+                # Hand over right away instead of waiting for the lease to expire
+                self.leader.stop()
+            logger.info("👋 Monitoring stopped by user")
 
 def main():
-    monitor = CryptoWalletMonitor()
-    
     # Check command line arguments
     import sys
-    if len(sys.argv) > 1 and sys.argv[1] == "--check":
-        monitor.run_manual_check()
+    manual_check = len(sys.argv) > 1 and sys.argv[1] == "--check"
+    
+    # A one-shot check needs no Telegram bot token
+    try:
+        config = load_config(validate=True, require_telegram=not manual_check)
+    except ValueError as e:
+        print(str(e))
+        sys.exit(1)
+    
+    if manual_check:
+        CryptoWalletMonitor(config).run_manual_check()
+    elif config["shard_role"] == "worker":
+        from sharding import run_worker
+        run_worker(config, config["shard_index"])
+    elif config["shard_count"] > 1 or config["shard_role"] == "coordinator":
+        from sharding import ShardCoordinator
+        ShardCoordinator(CryptoWalletMonitor(config)).run()
     else:
-        monitor.start_monitoring()
+        CryptoWalletMonitor(config).start_monitoring()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Message Templates
+Renders notification messages once into pre-escaped HTML, with cached
+per-wallet fragments and splitting for Telegram's message length limit
+"""
+
+import html
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+def split_message(text: str, limit: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[str]:
+    """Split a message on line boundaries into chunks of at most `limit` characters"""
+    if len(text) <= limit:
+        return [text]
+
+    chunks = []
+    current = ""
+    for line in text.split("\n"):
+        # Hard-split lines that are longer than a whole message
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def position_metrics(positions: Dict) -> Dict:
+    """Compute the margin/PnL figures shared by every position message in one pass"""
+    margin_summary = positions.get("marginSummary", {})
+    account_value = float(margin_summary.get("accountValue", 0))
+    total_ntl_pos = float(margin_summary.get("totalNtlPos", 0))
+    withdrawable = float(margin_summary.get("withdrawable", 0))
+
+    # Active positions and their total unrealized PnL
+    asset_positions = positions.get("assetPositions", [])
+    active_positions = []
+    total_unrealized_pnl = 0
+    for pos_data in asset_positions:
+        position = pos_data.get("position")
+        if position and position.get("szi") and float(position["szi"]) != 0:
+            active_positions.append(position)
+            total_unrealized_pnl += float(position.get("unrealizedPnl", 0))
+
+    # Margin usage
+    margin_used = account_value - withdrawable if account_value > 0 else 0
+    margin_usage = (margin_used / account_value) if account_value > 0 else 0
+
+    return {
+        "account_value": account_value,
+        "total_ntl_pos": total_ntl_pos,
+        "withdrawable": withdrawable,
+        "total_unrealized_pnl": total_unrealized_pnl,
+        "margin_usage": margin_usage,
+        "asset_positions": asset_positions,
+        "active_positions": active_positions
+    }
+
+
+def position_change_notional(previous: Optional[Dict], current: Dict) -> float:
+    """
+    USD notional of a position change: how much positionValue moved on the
+    coins whose size changed (the closing notional for a closed position)
+    """
+    def by_coin(positions):
+        return {
+            pos["position"].get("coin", ""): pos["position"]
+            for pos in (positions or {}).get("assetPositions", [])
+            if pos.get("position")
+        }
+
+    before, after = by_coin(previous), by_coin(current)
+    total = 0.0
+    for coin in set(before) | set(after):
+        old, new = before.get(coin, {}), after.get(coin, {})
+        if float(old.get("szi") or 0) == float(new.get("szi") or 0):
+            continue
+        total += abs(float(new.get("positionValue") or 0) - float(old.get("positionValue") or 0))
+    return total
+
+
+class RenderedMessage:
+    """A message rendered once and reused for every recipient"""
+
+    def __init__(self, text: str, limit: int = TELEGRAM_MAX_MESSAGE_LENGTH):
+        self.text = text
+        self.limit = limit
+        self._chunks = None
+
+    @property
+    def chunks(self) -> List[str]:
+        """Message split for Telegram (computed on first use)"""
+        if self._chunks is None:
+            self._chunks = split_message(self.text, self.limit)
+        return self._chunks
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class MessageTemplates:
+    def __init__(self, wallets: Dict[str, str] = None):
+        self.wallets = wallets or {}
+        self._fragments: Dict[Tuple[str, str], str] = {}
+
+    @staticmethod
+    def escape(value) -> str:
+        """Escape a value for Telegram HTML parse mode"""
+        return html.escape(str(value), quote=False)
+
+    @staticmethod
+    def timestamp() -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def _fragment(self, kind: str, key: str, build) -> str:
+        fragment = self._fragments.get((kind, key))
+        if fragment is None:
+            fragment = build()
+            self._fragments[(kind, key)] = fragment
+        return fragment
+
+    def wallet_header(self, wallet_name: str) -> str:
+        """Cached '💼 Wallet: name' line"""
+        return self._fragment(
+            "header", wallet_name,
+            lambda: f"💼 <b>Wallet:</b> {self.escape(wallet_name)}\n"
+        )
+
+    def chain_line(self, chain: str) -> str:
+        """'⛓️ Chain: name' line ("" when no chain is given)"""
+        return f"⛓️ <b>Chain:</b> {self.escape(chain)}\n" if chain else ""
+
+    def wallet_title(self, wallet_name: str) -> str:
+        """Cached bold, escaped wallet name"""
+        return self._fragment("title", wallet_name, lambda: f"<b>{self.escape(wallet_name)}</b>")
+
+    def short_address(self, address: str, head: int = 10, tail: int = 8) -> str:
+        """Cached shortened address"""
+        return self._fragment(
+            "address", f"{address}:{head}:{tail}",
+            lambda: f"{self.escape(address[:head])}...{self.escape(address[-tail:])}"
+        )
+
+    def render_balance_change(self, old_balance: float, new_balance: float, change: float,
+                              wallet_name: str = "Main Wallet", change_usd: float = None,
+                              symbol: str = "ETH", chain: str = "") -> RenderedMessage:
+        direction = "📈" if change > 0 else "📉"
+        change_pct = (change / old_balance * 100) if old_balance else 0
+        usd_str = f" ≈ ${change_usd:,.2f}" if change_usd is not None else ""
+        return RenderedMessage(
+            f"{direction} <b>BALANCE CHANGE</b>\n\n"
+            f"{self.wallet_header(wallet_name)}"
+            f"{self.chain_line(chain)}"
+            f"📊 <b>Previous:</b> {old_balance:.4f} {symbol}\n"
+            f"📊 <b>New:</b> {new_balance:.4f} {symbol}\n"
+            f"💸 <b>Change:</b> {change:+.4f} {symbol} ({change_pct:+.2f}%){usd_str}\n"
+            f"🕐 <b>Time:</b> {self.timestamp()}\n"
+        )
+
+    def render_position_change(self, positions: Dict, change_type: str = "change",
+                               wallet_name: str = "Main Wallet", metrics: Dict = None,
+                               realized: Dict[str, Dict] = None) -> RenderedMessage:
+        if not positions or "marginSummary" not in positions:
+            return RenderedMessage(f"📊 Position data unavailable for {self.escape(wallet_name)}")
+
+        metrics = metrics or position_metrics(positions)
+
+        # Choose appropriate emoji and title based on change type
+        if change_type == "position_opened":
+            emoji, title = "🚀", "POSITION OPENED"
+        elif change_type == "position_closed":
+            emoji, title = "✅", "POSITION CLOSED"
+        else:
+            emoji, title = "🔄", "POSITION CHANGED"
+
+        parts = [
+            f"{emoji} <b>{title}</b>\n\n",
+            self.wallet_header(wallet_name),
+            f"📊 <b>Account Value:</b> ${metrics['account_value']:,.2f}\n",
+            f"💵 <b>Position Value:</b> ${abs(metrics['total_ntl_pos']):,.2f}\n",
+            f"💰 <b>Unrealized PnL:</b> ${metrics['total_unrealized_pnl']:,.2f}\n",
+            f"📈 <b>Margin Usage:</b> {metrics['margin_usage']*100:.2f}%\n",
+            f"🕐 <b>Time:</b> {self.timestamp()}\n"
+        ]
+
+        # Add individual positions (top 5 entries)
+        if metrics["asset_positions"]:
+            parts.append("\n📈 POSITIONS:\n")
+            for pos_data in metrics["asset_positions"][:5]:
+                position = pos_data.get("position")
+                if not position or float(position.get("szi", 0)) == 0:
+                    continue
+                size = position.get("szi", 0)
+                side = "LONG" if float(size) > 0 else "SHORT"
+                parts.append(
+                    f"  • {self.escape(position.get('coin', 'Unknown'))} {side}: {size} @ ${position.get('entryPx', 0)}\n"
+                    f"    PnL: ${position.get('unrealizedPnl', 0)} | Leverage: {position.get('leverage', {}).get('value', 0)}x\n"
+                    f"    Position Value: ${position.get('positionValue', 0)}\n"
+                    f"    Liq Price: ${position.get('liquidationPx', 0)} | Margin Used: ${position.get('marginUsed', 0)}\n\n"
+                )
+
+        # Fills and funding since the last alert (HistoryStore.record_fills), with running totals
+        if realized:
+            parts.append("\n💵 REALIZED:\n")
+            for coin, result in realized.items():
+                net = result["closed_pnl"] - result["fees"] + result["funding"]
+                parts.append(
+                    f"  • {self.escape(coin)}: <b>${net:+,.2f}</b> "
+                    f"(PnL ${result['closed_pnl']:+,.2f} | Fees ${result['fees']:,.2f} | "
+                    f"Funding ${result['funding']:+,.2f}, {result['fills']} fill(s))\n"
+                )
+                total = result.get("total")
+                if total:
+                    parts.append(
+                        f"    Total: ${total['closed_pnl'] - total['fees'] + total['funding']:+,.2f} "
+                        f"over {total['fills']} fill(s)\n"
+                    )
+
+        return RenderedMessage("".join(parts))
+
+    def render_liquidation_risk(self, risks: List[Dict], wallet_name: str = "Main Wallet") -> RenderedMessage:
+        worst = risks[0]["tier"]
+        emoji = {"critical": "🔴", "danger": "🟠"}.get(worst, "🟡")
+        parts = [
+            f"{emoji} <b>LIQUIDATION RISK - {self.escape(worst.upper())}</b>\n\n",
+            self.wallet_header(wallet_name),
+            f"🕐 <b>Time:</b> {self.timestamp()}\n\n"
+        ]
+        for risk in risks:
+            mid = f"${risk['mid']:,.4f}" if risk["mid"] is not None else "n/a"
+            parts.append(
+                f"  • {self.escape(risk['coin'])} {risk['side']}: <b>{risk['distance']:.2%}</b> from liquidation\n"
+                f"    Mid: {mid} | Liq Price: ${risk['liquidation_px']:,.4f}\n"
+                f"    Position Value: ${abs(risk['position_value']):,.2f}\n\n"
+            )
+        return RenderedMessage("".join(parts))
+
+    def render_deposit_withdrawal(self, transactions: List[Dict], wallet_name: str = "Main Wallet",
+                                  wallet_address: Optional[str] = None, chain: str = "") -> RenderedMessage:
+        if not transactions:
+            return RenderedMessage("No transactions to display")
+
+        wallet_address = (wallet_address or self.wallets.get(wallet_name, "")).lower()
+        parts = [
+            "💰 <b>DEPOSIT/WITHDRAWAL DETECTED</b>\n\n",
+            self.wallet_header(wallet_name),
+            self.chain_line(chain),
+            f"🕐 <b>Time:</b> {self.timestamp()}\n\n"
+        ]
+
+        for tx in transactions:
+            asset = self.escape(tx.get("asset", "Unknown"))
+
+            # Calculate value based on asset type (native transfers have no token contract)
+            if not tx.get("contractAddress"):
+                value = float(tx.get("value", 0)) / 10**18
+                value_str = f"{value:.4f} {asset}"
+            else:
+                decimals = tx.get("tokenDecimal")
+                value = float(tx.get("value", 0)) / (10 ** (18 if decimals in (None, "") else int(decimals)))
+                value_str = f"{value:.6f} {asset}"
+                if tx.get("verified") is False:
+                    value_str += " ⚠️ unverified"
+            if tx.get("usd_value") is not None:
+                value_str += f" (≈ ${tx['usd_value']:,.2f})"
+
+            # Determine if it's a deposit or withdrawal
+            if wallet_address and tx.get("from", "").lower() == wallet_address:
+                recipient = f"{tx['to'][:10]}..." if tx.get("to") else "Unknown"
+                parts.append(f"📤 <b>WITHDRAWAL:</b> {value_str}\n")
+                parts.append(f"   📍 <b>To:</b> <code>{self.escape(recipient)}</code>\n")
+            elif wallet_address and tx.get("to", "").lower() == wallet_address:
+                sender = f"{tx['from'][:10]}..." if tx.get("from") else "Unknown"
+                parts.append(f"📥 <b>DEPOSIT:</b> {value_str}\n")
+                parts.append(f"   📍 <b>From:</b> <code>{self.escape(sender)}</code>\n")
+            else:
+                parts.append(f"🔁 <b>TRANSFER:</b> {value_str}\n")
+
+            if tx.get("verified") is False and tx.get("contractAddress"):
+                parts.append(f"   📄 <b>Contract:</b> <code>{self.escape(tx['contractAddress'][:10])}...</code>\n")
+            parts.append(f"   🔗 <b>Hash:</b> <code>{self.escape(tx.get('hash', 'Unknown')[:20])}...</code>\n\n")
+
+        return RenderedMessage("".join(parts))
+
+    def render_token_balance_change(self, changes: List[Dict], wallet_name: str = "Main Wallet") -> RenderedMessage:
+        parts = [
+            "🪙 <b>TOKEN BALANCE CHANGE</b>\n\n",
+            self.wallet_header(wallet_name),
+            f"🕐 <b>Time:</b> {self.timestamp()}\n\n"
+        ]
+        for change in changes:
+            direction = "📈" if change["change"] > 0 else "📉"
+            symbol = self.escape(change["symbol"])
+            if change["verified"] is False:
+                symbol += " ⚠️ unverified"
+            usd_str = f" (≈ ${change['usd_value']:,.2f})" if change.get("usd_value") is not None else ""
+            parts.append(
+                f"{direction} <b>{symbol}:</b> {change['old_balance']:,.6f} → {change['new_balance']:,.6f}\n"
+                f"   💸 <b>Change:</b> {change['change']:+,.6f}{usd_str}\n\n"
+            )
+        return RenderedMessage("".join(parts))
+
+    def render_hyperliquid_summary(self, positions: Dict, stats: Dict = None, wallet_name: str = None,
+                                   metrics: Dict = None) -> RenderedMessage:
+        if not positions or "marginSummary" not in positions:
+            return RenderedMessage("Position data unavailable")
+
+        metrics = metrics or position_metrics(positions)
+        asset_positions = metrics["asset_positions"]
+        wallet = self.escape(wallet_name) if wallet_name else "N/A"
+
+        parts = [
+            "📊 HYPERLIQUID POSITION SUMMARY\n",
+            f"Wallet: {wallet}\n",
+            f"Account Value: ${metrics['account_value']:,.2f}\n"
+        ]
+        if stats:
+            parts.append(
+                f"Total Position Value: ${stats.get('total_position_value', abs(metrics['total_ntl_pos'])):,.2f}\n"
+                f"Unrealized PnL: ${metrics['total_unrealized_pnl']:,.2f}\n"
+                f"Margin Usage: {metrics['margin_usage']*100:.2f}%\n"
+                f"Open Positions: {stats.get('position_count', len(asset_positions))}\n"
+                f"Win Rate: {stats.get('win_rate', 0):.1f}%\n"
+                f"Leverage: {stats.get('leverage', 0):.2f}x\n"
+                f"Time: {self.timestamp()}\n\n"
+                f"📈 POSITION BREAKDOWN:\n"
+                f"• Long: ${stats.get('long_value', 0):,.2f} ({stats.get('long_percentage', 0):.1f}%)\n"
+                f"• Short: ${stats.get('short_value', 0):,.2f} ({stats.get('short_percentage', 0):.1f}%)\n"
+            )
+        else:
+            parts.append(
+                f"Total Position Value: ${abs(metrics['total_ntl_pos']):,.2f}\n"
+                f"Unrealized PnL: ${metrics['total_unrealized_pnl']:,.2f}\n"
+                f"Margin Usage: {metrics['margin_usage']*100:.2f}%\n"
+                f"Open Positions: {len(asset_positions)}\n"
+                f"Time: {self.timestamp()}\n"
+            )
+
+        # Add active positions (top 5 entries)
+        if asset_positions:
+            parts.append("\n🔍 ACTIVE POSITIONS:\n")
+            for pos_data in asset_positions[:5]:
+                position = pos_data.get("position")
+                if not position:
+                    continue
+                size = float(position.get("szi", 0))
+                if size == 0:
+                    continue
+                entry_price = float(position.get("entryPx", 0))
+                position_value = float(position.get("positionValue", 0))
+                pnl = float(position.get("unrealizedPnl", 0))
+                leverage = position.get("leverage", {}).get("value", 0)
+                liquidation_price = float(position.get("liquidationPx") or 0)
+                margin_used = float(position.get("marginUsed", 0))
+                side = "LONG" if size > 0 else "SHORT"
+                pnl_emoji = "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪"
+                current_price = abs(position_value / size)
+                roe = float(position.get("returnOnEquity", 0)) * 100
+                funding = position.get("cumFunding", {})
+                funding_since_open = float(funding.get("sinceOpen", 0))
+                funding_change = float(funding.get("sinceChange", 0))
+                funding_emoji = "💰" if funding_since_open > 0 else "💸" if funding_since_open < 0 else "⚪"
+
+                parts.append(
+                    f"  {pnl_emoji} {self.escape(position.get('coin', 'Unknown'))} {side}: {abs(size):,.2f} @ ${entry_price:,.2f}\n"
+                    f"     Current: ${current_price:,.2f} | PnL: ${pnl:,.2f} ({roe:+.2f}%)\n"
+                    f"     Value: ${position_value:,.2f} | Lev: {leverage}x | ROE: {roe:+.1f}%\n"
+                    f"     Liq Price: ${liquidation_price:,.2f} | Margin: ${margin_used:,.2f}\n"
+                    f"     {funding_emoji} Funding: ${funding_since_open:+,.2f} (${funding_change:+,.2f} recent)\n\n"
+                )
+
+        return RenderedMessage("".join(parts))
+
+    def render_portfolio(self, stats: Dict, top: int = 10) -> RenderedMessage:
+        """Cross-wallet exposure for /portfolio"""
+        totals = stats["totals"]
+        parts = [
+            "🧮 <b>PORTFOLIO OVERVIEW</b>\n\n",
+            f"💼 <b>Wallets:</b> {totals['wallets']} | <b>Positions:</b> {totals['positions']}\n",
+            f"📊 <b>Account Value:</b> ${totals['account_value']:,.2f}\n",
+            f"📈 <b>Long:</b> ${totals['long_value']:,.2f} | 📉 <b>Short:</b> ${totals['short_value']:,.2f}\n",
+            f"⚖️ <b>Net:</b> ${totals['net_value']:+,.2f} | <b>Leverage:</b> {totals['leverage']:.2f}x\n",
+            f"💰 <b>Unrealized PnL:</b> ${totals['unrealized_pnl']:,.2f}\n",
+            f"🎯 <b>Concentration (HHI):</b> {totals['concentration']:.2f}\n",
+            f"🕐 <b>Time:</b> {self.timestamp()}\n"
+        ]
+
+        if stats["coins"]:
+            parts.append("\n🪙 <b>NET EXPOSURE BY COIN:</b>\n")
+            for coin, exposure in list(stats["coins"].items())[:top]:
+                side = "LONG" if exposure["net_value"] >= 0 else "SHORT"
+                parts.append(
+                    f"  • {self.escape(coin)}: ${exposure['net_value']:+,.0f} net {side} "
+                    f"({exposure['share']:.1%} of exposure, {exposure['wallets']} wallet(s))\n"
+                )
+
+        wallets = sorted(stats["wallets"].items(), key=lambda item: item[1]["gross_value"], reverse=True)
+        if wallets:
+            parts.append("\n💼 <b>WALLETS BY EXPOSURE:</b>\n")
+            for wallet_name, wallet in wallets[:top]:
+                top_coin = f", {wallet['concentration']:.0%} in {self.escape(wallet['top_coin'])}" if wallet["top_coin"] else ""
+                parts.append(
+                    f"  • {self.escape(wallet_name)}: ${wallet['gross_value']:,.0f} "
+                    f"({wallet['leverage']:.2f}x{top_coin})\n"
+                )
+            if len(wallets) > top:
+                parts.append(f"  <i>... and {len(wallets) - top} more</i>\n")
+
+        return RenderedMessage("".join(parts))
+
+    def render_chart_caption(self, wallet_name: str, chart_range: str, points: List[Dict]) -> str:
+        """Photo caption for /chart (the figures behind the plotted lines)"""
+        first, last = points[0], points[-1]
+        change = last["account_value"] - first["account_value_open"]
+        change_pct = (change / first["account_value_open"] * 100) if first["account_value_open"] else 0
+        return (
+            f"📈 <b>{self.escape(wallet_name)}</b> - last {chart_range}\n"
+            f"💵 <b>Account Value:</b> ${last['account_value']:,.2f} ({change:+,.2f} / {change_pct:+.2f}%)\n"
+            f"↕️ <b>Range:</b> ${min(p['account_value_min'] for p in points):,.2f} - "
+            f"${max(p['account_value_max'] for p in points):,.2f}\n"
+            f"💰 <b>Unrealized PnL:</b> ${last['unrealized_pnl']:,.2f}"
+        )
+
+    def render_wallet_analysis(self, wallet_name: str, summary: Dict) -> RenderedMessage:
+        """Detailed per-wallet analysis sent to new subscribers and /analysis"""
+        parts = [f"📊 <b>WALLET ANALYSIS - {self.escape(wallet_name)}</b>\n\n"]
+
+        if summary.get('eth_balance'):
+            parts.append(f"💰 <b>ETH Balance:</b> {summary['eth_balance']:.4f} ETH\n")
+
+        wallet_addr = summary.get('wallet_address', '')
+        if wallet_addr:
+            parts.append(f"🔗 <b>Address:</b> <code>{self.short_address(wallet_addr)}</code>\n\n")
+
+        positions = summary.get('hyperliquid_positions')
+        if positions and positions.get('marginSummary'):
+            metrics = position_metrics(positions)
+            parts.append(
+                f"📈 <b>Hyperliquid Positions:</b>\n"
+                f"💵 <b>Account Value:</b> ${metrics['account_value']:,.2f}\n"
+                f"📊 <b>Position Value:</b> ${abs(metrics['total_ntl_pos']):,.2f}\n"
+                f"💰 <b>Unrealized PnL:</b> ${metrics['total_unrealized_pnl']:,.2f}\n"
+                f"📉 <b>Margin Usage:</b> {metrics['margin_usage']*100:.2f}%\n\n"
+            )
+
+            active_positions = metrics["active_positions"]
+            if active_positions:
+                parts.append(f"🔍 <b>Active Positions ({len(active_positions)}):</b>\n")
+                for position in active_positions[:3]:  # Show top 3
+                    size = float(position.get('szi', 0))
+                    side = "🟢 Long" if size > 0 else "🔴 Short"
+                    parts.append(
+                        f"\n  {side} <b>{self.escape(position.get('coin', 'Unknown'))}</b>\n"
+                        f"    Size: {abs(size):.2f} @ ${float(position.get('entryPx', 0)):,.2f}\n"
+                        f"    PnL: ${float(position.get('unrealizedPnl', 0)):,.2f} | Lev: {position.get('leverage', {}).get('value', 0)}x\n"
+                    )
+
+        txs = (summary.get('recent_transactions') or [])[:3]
+        if txs:
+            parts.append(f"\n💸 <b>Recent Transactions ({len(txs)}):</b>\n")
+            for tx in txs:
+                value_eth = float(tx.get('value', 0)) / 10**18
+                parts.append(f"  • {value_eth:.4f} ETH - <code>{self.escape(tx.get('hash', '')[:12])}...</code>\n")
+
+        parts.append(f"\n🕐 <b>Analysis Time:</b> {self.timestamp()}")
+        parts.append("\n\n<i>You're all set! You'll receive updates when changes occur.</i> 🎯")
+        return RenderedMessage("".join(parts))
+
+    def render_startup_summary(self, wallet_summaries: List[Tuple[str, Optional[Dict], Optional[str]]],
+                               check_interval: int) -> RenderedMessage:
+        """Startup message; wallet_summaries holds (wallet_name, summary, error) entries"""
+        parts = [
+            "🚀 <b>WALLET TRACKER STARTED</b>\n\n",
+            f"💼 <b>Monitoring {len(wallet_summaries)} wallet(s):</b>\n\n"
+        ]
+        for wallet_name, summary, error in wallet_summaries:
+            parts.append(f"📍 {self.wallet_title(wallet_name)}\n")
+            if error is not None:
+                parts.append(f"   ⚠️ Error loading: {self.escape(error)}\n\n")
+                continue
+            eth_balance = f"{summary['eth_balance']:.4f} ETH" if summary.get('eth_balance') else 'N/A'
+            parts.append(f"   💰 Balance: {eth_balance}\n")
+            parts.append(f"   🔗 {self.short_address(summary['wallet_address'], 10, 6)}\n\n")
+
+        parts.append(f"⏰ <b>Check Interval:</b> {check_interval} seconds\n")
+        parts.append(f"🕐 <b>Start Time:</b> {self.timestamp()}\n\n")
+        parts.append("<i>Monitoring active... 🟢</i>")
+        return RenderedMessage("".join(parts))
@@ -1,38 +1,201 @@
+import logging
 import requests
 from datetime import datetime
 from typing import Dict, Optional, List
 import time
-from telegram_bot import TelegramBotManager
+from alert_coalescer import AlertCoalescer
+from message_templates import MessageTemplates
+from tracing import TRACER
+from metrics import BROADCAST_DURATION, MESSAGES_SENT, QUEUE_DEPTH, PENDING_ALERTS, SUBSCRIBERS
+from delivery_queue import (
+    PriorityDeliveryQueue, DeliveryTicket, LANE_NAMES,
+    PRIORITY_CRITICAL, PRIORITY_ALERT, PRIORITY_BALANCE, PRIORITY_INFO
+)
+
+logger = logging.getLogger(__name__)
+
+# Default delivery lane of each routed event type
+EVENT_PRIORITIES = {
+    "position": PRIORITY_ALERT,
+    "deposit": PRIORITY_ALERT,
+    "balance": PRIORITY_BALANCE
+}
 
 class NotificationSystem:
-    def __init__(self, config: Dict, wallets: Dict = None):
+    def __init__(self, config: Dict, wallets: Dict = None, start_polling: bool = True, wallet_chains: Dict = None):
         self.telegram_config = config.get("telegram", {})
         self.console_enabled = config.get("console", {}).get("enabled", True)
-        self._last_telegram_call = 0
-        self._min_telegram_interval = 0.034  # ~30 messages per second limit
+        self.templates = MessageTemplates(wallets)
         
         # Initialize bot manager for multi-user support
         self.bot_manager = None
         if self.telegram_config.get("enabled", False):
             bot_token = self.telegram_config.get("bot_token")
             if bot_token:
-                self.bot_manager = TelegramBotManager(bot_token)
+                from telegram_bot import TelegramBotManager
+                self.bot_manager = TelegramBotManager(
+                    bot_token,
+                    api_url=self.telegram_config.get("api_url", "https://api.telegram.org"),
+                    fanout_mode=self.telegram_config.get("fanout_mode", "direct"),
+                    staging_chat_id=self.telegram_config.get("staging_chat_id"),
+                    channel_id=self.telegram_config.get("alert_channel_id")
+                )
                 # Set wallet information for /wallets command
                 if wallets:
                     self.bot_manager.wallets = wallets
-                self.bot_manager.start_polling()
+                    self.bot_manager.wallet_chains = wallet_chains or {}
+                # Only the long-running monitor answers bot commands
+                if start_polling:
+                    self.bot_manager.start_polling()
+        
+        # Prioritized delivery lanes with separate rate budgets
+        self.delivery = None
+        if self.bot_manager:
+            self.delivery = PriorityDeliveryQueue(
+                lane_rates=self.telegram_config.get("lane_rates"),
+                global_rate=self.telegram_config.get("global_rate", 30)
+            )
+            self.delivery.start()
+            QUEUE_DEPTH.set_function(
+                lambda: {(name,): self.delivery.depth(priority) for priority, name in LANE_NAMES.items()}
+            )
+            SUBSCRIBERS.set_function(self.bot_manager.get_subscriber_count)
+        
+        # Merge alerts of a cycle into one message per subscriber
+        self.coalescer = None
+        self._batching = False
+        if self.bot_manager and self.telegram_config.get("coalesce", False):
+            self.coalescer = AlertCoalescer(
+                self.bot_manager,
+                digest_interval=self.telegram_config.get("digest_interval", 0)
+            )
+            PENDING_ALERTS.set_function(self.coalescer.pending_count)
+    
+    @staticmethod
+    def priority_for(event_type: str = None, critical: bool = False) -> int:
+        """Delivery lane for an event (informational messages have no event type)"""
+        if critical:
+            return PRIORITY_CRITICAL
+        return EVENT_PRIORITIES.get(event_type, PRIORITY_INFO)
+    
+    def _queue_delivery(self, jobs, priority: int, label: str) -> DeliveryTicket:
+        """Queue per-chat jobs and report the outcome once the fan-out is done"""
+        trace = TRACER.current_context()
+        return self.delivery.submit(
+            priority, jobs, label,
+            on_done=lambda ticket: self._report_delivery(ticket, trace)
+        )
+    
+    @staticmethod
+    def _report_delivery(ticket: DeliveryTicket, trace=None):
+        lane = LANE_NAMES[ticket.priority]
+        elapsed = time.time() - ticket.queued_at
+        if trace is not None:
+            # The fan-out finishes on the delivery thread, after the cycle span
+            fanout = TRACER.start_span(
+                "telegram.fanout", parent=trace, start_time=ticket.queued_at,
+                lane=lane, label=ticket.label, success=ticket.success, failed=ticket.failed
+            )
+            fanout.end()
+        BROADCAST_DURATION.observe(elapsed, lane=lane)
+        MESSAGES_SENT.inc(ticket.success, lane=lane, result="success")
+        MESSAGES_SENT.inc(ticket.failed, lane=lane, result="failed")
+        fields = {"stage": "deliver", "lane": lane, "label": ticket.label, "latency_ms": round(elapsed * 1000, 1),
+                  "success": ticket.success, "failed": ticket.failed}
+        if ticket.success > 0:
+            logger.info(
+                f"✅ Telegram notification sent to {ticket.success}/{ticket.total} subscribers ({ticket.label}, {lane} lane, {elapsed:.1f}s)",
+                extra=fields
+            )
+            if ticket.failed > 0:
+                logger.warning(f"⚠️  Failed to send to {ticket.failed} subscribers")
+        else:
+            logger.error(f"❌ Failed to send Telegram notifications to all {ticket.total} subscribers ({ticket.label})", extra=fields)
+    
+    def send_to_chat(self, chat_id: int, message, priority: int = PRIORITY_INFO, label: str = "reply") -> bool:
+        """Queue a message for a single chat (e.g. /analysis replies)"""
+        if not self.bot_manager:
+            return False
+        job = lambda: self.bot_manager.send_message(chat_id, message)
+        self._queue_delivery([job], priority, label)
+        return True
+    
+    def send_photo_to_chat(self, chat_id: int, photo, caption: str = None, on_sent=None,
+                           priority: int = PRIORITY_INFO, label: str = "photo") -> bool:
+        """Queue a photo (PNG bytes or file_id) for a single chat; on_sent receives the file_id"""
+        if not self.bot_manager:
+            return False
+        def job():
+            file_id = self.bot_manager.send_photo(chat_id, photo, caption)
+            if file_id and on_sent:
+                on_sent(file_id)
+            return file_id is not None
+        self._queue_delivery([job], priority, label)
+        return True
+    
+    def wait_for_delivery(self, timeout: float = None) -> bool:
+        """Block until queued Telegram messages have been delivered"""
+        if not self.delivery:
+            return True
+        return self.delivery.join(timeout)
+    
+    def begin_batch(self):
+        """Start collecting routed alerts instead of broadcasting them one by one"""
+        self._batching = self.coalescer is not None
     
-    def send_notification(self, message: str, title: str = "Wallet Update") -> bool:
-        """Send notification through all enabled channels"""
+    def end_batch(self, force: bool = False) -> bool:
+        """Stop collecting and send merged alerts if the coalescing window is over"""
+        self._batching = False
+        if not self.coalescer or not self.coalescer.pending_count():
+            return True
+        if not force and not self.coalescer.is_due():
+            logger.info(f"📥 {self.coalescer.pending_count()} alert(s) held for the next digest")
+            return True
+        return self.flush_alerts()
+    
+    def flush_alerts(self) -> bool:
+        """Send all alerts held by the coalescer"""
+        if not self.coalescer:
+            return True
+        try:
+            results = self.coalescer.flush(self._queue_delivery)
+            if results["events"]:
+                logger.info(
+                    f"📬 {results['events']} alert(s) merged into {results['messages']} "
+                    f"message(s) for {results['total']} subscriber(s)"
+                )
+            return True
+        except Exception as e:
+            logger.error(
+                f"❌ Unexpected error sending merged alerts: {type(e).__name__}: {e}",
+                extra={"stage": "deliver", "error": type(e).__name__}
+            )
+            return False
+    
+    def send_notification(self, message: str, title: str = "Wallet Update", wallet_name: str = None,
+                          event_type: str = None, usd_value: float = None, critical: bool = False) -> bool:
+        """
+        Send notification through all enabled channels.
+        wallet_name/event_type/usd_value route the alert to interested subscribers only;
+        without them the message goes to every subscriber.
+        Critical alerts skip coalescing and use the highest-priority delivery lane.
+        """
         success = True
         
         # Send to console
         if self.console_enabled:
             self._send_to_console(message, title)
         
+        priority = self.priority_for(event_type, critical)
+        
+        # Hold routed alerts while a batch is open
+        if self._batching and event_type is not None and priority != PRIORITY_CRITICAL:
+            self.coalescer.add(message, wallet_name, event_type, usd_value, priority)
+            return success
+        
         # Send Telegram
         if self.telegram_config.get("enabled", False):
-            telegram_success = self._send_telegram(message)
+            telegram_success = self._send_telegram(message, wallet_name, event_type, usd_value, priority, title)
             success = success and telegram_success
         
         return success
@@ -94,124 +257,38 @@ class NotificationSystem:
         print('\n'.join(formatted_lines))
         print(f"{colors['cyan']}{'='*60}{colors['end']}\n")
     
-    def _send_telegram(self, message: str) -> bool:
-        """Send Telegram notification to all subscribers with rate limiting and error handling"""
+    def _send_telegram(self, message: str, wallet_name: str = None, event_type: str = None,
+                       usd_value: float = None, priority: int = PRIORITY_INFO, title: str = "message") -> bool:
+        """Queue a Telegram notification for interested subscribers in its priority lane"""
         if not self.bot_manager:
-            print("⚠️  Bot manager not initialized")
+            logger.warning("⚠️  Bot manager not initialized")
             return False
         
-        # Rate limiting
-        elapsed = time.time() - self._last_telegram_call
-        if elapsed < self._min_telegram_interval:
-            time.sleep(self._min_telegram_interval - elapsed)
-        
         try:
-            # Broadcast to all subscribers
-            results = self.bot_manager.broadcast_message(message)
-            self._last_telegram_call = time.time()
-            
-            if results["success"] > 0:
-                print(f"✅ Telegram notification sent to {results['success']}/{results['total']} subscribers")
-                if results["failed"] > 0:
-                    print(f"⚠️  Failed to send to {results['failed']} subscribers")
+            # Broadcast to subscribers routed for this event
+            recipients = self.bot_manager.get_recipients(wallet_name, event_type, usd_value)
+            if not recipients and not self.bot_manager.broadcasts_to_channel:
+                logger.info(f"🔕 No subscribers interested in this notification")
                 return True
-            else:
-                print(f"❌ Failed to send Telegram notifications to all {results['total']} subscribers")
-                return False
+            
+            jobs = self.bot_manager.plan_delivery(message, recipients)
+            self._queue_delivery(jobs, priority, title)
+            return True
                 
         except Exception as e:
-            print(f"❌ Unexpected error sending Telegram notification: {type(e).__name__}: {e}")
+            logger.error(
+                f"❌ Unexpected error sending Telegram notification: {type(e).__name__}: {e}",
+                extra={"wallet": wallet_name, "stage": "deliver", "error": type(e).__name__}
+            )
             return False
     
     def format_balance_change(self, old_balance: float, new_balance: float, change: float, wallet_name: str = "Main Wallet") -> str:
         """Format balance change notification"""
-        direction = "📈" if change > 0 else "📉"
-        return f"""
-{direction} <b>BALANCE CHANGE</b>
-
-💼 <b>Wallet:</b> {wallet_name}
-📊 <b>Previous:</b> {old_balance:.4f} ETH
-📊 <b>New:</b> {new_balance:.4f} ETH
-💸 <b>Change:</b> {change:+.4f} ETH ({(change/old_balance*100):+.2f}%)
-🕐 <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        """
+        return self.templates.render_balance_change(old_balance, new_balance, change, wallet_name).text
     
     def format_position_change(self, positions: Dict, change_type: str = "change", wallet_name: str = "Main Wallet") -> str:
         """Format position change notification"""
-        if not positions or "marginSummary" not in positions:
-            return f"📊 Position data unavailable for {wallet_name}"
-        
-        margin_summary = positions.get("marginSummary", {})
-        account_value = float(margin_summary.get("accountValue", 0))
-        total_ntl_pos = float(margin_summary.get("totalNtlPos", 0))
-        withdrawable = float(margin_summary.get("withdrawable", 0))
-        
-        # Calculate total unrealized PnL from all positions
-        total_unrealized_pnl = 0
-        asset_positions = positions.get("assetPositions", [])
-        for pos_data in asset_positions:
-            if pos_data.get('position'):
-                pos = pos_data['position']
-                if pos.get('szi') and float(pos['szi']) != 0:
-                    total_unrealized_pnl += float(pos.get('unrealizedPnl', 0))
-        
-        # Calculate margin usage
-        margin_used = account_value - withdrawable if account_value > 0 else 0
-        margin_usage = (margin_used / account_value) if account_value > 0 else 0
-        
-        # Choose appropriate emoji and title based on change type
-        if change_type == "position_opened":
-            emoji = "🚀"
-            title = "POSITION OPENED"
-        elif change_type == "position_closed":
-            emoji = "✅"
-            title = "POSITION CLOSED"
-        else:
-            emoji = "🔄"
-            title = "POSITION CHANGED"
-        
-        summary = f"""
-{emoji} <b>{title}</b>
-
-💼 <b>Wallet:</b> {wallet_name}
-📊 <b>Account Value:</b> ${account_value:,.2f}
-💵 <b>Position Value:</b> ${abs(total_ntl_pos):,.2f}
-💰 <b>Unrealized PnL:</b> ${total_unrealized_pnl:,.2f}
-📈 <b>Margin Usage:</b> {margin_usage*100:.2f}%
-🕐 <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        """
-        
-        # Add individual positions if available
-        if asset_positions:
-            summary += "\n📈 POSITIONS:\n"
-            for pos in asset_positions[:5]:  # Show top 5 positions
-                if "position" in pos and pos["position"]:
-                    position = pos["position"]
-                    coin = position.get("coin", "Unknown")
-                    size = position.get("szi", 0)
-                    entry_price = position.get("entryPx", 0)
-                    position_value = position.get("positionValue", 0)
-                    unrealized_pnl = position.get("unrealizedPnl", 0)
-                    leverage = position.get("leverage", {}).get("value", 0)
-                    liquidation_price = position.get("liquidationPx", 0)
-                    margin_used = position.get("marginUsed", 0)
-                    
-                    # Determine side (long if size > 0, short if size < 0)
-                    side = "LONG" if float(size) > 0 else "SHORT"
-                    
-                    # Calculate current price (position value / size)
-                    try:
-                        current_price = abs(float(position_value) / float(size)) if float(size) != 0 else 0
-                    except:
-                        current_price = 0
-                    
-                    if float(size) != 0:
-                        summary += f"  • {coin} {side}: {size} @ ${entry_price}\n"
-                        summary += f"    PnL: ${unrealized_pnl} | Leverage: {leverage}x\n"
-                        summary += f"    Position Value: ${position_value}\n"
-                        summary += f"    Liq Price: ${liquidation_price} | Margin Used: ${margin_used}\n\n"
-        
-        return summary
+        return self.templates.render_position_change(positions, change_type, wallet_name).text
     
     def format_transaction_alert(self, tx: Dict) -> str:
         """Format transaction notification"""
@@ -229,141 +306,8 @@ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     
     def format_deposit_withdrawal(self, transactions: List[Dict], wallet_name: str = "Main Wallet") -> str:
         """Format deposit/withdrawal notifications"""
-        if not transactions:
-            return "No transactions to display"
-        
-        summary = f"💰 <b>DEPOSIT/WITHDRAWAL DETECTED</b>\n\n"
-        summary += f"💼 <b>Wallet:</b> {wallet_name}\n"
-        summary += f"🕐 <b>Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        
-        for tx in transactions:
-            asset = tx.get("asset", "Unknown")
-            wallet_address = "0xc2a30212a8ddac9e123944d6e29faddce994e5f2".lower()
-            
-            # Calculate value based on asset type
-            if asset == "ETH":
-                value = float(tx.get("value", 0)) / 10**18
-                value_str = f"{value:.4f} {asset}"
-            else:
-                # For tokens (like BTC), the value is already in the correct decimal format
-                value = float(tx.get("value", 0)) / (10 ** int(tx.get("tokenDecimal", 18)))
-                value_str = f"{value:.6f} {asset}"
-            
-            # Determine if it's a deposit or withdrawal
-            if tx.get("from", "").lower() == wallet_address:
-                tx_type = "WITHDRAWAL"
-                emoji = "📤"
-                recipient = tx.get("to", "Unknown")[:10] + "..." if tx.get("to") else "Unknown"
-                summary += f"{emoji} <b>{tx_type}:</b> {value_str}\n"
-                summary += f"   📍 <b>To:</b> <code>{recipient}</code>\n"
-            elif tx.get("to", "").lower() == wallet_address:
-                tx_type = "DEPOSIT"
-                emoji = "📥"
-                sender = tx.get("from", "Unknown")[:10] + "..." if tx.get("from") else "Unknown"
-                summary += f"{emoji} <b>{tx_type}:</b> {value_str}\n"
-                summary += f"   📍 <b>From:</b> <code>{sender}</code>\n"
-            
-            summary += f"   🔗 <b>Hash:</b> <code>{tx.get('hash', 'Unknown')[:20]}...</code>\n\n"
-        
-        return summary
+        return self.templates.render_deposit_withdrawal(transactions, wallet_name).text
     
-    def format_hyperliquid_summary(self, positions: Dict, stats: Dict = None) -> str:
+    def format_hyperliquid_summary(self, positions: Dict, stats: Dict = None, wallet_name: str = None) -> str:
         """Format Hyperliquid position summary with detailed statistics"""
-        if not positions or "marginSummary" not in positions:
-            return "Position data unavailable"
-        
-        margin_summary = positions.get("marginSummary", {})
-        account_value = float(margin_summary.get("accountValue", 0))
-        total_ntl_pos = float(margin_summary.get("totalNtlPos", 0))
-        withdrawable = float(margin_summary.get("withdrawable", 0))
-        
-        # Calculate total unrealized PnL from all positions
-        total_unrealized_pnl = 0
-        asset_positions = positions.get("assetPositions", [])
-        for pos_data in asset_positions:
-            if pos_data.get('position'):
-                pos = pos_data['position']
-                if pos.get('szi') and float(pos['szi']) != 0:
-                    total_unrealized_pnl += float(pos.get('unrealizedPnl', 0))
-        
-        # Calculate margin usage
-        margin_used = account_value - withdrawable if account_value > 0 else 0
-        margin_usage = (margin_used / account_value) if account_value > 0 else 0
-        
-        # Get individual positions
-        asset_positions = positions.get("assetPositions", [])
-        
-        # If stats provided, use detailed statistics
-        if stats:
-            total_pos_value = stats.get("total_position_value", abs(total_ntl_pos))
-            long_value = stats.get("long_value", 0)
-            short_value = stats.get("short_value", 0)
-            win_rate = stats.get("win_rate", 0)
-            leverage = stats.get("leverage", 0)
-            long_pct = stats.get("long_percentage", 0)
-            short_pct = stats.get("short_percentage", 0)
-            
-            summary = f"""
-📊 HYPERLIQUID POSITION SUMMARY
-Wallet: 0xc2a3...e5f2
-Account Value: ${account_value:,.2f}
-Total Position Value: ${total_pos_value:,.2f}
-Unrealized PnL: ${total_unrealized_pnl:,.2f}
-Margin Usage: {margin_usage*100:.2f}%
-Open Positions: {stats.get('position_count', len(asset_positions))}
-Win Rate: {win_rate:.1f}%
-Leverage: {leverage:.2f}x
-Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-📈 POSITION BREAKDOWN:
-• Long: ${long_value:,.2f} ({long_pct:.1f}%)
-• Short: ${short_value:,.2f} ({short_pct:.1f}%)
-            """
-        else:
-            # Fallback to original format if no stats provided
-            summary = f"""
-📊 HYPERLIQUID POSITION SUMMARY
-Wallet: 0xc2a3...e5f2
-Account Value: ${account_value:,.2f}
-Total Position Value: ${abs(total_ntl_pos):,.2f}
-Unrealized PnL: ${total_unrealized_pnl:,.2f}
-Margin Usage: {margin_usage*100:.2f}%
-Open Positions: {len(asset_positions)}
-Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            """
-        
-        # Add individual positions if available
-        if asset_positions:
-            summary += "\n🔍 ACTIVE POSITIONS:\n"
-            for pos_data in asset_positions[:5]:  # Show top 5 positions
-                if "position" in pos_data and pos_data["position"]:
-                    position = pos_data["position"]
-                    coin = position.get("coin", "Unknown")
-                    size = float(position.get("szi", 0))
-                    entry_price = float(position.get("entryPx", 0))
-                    position_value = float(position.get("positionValue", 0))
-                    pnl = float(position.get("unrealizedPnl", 0))
-                    leverage = position.get("leverage", {}).get("value", 0)
-                    liquidation_price = float(position.get("liquidationPx", 0))
-                    
-                    if size != 0:  # Only show active positions
-                        side = "LONG" if size > 0 else "SHORT"
-                        size_abs = abs(size)
-                        pnl_emoji = "🟢" if pnl > 0 else "🔴" if pnl < 0 else "⚪"
-                        margin_used = float(position.get("marginUsed", 0))
-                        
-                        # Calculate current price and other metrics
-                        current_price = abs(position_value / size) if size != 0 else 0
-                        roe = float(position.get("returnOnEquity", 0)) * 100
-                        funding = position.get("cumFunding", {})
-                        funding_since_open = float(funding.get("sinceOpen", 0))
-                        funding_change = float(funding.get("sinceChange", 0))
-                        funding_emoji = "💰" if funding_since_open > 0 else "💸" if funding_since_open < 0 else "⚪"
-                        
-                        summary += f"  {pnl_emoji} {coin} {side}: {size_abs:,.2f} @ ${entry_price:,.2f}\n"
-                        summary += f"     Current: ${current_price:,.2f} | PnL: ${pnl:,.2f} ({roe:+.2f}%)\n"
-                        summary += f"     Value: ${position_value:,.2f} | Lev: {leverage}x | ROE: {roe:+.1f}%\n"
-                        summary += f"     Liq Price: ${liquidation_price:,.2f} | Margin: ${margin_used:,.2f}\n"
-                        summary += f"     {funding_emoji} Funding: ${funding_since_open:+,.2f} (${funding_change:+,.2f} recent)\n\n"
-        
-        return summary
+        return self.templates.render_hyperliquid_summary(positions, stats, wallet_name).text
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Portfolio Statistics
+Exposure, net long/short per coin, concentration and leverage for every
+monitored wallet and across all of them, computed in one pass over a flat
+table of positions. With NumPy installed the per-wallet and per-coin sums
+are vectorized (bincount); without it the same figures come from plain loops
+"""
+
+import math
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Aggregation backend in use ("numpy" or "python")
+BACKEND = "numpy" if np is not None else "python"
+
+
+class PositionTable:
+    """Active positions of many wallets as parallel columns"""
+
+    def __init__(self, positions_by_wallet: Dict[str, Optional[Dict]]):
+        self.wallets: List[str] = list(positions_by_wallet)
+        self.account_values: List[float] = []
+        coin_index: Dict[str, int] = {}
+        self.wallet_idx: List[int] = []
+        self.coin_idx: List[int] = []
+        self.sizes: List[float] = []
+        # Signed notional: positive for longs, negative for shorts
+        self.values: List[float] = []
+        self.pnls: List[float] = []
+
+        for i, wallet_name in enumerate(self.wallets):
+            positions = positions_by_wallet[wallet_name] or {}
+            self.account_values.append(float((positions.get("marginSummary") or {}).get("accountValue", 0)))
+            for asset in positions.get("assetPositions", []):
+                position = asset.get("position") or {}
+                size = float(position.get("szi") or 0)
+                if not size:
+                    continue
+                self.wallet_idx.append(i)
+                self.coin_idx.append(coin_index.setdefault(position.get("coin", ""), len(coin_index)))
+                self.sizes.append(size)
+                self.values.append(math.copysign(abs(float(position.get("positionValue") or 0)), size))
+                self.pnls.append(float(position.get("unrealizedPnl") or 0))
+        self.coins: List[str] = list(coin_index)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _aggregate_numpy(table: PositionTable) -> Dict[str, list]:
+    n_wallets, n_coins = len(table.wallets), len(table.coins)
+    wallets = np.asarray(table.wallet_idx, dtype=np.intp)
+    coins = np.asarray(table.coin_idx, dtype=np.intp)
+    values = np.asarray(table.values, dtype=np.float64)
+    longs = np.where(values > 0, values, 0.0)
+    shorts = np.where(values < 0, -values, 0.0)
+    gross = np.abs(values)
+
+    # Largest position of each wallet: last entry per wallet when sorted by (wallet, |value|)
+    top_coin = np.full(n_wallets, -1, dtype=np.intp)
+    top_value = np.zeros(n_wallets)
+    if len(values):
+        order = np.lexsort((gross, wallets))
+        last = np.append(wallets[order][1:] != wallets[order][:-1], True)
+        top_coin[wallets[order][last]] = coins[order][last]
+        top_value[wallets[order][last]] = gross[order][last]
+
+    return {
+        "wallet_long": np.bincount(wallets, longs, n_wallets).tolist(),
+        "wallet_short": np.bincount(wallets, shorts, n_wallets).tolist(),
+        "wallet_pnl": np.bincount(wallets, np.asarray(table.pnls, dtype=np.float64), n_wallets).tolist(),
+        "wallet_count": np.bincount(wallets, minlength=n_wallets).tolist(),
+        "wallet_top_coin": top_coin.tolist(),
+        "wallet_top_value": top_value.tolist(),
+        "coin_long": np.bincount(coins, longs, n_coins).tolist(),
+        "coin_short": np.bincount(coins, shorts, n_coins).tolist(),
+        "coin_size": np.bincount(coins, np.asarray(table.sizes, dtype=np.float64), n_coins).tolist(),
+        "coin_count": np.bincount(coins, minlength=n_coins).tolist(),
+    }
+
+
+def _aggregate_python(table: PositionTable) -> Dict[str, list]:
+    n_wallets, n_coins = len(table.wallets), len(table.coins)
+    sums = {
+        "wallet_long": [0.0] * n_wallets, "wallet_short": [0.0] * n_wallets, "wallet_pnl": [0.0] * n_wallets,
+        "wallet_count": [0] * n_wallets, "wallet_top_coin": [-1] * n_wallets, "wallet_top_value": [0.0] * n_wallets,
+        "coin_long": [0.0] * n_coins, "coin_short": [0.0] * n_coins, "coin_size": [0.0] * n_coins,
+        "coin_count": [0] * n_coins,
+    }
+    for wallet, coin, size, value, pnl in zip(table.wallet_idx, table.coin_idx, table.sizes, table.values, table.pnls):
+        side = "long" if value > 0 else "short"
+        sums[f"wallet_{side}"][wallet] += abs(value)
+        sums[f"coin_{side}"][coin] += abs(value)
+        sums["wallet_pnl"][wallet] += pnl
+        sums["wallet_count"][wallet] += 1
+        sums["coin_size"][coin] += size
+        sums["coin_count"][coin] += 1
+        if abs(value) > sums["wallet_top_value"][wallet] or sums["wallet_top_coin"][wallet] < 0:
+            sums["wallet_top_value"][wallet] = abs(value)
+            sums["wallet_top_coin"][wallet] = coin
+    return sums
+
+
+def portfolio_stats(positions_by_wallet: Dict[str, Optional[Dict]]) -> Dict:
+    """
+    Per-wallet and cross-wallet exposure from clearinghouseState responses
+    keyed by wallet name (None for wallets without data). Coins are sorted
+    by gross exposure
+    """
+    table = PositionTable(positions_by_wallet)
+    sums = _aggregate_numpy(table) if np is not None else _aggregate_python(table)
+
+    wallets = {}
+    for i, wallet_name in enumerate(table.wallets):
+        long_value, short_value = sums["wallet_long"][i], sums["wallet_short"][i]
+        gross = long_value + short_value
+        account_value = table.account_values[i]
+        top = sums["wallet_top_coin"][i]
+        wallets[wallet_name] = {
+            "account_value": account_value,
+            "long_value": long_value,
+            "short_value": short_value,
+            "net_value": long_value - short_value,
+            "gross_value": gross,
+            "leverage": gross / account_value if account_value > 0 else 0,
+            "unrealized_pnl": sums["wallet_pnl"][i],
+            "positions": sums["wallet_count"][i],
+            "top_coin": table.coins[top] if top >= 0 else None,
+            # Share of the wallet's exposure in its largest position
+            "concentration": sums["wallet_top_value"][i] / gross if gross else 0
+        }
+
+    total_long, total_short = sum(sums["coin_long"]), sum(sums["coin_short"])
+    total_gross = total_long + total_short
+    coins = {}
+    for i in sorted(range(len(table.coins)), key=lambda i: sums["coin_long"][i] + sums["coin_short"][i], reverse=True):
+        gross = sums["coin_long"][i] + sums["coin_short"][i]
+        coins[table.coins[i]] = {
+            "long_value": sums["coin_long"][i],
+            "short_value": sums["coin_short"][i],
+            "net_value": sums["coin_long"][i] - sums["coin_short"][i],
+            "gross_value": gross,
+            "net_size": sums["coin_size"][i],
+            "wallets": sums["coin_count"][i],
+            "share": gross / total_gross if total_gross else 0
+        }
+
+    total_account = sum(table.account_values)
+    return {
+        "backend": BACKEND,
+        "wallets": wallets,
+        "coins": coins,
+        "totals": {
+            "wallets": len(table.wallets),
+            "positions": len(table),
+            "account_value": total_account,
+            "long_value": total_long,
+            "short_value": total_short,
+            "net_value": total_long - total_short,
+            "gross_value": total_gross,
+            "leverage": total_gross / total_account if total_account > 0 else 0,
+            "unrealized_pnl": sum(sums["wallet_pnl"]),
+            # Herfindahl index of coin exposure: 1 = a single coin, 1/N = spread evenly over N coins
+            "concentration": sum(coin["share"] ** 2 for coin in coins.values()),
+            "top_coin": next(iter(coins), None)
+        }
+    }
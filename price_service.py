@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Price Service
+USD prices for every asset from a single Hyperliquid allMids request,
+cached for a short TTL and shared by all trackers. A cycle takes one
+snapshot with refresh() and every lookup until release() reuses it, so
+each cycle costs one price fetch however long it runs and however many
+wallets, tokens and positions it values
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+
+from json_stream import loads
+from metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Tokens priced as another asset (wrapped/staked) or pegged to the dollar
+PRICE_ALIASES = {"WETH": "ETH", "STETH": "ETH", "WSTETH": "ETH", "WBTC": "BTC", "CBBTC": "BTC"}
+STABLECOINS = {"USDC", "USDT", "DAI", "USDE", "PYUSD", "FDUSD"}
+
+
+class PriceService:
+    def __init__(self, hyperliquid_url: str = "https://api.hyperliquid.xyz/info", ttl: float = 30.0,
+                 overrides: Dict[str, float] = None, session: requests.Session = None):
+        self.hyperliquid_url = hyperliquid_url
+        self.http = session or requests.Session()
+        self.ttl = ttl
+        # Fixed prices for assets Hyperliquid doesn't list (PRICE_OVERRIDES)
+        self.overrides = {symbol.upper(): float(price) for symbol, price in (overrides or {}).items()}
+        self._prices: Dict[str, float] = {}
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        # Set between refresh() and release(): lookups use the cycle's snapshot, without TTL checks
+        self._pinned = False
+
+    def _fetch(self) -> Dict[str, float]:
+        started = time.perf_counter()
+        try:
+            with span("hyperliquid.allMids"):
+                response = self.http.post(self.hyperliquid_url, json={"type": "allMids"}, timeout=10)
+                mids = loads(response.content)
+            return {coin.upper(): float(mid) for coin, mid in mids.items()}
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(upstream="hyperliquid", endpoint="allMids", error=type(e).__name__)
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream="hyperliquid", endpoint="allMids")
+
+    def prices(self, max_age: float = None) -> Dict[str, float]:
+        """All mid prices, refetched once they are older than the TTL (stale on error)"""
+        max_age = self.ttl if max_age is None else max_age
+        # One fetch at a time; concurrent callers reuse its result
+        with self._lock:
+            if time.time() - self._fetched_at > max_age:
+                try:
+                    self._prices = self._fetch()
+                except Exception as e:
+                    logger.warning(f"⚠️  Error fetching prices, using last known: {e}",
+                                   extra={"stage": "fetch", "upstream": "hyperliquid", "error": type(e).__name__})
+                # Failed fetches are retried after a TTL too, not by every caller
+                self._fetched_at = time.time()
+            return self._prices
+
+    def refresh(self) -> Dict[str, float]:
+        """Take the snapshot of a cycle (fetched unless already fresh), used until release()"""
+        prices = self.prices()
+        self._pinned = True
+        return prices
+
+    def release(self):
+        """End of a cycle: lookups check the TTL again"""
+        self._pinned = False
+
+    def price(self, symbol: str) -> Optional[float]:
+        """USD price of an asset symbol, None if unknown"""
+        symbol = (symbol or "").upper()
+        if symbol in self.overrides:
+            return self.overrides[symbol]
+        if symbol in STABLECOINS:
+            return 1.0
+        prices = self._prices if self._pinned else self.prices()
+        return prices.get(PRICE_ALIASES.get(symbol, symbol))
+
+    def usd_value(self, symbol: str, amount: float) -> Optional[float]:
+        price = self.price(symbol)
+        return abs(amount) * price if price is not None else None
+
+
+PRICES = PriceService()
+
+
+def configure_prices(hyperliquid_url: str, ttl: float = 30.0, overrides: Dict[str, float] = None,
+                     session: requests.Session = None) -> PriceService:
+    """Point the shared price service at the configured API (and connection pool)"""
+    PRICES.hyperliquid_url = hyperliquid_url
+    if session is not None:
+        PRICES.http = session
+    PRICES.ttl = ttl
+    PRICES.overrides = {symbol.upper(): float(price) for symbol, price in (overrides or {}).items()}
+    return PRICES
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Risk Monitor
+Distance of every Hyperliquid position from its liquidation price, valued
+with live mid prices and sorted into tiers (warning, danger, critical).
+Alerts go out when a position moves into a worse tier, and wallets inside
+the danger band are rechecked every RISK_RECHECK_INTERVAL seconds instead
+of waiting for the next full cycle
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from price_service import PRICES, PriceService
+
+logger = logging.getLogger(__name__)
+
+RISK_TIERS = ("safe", "warning", "danger", "critical")
+RISK_EMOJIS = {"safe": "🟢", "warning": "🟡", "danger": "🟠", "critical": "🔴"}
+
+# Wallets with a position at this tier or worse get the fast recheck
+RECHECK_TIER = RISK_TIERS.index("danger")
+
+# A position only leaves a tier once it is this much further away than the tier's
+# limit, so a price hovering around a limit doesn't alert on every recheck
+RECOVERY_MARGIN = 0.01
+
+
+def liquidation_distance(position: Dict, mid: Optional[float]) -> Optional[float]:
+    """Share of the price a position can move before liquidation (0.1 = 10%), None without one"""
+    try:
+        size = float(position.get("szi", 0))
+        liquidation_px = float(position.get("liquidationPx") or 0)
+        if not size or liquidation_px <= 0:
+            return None
+        if not mid:
+            # Mark price implied by the position value when the coin has no mid
+            mid = float(position.get("positionValue", 0)) / abs(size)
+        if mid <= 0:
+            return None
+        distance = (mid - liquidation_px) / mid if size > 0 else (liquidation_px - mid) / mid
+        return max(distance, 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RiskMonitor:
+    def __init__(self, warning: float = 0.20, danger: float = 0.10, critical: float = 0.05,
+                 prices: PriceService = PRICES):
+        # Distance limits per tier, worst first
+        self.limits = {"critical": critical, "danger": danger, "warning": warning}
+        self.prices = prices
+        # wallet -> coin -> tier index
+        self._tiers: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _tier(self, distance: float, previous: int) -> int:
+        for index in range(len(RISK_TIERS) - 1, 0, -1):
+            limit = self.limits[RISK_TIERS[index]]
+            if distance <= limit or (index <= previous and distance <= limit + RECOVERY_MARGIN):
+                return index
+        return 0
+
+    def assess(self, wallet_name: str, positions: Dict) -> List[Dict]:
+        """
+        Update the tiers of a wallet's positions and return the ones that
+        moved into a worse tier (sorted closest to liquidation first)
+        """
+        if not positions or "assetPositions" not in positions:
+            return []
+        escalated = []
+        tiers = {}
+        with self._lock:
+            previous_tiers = self._tiers.get(wallet_name, {})
+            for asset in positions["assetPositions"]:
+                position = asset.get("position") or {}
+                coin = position.get("coin", "")
+                mid = self.prices.price(coin)
+                distance = liquidation_distance(position, mid)
+                if distance is None:
+                    continue
+                previous = previous_tiers.get(coin, 0)
+                tier = self._tier(distance, previous)
+                tiers[coin] = tier
+                if tier > previous:
+                    size = float(position.get("szi", 0))
+                    escalated.append({
+                        "coin": coin,
+                        "side": "LONG" if size > 0 else "SHORT",
+                        "size": size,
+                        "mid": mid,
+                        "liquidation_px": float(position["liquidationPx"]),
+                        "distance": distance,
+                        "tier": RISK_TIERS[tier],
+                        "position_value": float(position.get("positionValue", 0))
+                    })
+                elif tier < previous:
+                    logger.info(f"✅ {wallet_name} {coin}: back to {RISK_TIERS[tier]} ({distance:.1%} from liquidation)",
+                                extra={"wallet": wallet_name, "stage": "risk"})
+            self._tiers[wallet_name] = tiers
+        return sorted(escalated, key=lambda risk: risk["distance"])
+
+    def tier_of(self, wallet_name: str) -> str:
+        """Worst tier among a wallet's positions"""
+        with self._lock:
+            return RISK_TIERS[max(self._tiers.get(wallet_name, {}).values(), default=0)]
+
+    def at_risk(self) -> List[str]:
+        """Wallets inside the danger band, which get the fast recheck"""
+        with self._lock:
+            return [wallet for wallet, tiers in self._tiers.items()
+                    if max(tiers.values(), default=0) >= RECHECK_TIER]
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Sharding
+Splits a large WALLETS list across worker processes (or containers) with
+consistent hashing. Each worker checks only its shard, with its own upstream
+quota, and sends the alert events of every cycle to a single coordinator
+that owns the Telegram bot, the subscriber list and delivery
+"""
+
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing.managers import BaseManager
+from typing import Dict, Iterable, List, Tuple
+
+from metrics import CYCLE_DURATION, STARTUP_DURATION, WALLETS, WALLET_CHECK_DURATION, start_metrics_server
+from tracing import span
+from token_metadata import TOKENS
+from history_store import HISTORY
+from price_service import PRICES
+
+logger = logging.getLogger(__name__)
+
+# Virtual nodes per shard; more keeps the shards evenly sized
+RING_REPLICAS = 100
+# How long the coordinator waits for every shard's warm-up before the startup summary
+READY_TIMEOUT = 300
+
+
+class HashRing:
+    """Consistent hash ring: adding a shard only moves about 1/N of the keys"""
+
+    def __init__(self, nodes: Iterable, replicas: int = RING_REPLICAS):
+        self._ring = sorted((self._hash(f"{node}#{i}"), node) for node in nodes for i in range(replicas))
+        self._hashes = [point for point, _ in self._ring]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def node_for(self, key: str):
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._ring[index][1]
+
+
+def shard_wallets(wallets: Dict[str, str], shard_count: int) -> List[Dict[str, str]]:
+    """Split wallets into shard_count dicts; a wallet always lands on the same shard"""
+    ring = HashRing(range(shard_count))
+    shards = [{} for _ in range(shard_count)]
+    for wallet_name, address in wallets.items():
+        shards[ring.node_for(address.lower())][wallet_name] = address
+    return shards
+
+
+def shard_api_key(config: dict, shard_index: int) -> str:
+    """Etherscan key of a shard (ETHERSCAN_API_KEYS round-robin, else the shared key)"""
+    keys = config.get("etherscan_api_keys") or []
+    return keys[shard_index % len(keys)] if keys else config["etherscan_api_key"]
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class _HubServer(BaseManager):
+    pass
+
+
+class _HubClient(BaseManager):
+    pass
+
+
+_HubClient.register("events")
+
+
+def serve_hub(address: str, authkey: bytes) -> queue.Queue:
+    """Listen for worker connections; returns the queue their events arrive on"""
+    events = queue.Queue()
+    _HubServer.register("events", callable=lambda: events)
+    server = _HubServer(address=parse_address(address), authkey=authkey).get_server()
+    threading.Thread(target=server.serve_forever, name="shard-hub", daemon=True).start()
+    logger.info(f"🧩 Shard hub listening on {address}")
+    return events
+
+
+def connect_hub(address: str, authkey: bytes, retry_interval: float = 2.0):
+    """Proxy of the coordinator's event queue (waits until the coordinator is up)"""
+    while True:
+        client = _HubClient(address=parse_address(address), authkey=authkey)
+        try:
+            client.connect()
+            return client.events()
+        except (ConnectionError, OSError) as e:
+            logger.warning(f"⏳ Coordinator at {address} not reachable ({e}), retrying...")
+            time.sleep(retry_interval)
+
+
+def run_worker(config: dict, shard_index: int, authkey: bytes = None):
+    """
+    Check one shard forever: warm up, then every check interval send the
+    cycle's alert events to the coordinator
+    """
+    from main import CryptoWalletMonitor
+
+    shard_count = config["shard_count"]
+    wallets = shard_wallets(config["wallets"], shard_count)[shard_index]
+    config = dict(config, etherscan_api_key=shard_api_key(config, shard_index))
+    authkey = authkey or config["shard_hub_authkey"].encode()
+
+    try:
+        monitor = CryptoWalletMonitor(config, wallets=wallets)
+        logger.info(f"🧩 Shard {shard_index} of {shard_count}: {len(wallets)} wallet(s)")
+        events = connect_hub(config["shard_hub_address"], authkey)
+
+        WALLETS.set(len(wallets))
+        start_metrics_server(config["metrics_port"], config["metrics_host"])
+
+        events.put({"type": "ready", "shard": shard_index, "summaries": monitor.warm_up()})
+
+        while True:
+            started = time.perf_counter()
+            cycle_events = []
+            with CYCLE_DURATION.time(), span("check_cycle", shard=shard_index, wallets=len(wallets)):
+                monitor.prepare_cycle()
+                chain_checks = monitor.start_chain_checks()
+                for wallet_name, tracker in monitor.trackers.items():
+                    with WALLET_CHECK_DURATION.time(wallet=wallet_name), span("check_wallet", wallet=wallet_name):
+                        cycle_events.extend(monitor.check_wallet(wallet_name, tracker))
+                for wallet_events in monitor.finish_chain_checks(chain_checks).values():
+                    cycle_events.extend(wallet_events)
+            PRICES.release()
+            elapsed = time.perf_counter() - started
+            TOKENS.save()
+            HISTORY.flush()
+
+            events.put({
+                "type": "events",
+                "shard": shard_index,
+                "wallets": len(wallets),
+                "seconds": elapsed,
+                "events": cycle_events
+            })
+            # Wallets close to liquidation are rechecked while waiting for the next cycle
+            next_cycle = started + monitor.check_interval
+            while time.perf_counter() < next_cycle:
+                interval = monitor.risk_recheck_interval or monitor.check_interval
+                time.sleep(max(0.0, min(interval, next_cycle - time.perf_counter())))
+                if monitor.risk_recheck_interval and time.perf_counter() < next_cycle:
+                    recheck_started = time.perf_counter()
+                    risk_events = monitor.recheck_at_risk()
+                    if risk_events:
+                        events.put({
+                            "type": "events",
+                            "shard": shard_index,
+                            "wallets": len(monitor.risk.at_risk()),
+                            "seconds": time.perf_counter() - recheck_started,
+                            "events": risk_events
+                        })
+
+    except KeyboardInterrupt:
+        pass
+    except (ConnectionError, EOFError, BrokenPipeError) as e:
+        # Coordinator went away; the supervisor (coordinator or container) restarts us
+        logger.error(f"❌ Shard {shard_index}: lost connection to coordinator: {e}")
+        raise SystemExit(1)
+
+
+class ShardCoordinator:
+    """
+    Owns the Telegram bot and subscribers, receives alert events from the
+    shard workers and delivers them with the usual batching. Without
+    SHARD_ROLE=coordinator the workers are started here as local processes
+    """
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+        self.config = monitor.config
+        self.shard_count = max(1, self.config["shard_count"])
+        self.spawn_workers = self.config["shard_role"] != "coordinator"
+        # Local workers only need a key shared with this process
+        self.authkey = (self.config["shard_hub_authkey"].encode()
+                        if self.config["shard_hub_authkey"] else os.urandom(32))
+        self.workers: Dict[int, multiprocessing.Process] = {}
+
+    def _start_worker(self, shard_index: int):
+        worker_config = dict(self.config, shard_count=self.shard_count)
+        if worker_config["metrics_port"]:
+            # Each local worker serves its own /metrics next to the coordinator's
+            worker_config["metrics_port"] += shard_index + 1
+        process = multiprocessing.get_context("spawn").Process(
+            target=run_worker,
+            args=(worker_config, shard_index, self.authkey),
+            name=f"shard-{shard_index}",
+            daemon=True
+        )
+        process.start()
+        self.workers[shard_index] = process
+
+    def _restart_dead_workers(self):
+        for shard_index, process in list(self.workers.items()):
+            if not process.is_alive():
+                logger.warning(f"⚠️  Shard {shard_index} worker exited ({process.exitcode}), restarting")
+                self._start_worker(shard_index)
+
+    def _wait_for_shards(self, events: queue.Queue) -> list:
+        """Warm-up summaries of every shard (events arriving meanwhile are delivered)"""
+        summaries, ready = [], set()
+        deadline = time.monotonic() + READY_TIMEOUT
+        while len(ready) < self.shard_count and time.monotonic() < deadline:
+            try:
+                message = events.get(timeout=1)
+            except queue.Empty:
+                self._restart_dead_workers()
+                continue
+            if message["type"] == "ready":
+                ready.add(message["shard"])
+                summaries.extend(message["summaries"])
+            else:
+                self._deliver([message])
+
+        missing = sorted(set(range(self.shard_count)) - ready)
+        if missing:
+            logger.warning(f"⚠️  No warm-up from shard(s) {missing} after {READY_TIMEOUT}s")
+        return summaries
+
+    def _deliver(self, messages: list):
+        """Deliver the events of one or more shard cycles as one batch"""
+        notifier = self.monitor.notifier
+        notifier.begin_batch()
+        try:
+            for message in messages:
+                if message["type"] == "ready":
+                    logger.info(f"🧩 Shard {message['shard']} (re)started")
+                    continue
+
+                shard_index = message["shard"]
+                with span("shard_delivery", shard=shard_index, events=len(message["events"])):
+                    for event in message["events"]:
+                        try:
+                            self.monitor.deliver_event(event)
+                        except Exception as e:
+                            logger.error(
+                                f"   ❌ Error delivering alert for {event['wallet_name']}: {e}",
+                                extra={"wallet": event["wallet_name"], "stage": "deliver", "error": type(e).__name__}
+                            )
+                logger.info(
+                    f"✅ Shard {shard_index}: {message['wallets']} wallet(s) checked, "
+                    f"{len(message['events'])} alert(s)",
+                    extra={"stage": "cycle", "shard": shard_index, "latency_ms": round(message["seconds"] * 1000, 1)}
+                )
+        finally:
+            notifier.end_batch()
+
+    def run(self):
+        monitor = self.monitor
+        events = serve_hub(self.config["shard_hub_address"], self.authkey)
+
+        if self.spawn_workers:
+            for shard_index in range(self.shard_count):
+                self._start_worker(shard_index)
+        logger.info(
+            f"🧩 Coordinating {self.shard_count} shard(s) "
+            f"({'local processes' if self.spawn_workers else 'remote workers'})"
+        )
+
+        WALLETS.set(len(monitor.wallets))
+        monitor.metrics_server = start_metrics_server(self.config["metrics_port"], self.config["metrics_host"])
+
+        # Start the bot now so it is polling while the shards warm up
+        monitor.notifier
+        monitor.send_initial_summary(self._wait_for_shards(events))
+
+        ready = time.perf_counter() - monitor.created_at
+        STARTUP_DURATION.set(ready)
+        logger.info(f"🟢 Ready in {ready:.2f}s", extra={"stage": "startup", "latency_ms": round(ready * 1000, 1)})
+        logger.info("Press Ctrl+C to stop")
+
+        try:
+            while True:
+                try:
+                    messages = [events.get(timeout=1)]
+                except queue.Empty:
+                    if self.spawn_workers:
+                        self._restart_dead_workers()
+                    continue
+                # Cycles of several shards that arrived together share one batch
+                while True:
+                    try:
+                        messages.append(events.get_nowait())
+                    except queue.Empty:
+                        break
+                self._deliver(messages)
+        except KeyboardInterrupt:
+            for process in self.workers.values():
+                process.terminate()
+            # Don't lose alerts held for the next digest or still queued
+            monitor.notifier.end_batch(force=True)
+            monitor.notifier.wait_for_delivery(timeout=10)
+            logger.info("👋 Monitoring stopped by user")
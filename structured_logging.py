@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Structured Logging
+Log records go through a bounded in-memory queue to a background thread
+that writes them as text or JSON lines, so the monitor and bot threads
+never block on stdout
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_FORMATS = ("text", "json")
+
+# Attributes every LogRecord has; anything else was passed through extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def record_fields(record: logging.LogRecord) -> Dict:
+    """Structured fields passed with extra={...} (wallet, stage, latency_ms, error, ...)"""
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES and k != "sample"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage()
+        }
+        entry.update(record_fields(record))
+        if record.exc_text:
+            entry["traceback"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Plain messages as the console has always shown them"""
+
+    def __init__(self):
+        super().__init__("%(message)s")
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every 1/rate records marked extra={"sample": True}
+    (e.g. per-wallet "No changes" lines); other records always pass
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sample", False):
+            return True
+        if not self.every:
+            return False
+        with self._lock:
+            count = self._counts.get(record.msg, 0)
+            self._counts[record.msg] = count + 1
+        return count % self.every == 0
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now; the writer thread only formats
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not hasattr(record, "error"):
+                record.error = record.exc_info[0].__name__
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def setup_logging(level: str = "INFO", log_format: str = "text", sample_rate: float = 1.0,
+                  queue_size: int = 10000) -> logging.Logger:
+    """Route all logging through the non-blocking queue (safe to call again to reconfigure)"""
+    global _listener, _handler
+
+    if log_format not in LOG_FORMATS:
+        log_format = "text"
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+    root = logging.getLogger()
+    if _listener:
+        _listener.stop()
+        root.removeHandler(_handler)
+
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    _handler.addFilter(SamplingFilter(sample_rate))
+    _listener = QueueListener(_handler.queue, stream)
+    _listener.start()
+
+    root.addHandler(_handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    # Connection pool chatter is only useful when debugging HTTP itself
+    logging.getLogger("urllib3").setLevel(logging.WARNING)
+    return root
+
+
+def shutdown_logging():
+    """Write out queued records (called automatically at exit)"""
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+    if _handler and _handler.dropped:
+        print(f"⚠️  {_handler.dropped} log record(s) dropped (log queue full)", file=sys.stderr)
+
+
+atexit.register(shutdown_logging)
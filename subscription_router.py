@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Subscription Router
+Keeps per-subscriber filters and a precomputed routing table so each
+event is delivered only to the chats that asked for it
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Event types a subscriber can filter on
+EVENT_TYPES = ("balance", "position", "deposit")
+
+
+def default_preferences() -> Dict:
+    """Preferences of a subscriber that receives everything"""
+    return {
+        "wallets": None,  # None = all wallets
+        "events": None,   # None = all event types
+        "min_usd": 0.0
+    }
+
+
+class SubscriptionRouter:
+    def __init__(self, wallets: Iterable[str] = ()):
+        self._lock = threading.Lock()
+        self.wallets: List[str] = list(wallets)
+        self.preferences: Dict[int, Dict] = {}
+        # (wallet, event_type) -> chats without a USD floor
+        self._routes: Dict[Tuple[str, str], Set[int]] = {}
+        # (wallet, event_type) -> {chat_id: min_usd} for chats with a USD floor
+        self._thresholds: Dict[Tuple[str, str], Dict[int, float]] = {}
+        self._rebuild()
+
+    def set_wallets(self, wallets: Iterable[str]):
+        """Replace the list of known wallets and rebuild the routing table"""
+        with self._lock:
+            self.wallets = list(wallets)
+            self._rebuild()
+
+    def resolve_wallet(self, name: str) -> Optional[str]:
+        """Find a configured wallet by name (case-insensitive)"""
+        for wallet in self.wallets:
+            if wallet.lower() == name.strip().lower():
+                return wallet
+        return None
+
+    def add(self, chat_id: int, preferences: Dict = None):
+        """Register a chat with the given (or default) preferences"""
+        with self._lock:
+            self._unroute(chat_id)
+            prefs = default_preferences()
+            if preferences:
+                prefs.update(preferences)
+            self.preferences[chat_id] = prefs
+            self._route(chat_id)
+
+    def remove(self, chat_id: int):
+        """Forget a chat and drop it from every route"""
+        with self._lock:
+            self._unroute(chat_id)
+            self.preferences.pop(chat_id, None)
+
+    def update(self, chat_id: int, **changes) -> Dict:
+        """Change some preferences of a chat and re-route only that chat"""
+        with self._lock:
+            self._unroute(chat_id)
+            prefs = self.preferences.setdefault(chat_id, default_preferences())
+            prefs.update(changes)
+            self._route(chat_id)
+            return dict(prefs)
+
+    def get_preferences(self, chat_id: int) -> Dict:
+        """Get a copy of the preferences of a chat"""
+        with self._lock:
+            return dict(self.preferences.get(chat_id, default_preferences()))
+
+    def recipients(self, wallet_name: str, event_type: str, usd_value: Optional[float] = None) -> Set[int]:
+        """
+        Get the chats interested in an event.
+        Events without a known USD value are not filtered by min_usd.
+        """
+        key = (wallet_name, event_type)
+        with self._lock:
+            if key not in self._routes:
+                # Unknown wallet or event type - fall back to a full scan
+                return {
+                    chat_id for chat_id, prefs in self.preferences.items()
+                    if self._matches(prefs, wallet_name, event_type, usd_value)
+                }
+
+            chats = set(self._routes[key])
+            for chat_id, min_usd in self._thresholds[key].items():
+                if usd_value is None or usd_value >= min_usd:
+                    chats.add(chat_id)
+            return chats
+
+    def export(self) -> Dict[str, Dict]:
+        """Serializable view of all non-default preferences"""
+        with self._lock:
+            return {
+                str(chat_id): {
+                    "wallets": sorted(prefs["wallets"]) if prefs["wallets"] is not None else None,
+                    "events": sorted(prefs["events"]) if prefs["events"] is not None else None,
+                    "min_usd": prefs["min_usd"]
+                }
+                for chat_id, prefs in self.preferences.items()
+                if prefs != default_preferences()
+            }
+
+    def _keys_for(self, prefs: Dict) -> List[Tuple[str, str]]:
+        wallets = self.wallets if prefs["wallets"] is None else [w for w in self.wallets if w in prefs["wallets"]]
+        events = EVENT_TYPES if prefs["events"] is None else [e for e in EVENT_TYPES if e in prefs["events"]]
+        return [(wallet, event) for wallet in wallets for event in events]
+
+    def _route(self, chat_id: int):
+        prefs = self.preferences.get(chat_id)
+        if prefs is None:
+            return
+        min_usd = float(prefs.get("min_usd") or 0)
+        for key in self._keys_for(prefs):
+            if min_usd > 0:
+                self._thresholds[key][chat_id] = min_usd
+            else:
+                self._routes[key].add(chat_id)
+
+    def _unroute(self, chat_id: int):
+        prefs = self.preferences.get(chat_id)
+        if prefs is None:
+            return
+        for key in self._keys_for(prefs):
+            self._routes[key].discard(chat_id)
+            self._thresholds[key].pop(chat_id, None)
+
+    def _rebuild(self):
+        self._routes = {(w, e): set() for w in self.wallets for e in EVENT_TYPES}
+        self._thresholds = {(w, e): {} for w in self.wallets for e in EVENT_TYPES}
+        for chat_id in self.preferences:
+            self._route(chat_id)
+
+    @staticmethod
+    def _matches(prefs: Dict, wallet_name: str, event_type: str, usd_value: Optional[float]) -> bool:
+        if prefs["wallets"] is not None and wallet_name not in prefs["wallets"]:
+            return False
+        if prefs["events"] is not None and event_type not in prefs["events"]:
+            return False
+        min_usd = float(prefs.get("min_usd") or 0)
+        return usd_value is None or usd_value >= min_usd
@@ -4,15 +4,35 @@ Telegram Bot Manager
 Handles bot commands and manages subscribers
 """
 
+import html
+import logging
 import json
+import math
 import os
-from typing import Set, Dict, Any
+from functools import partial
+from typing import Set, Dict, Any, Callable, Iterable, List, Optional
 import threading
 import time
 import requests
+from subscription_router import SubscriptionRouter, EVENT_TYPES
+from message_templates import RenderedMessage
+from metrics import UPSTREAM_LATENCY, UPSTREAM_ERRORS
+from tracing import span
+from chains import CHAINS, DEFAULT_CHAIN, explorer_url
+from alert_rules import RULES
+
+logger = logging.getLogger(__name__)
+
+# How alerts reach subscribers:
+# - direct:  sendMessage to every chat (default)
+# - copy:    post once to a staging chat, then copyMessage(s) to every chat
+# - forward: post once to a staging chat, then forwardMessage(s) to every chat
+# - channel: post once to a public alert channel
+FANOUT_MODES = ("direct", "copy", "forward", "channel")
 
 class TelegramBotManager:
-    def __init__(self, bot_token: str, subscribers_file: str = None):
+    def __init__(self, bot_token: str, subscribers_file: str = None, api_url: str = "https://api.telegram.org",
+                 fanout_mode: str = "direct", staging_chat_id=None, channel_id=None):
         self.bot_token = bot_token
         # Check environment variable first, then use parameter, finally fallback to default
         self.subscribers_file = (
@@ -22,44 +42,87 @@ class TelegramBotManager:
         )
         # Ensure directory exists
         os.makedirs(os.path.dirname(self.subscribers_file) if os.path.dirname(self.subscribers_file) else '.', exist_ok=True)
+        self.router = SubscriptionRouter()
         self.subscribers: Set[int] = self._load_subscribers()
         self.last_update_id = 0
         self.running = False
         self.thread = None
-        self.wallets = {}  # Will be set by external code
+        # Bumped on every start so a poller left over from a stop exits quietly
+        self._poll_generation = 0
+        self._wallets = {}  # Will be set by external code
+        self.wallet_chains: Dict[str, List[str]] = {}  # Chains per wallet for /wallets explorer links
+        self.check_interval: Optional[float] = None  # Seconds between checks, shown by /info
         self.on_new_subscriber = None  # Callback function for new subscribers
         self.on_analysis_request = None  # Callback function for analysis requests
-        self.api_base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.on_portfolio_request = None  # Callback function for /portfolio
+        self.on_chart_request = None  # Callback function for /chart (chat_id, command text)
+        self.api_base_url = f"{api_url.rstrip('/')}/bot{self.bot_token}"
+        # Keep-alive connection pool for message delivery
+        self.session = requests.Session()
+        
+        if fanout_mode not in FANOUT_MODES:
+            logger.warning(f"⚠️  Unknown fan-out mode '{fanout_mode}', using direct sends")
+            fanout_mode = "direct"
+        if fanout_mode in ("copy", "forward") and not staging_chat_id:
+            logger.warning(f"⚠️  Fan-out mode '{fanout_mode}' needs TELEGRAM_STAGING_CHAT_ID, using direct sends")
+            fanout_mode = "direct"
+        if fanout_mode == "channel" and not channel_id:
+            logger.warning("⚠️  Fan-out mode 'channel' needs TELEGRAM_ALERT_CHANNEL_ID, using direct sends")
+            fanout_mode = "direct"
+        self.fanout_mode = fanout_mode
+        self.staging_chat_id = staging_chat_id
+        self.channel_id = channel_id
         
+    @property
+    def wallets(self) -> Dict[str, str]:
+        return self._wallets
+    
+    @wallets.setter
+    def wallets(self, wallets: Dict[str, str]):
+        self._wallets = wallets or {}
+        self.router.set_wallets(self._wallets.keys())
+    
     def _load_subscribers(self) -> Set[int]:
-        """Load subscribers from JSON file"""
+        """Load subscribers and their filters from JSON file"""
         if os.path.exists(self.subscribers_file):
             try:
                 with open(self.subscribers_file, 'r') as f:
                     data = json.load(f)
-                    return set(data.get('subscribers', []))
+                    subscribers = set(data.get('subscribers', []))
+                    preferences = data.get('preferences', {})
+                    for chat_id in subscribers:
+                        self.router.add(chat_id, preferences.get(str(chat_id)))
+                    return subscribers
             except Exception as e:
-                print(f"⚠️  Error loading subscribers: {e}")
+                logger.warning(f"⚠️  Error loading subscribers: {e}")
                 return set()
         return set()
     
+    def reload_subscribers(self):
+        """Replace subscribers and filters with the file's (changes another replica saved)"""
+        for chat_id in list(self.subscribers):
+            self.router.remove(chat_id)
+        self.subscribers = self._load_subscribers()
+    
     def _save_subscribers(self):
-        """Save subscribers to JSON file"""
+        """Save subscribers and their filters to JSON file"""
         try:
             with open(self.subscribers_file, 'w') as f:
                 json.dump({
                     'subscribers': list(self.subscribers),
+                    'preferences': self.router.export(),
                     'updated_at': time.strftime('%Y-%m-%d %H:%M:%S')
                 }, f, indent=2)
         except Exception as e:
-            print(f"⚠️  Error saving subscribers: {e}")
+            logger.warning(f"⚠️  Error saving subscribers: {e}")
     
     def add_subscriber(self, chat_id: int) -> bool:
         """Add a new subscriber"""
         if chat_id not in self.subscribers:
             self.subscribers.add(chat_id)
+            self.router.add(chat_id)
             self._save_subscribers()
-            print(f"✅ New subscriber added: {chat_id}")
+            logger.info(f"✅ New subscriber added: {chat_id}")
             return True
         return False
     
@@ -67,8 +130,9 @@ class TelegramBotManager:
         """Remove a subscriber"""
         if chat_id in self.subscribers:
             self.subscribers.remove(chat_id)
+            self.router.remove(chat_id)
             self._save_subscribers()
-            print(f"❌ Subscriber removed: {chat_id}")
+            logger.info(f"❌ Subscriber removed: {chat_id}")
             return True
         return False
     
@@ -80,6 +144,26 @@ class TelegramBotManager:
         """Get number of active subscribers"""
         return len(self.subscribers)
     
+    def update_filters(self, chat_id: int, **changes) -> Dict:
+        """Update notification filters of a subscriber and persist them"""
+        prefs = self.router.update(chat_id, **changes)
+        self._save_subscribers()
+        return prefs
+    
+    def format_filters(self, chat_id: int) -> str:
+        """Describe the notification filters of a subscriber"""
+        prefs = self.router.get_preferences(chat_id)
+        wallets = html.escape(", ".join(prefs["wallets"])) if prefs["wallets"] is not None else "All wallets"
+        events = html.escape(", ".join(prefs["events"])) if prefs["events"] is not None else "All events"
+        min_usd = f"${prefs['min_usd']:,.2f}" if prefs["min_usd"] else "No minimum"
+        return (
+            f"🎛 <b>Notification Filters</b>\n\n"
+            f"💼 <b>Wallets:</b> {wallets or 'None'}\n"
+            f"🔔 <b>Events:</b> {events or 'None'}\n"
+            f"💵 <b>Min Size:</b> {min_usd}\n\n"
+            f"<i>/follow, /unfollow, /events and /minusd change these filters</i>"
+        )
+    
     def _is_user_admin(self, chat_id: int, user_id: int) -> bool:
         """Check if user is admin in a group/supergroup/channel"""
         try:
@@ -102,7 +186,7 @@ class TelegramBotManager:
             return False
             
         except Exception as e:
-            print(f"⚠️  Error checking admin status: {e}")
+            logger.warning(f"⚠️  Error checking admin status: {e}")
             return False
     
     def _check_permission(self, chat_id: int, user_id: int, chat_type: str, username: str = None, command: str = None) -> tuple[bool, str]:
@@ -113,15 +197,15 @@ class TelegramBotManager:
         Permission levels:
         - Private chats: All commands allowed
         - Group chats:
-          * Admin-only: /start, /stop (subscription management)
-          * Public: /analysis, /info, /status, /wallets, /help (information commands)
+          * Admin-only: /start, /stop, /follow, /unfollow, /events, /minusd (subscription management)
+          * Public: /analysis, /portfolio, /chart, /info, /status, /wallets, /filters, /help (information commands)
         """
         # Private chats: always allow
         if chat_type == 'private':
             return True, None
         
         # Define admin-only commands
-        admin_only_commands = ['/start', '/stop']
+        admin_only_commands = ['/start', '/stop', '/follow', '/unfollow', '/events', '/minusd']
         
         # Check if command requires admin permission
         requires_admin = False
@@ -143,46 +227,149 @@ class TelegramBotManager:
             error_msg = (
                 f"🔒 <b>Admin Permission Required</b>\n\n"
                 f"Sorry {user_mention}, only group admins can use this command.\n\n"
-                f"<b>Admin Commands:</b> /start, /stop\n"
-                f"<b>Public Commands:</b> /analysis, /info, /status, /wallets, /help\n\n"
+                f"<b>Admin Commands:</b> /start, /stop, /follow, /unfollow, /events, /minusd\n"
+                f"<b>Public Commands:</b> /analysis, /portfolio, /chart, /info, /status, /wallets, /filters, /help\n\n"
                 f"<i>Contact a group admin to manage subscriptions.</i>"
             )
             return False, error_msg
         
         return True, None
     
-    def send_message(self, chat_id: int, text: str, parse_mode: str = "HTML") -> bool:
-        """Send message to a specific chat"""
+    def send_message(self, chat_id: int, text, parse_mode: str = "HTML") -> bool:
+        """Send message to a specific chat, split into several if it is too long"""
+        rendered = text if isinstance(text, RenderedMessage) else RenderedMessage(text)
+        delivered = True
+        for chunk in rendered.chunks:
+            delivered = self._post_message(chat_id, chunk, parse_mode) is not None and delivered
+        return delivered
+    
+    def _call(self, method: str, payload: Dict[str, Any], timeout: int = 10, files: Dict = None) -> Optional[Any]:
+        """Call a Bot API method (multipart when uploading files), returning its result or None on failure"""
+        started = time.perf_counter()
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            payload = {
-                "chat_id": chat_id,
-                "text": text,
-                "parse_mode": parse_mode
-            }
-            response = requests.post(url, json=payload, timeout=10)
-            return response.status_code == 200
+            if files:
+                response = self.session.post(f"{self.api_base_url}/{method}", data=payload, files=files, timeout=timeout)
+            else:
+                response = self.session.post(f"{self.api_base_url}/{method}", json=payload, timeout=timeout)
+            if response.status_code == 200:
+                return response.json().get("result", True)
+            UPSTREAM_ERRORS.inc(upstream="telegram", endpoint=method, error=f"HTTP {response.status_code}")
+            return None
         except Exception as e:
-            print(f"⚠️  Error sending message to {chat_id}: {e}")
-            return False
+            UPSTREAM_ERRORS.inc(upstream="telegram", endpoint=method, error=type(e).__name__)
+            logger.warning(
+                f"⚠️  Error calling {method} for {payload.get('chat_id')}: {e}",
+                extra={"stage": "deliver", "method": method, "chat_id": payload.get("chat_id"), "error": type(e).__name__}
+            )
+            return None
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream="telegram", endpoint=method)
     
-    def broadcast_message(self, text: str, parse_mode: str = "HTML") -> Dict[str, int]:
-        """Broadcast message to all subscribers"""
-        results = {"success": 0, "failed": 0, "total": len(self.subscribers)}
-        
-        for chat_id in self.subscribers.copy():
-            if self.send_message(chat_id, text, parse_mode):
+    def _post_message(self, chat_id: int, text: str, parse_mode: str = "HTML") -> Optional[Any]:
+        """Send a single sendMessage request"""
+        return self._call("sendMessage", {
+            "chat_id": chat_id,
+            "text": text,
+            "parse_mode": parse_mode
+        })
+    
+    def send_photo(self, chat_id: int, photo, caption: str = None, parse_mode: str = "HTML") -> Optional[str]:
+        """Send a PNG (bytes, uploaded) or an earlier upload (file_id); returns the file_id"""
+        payload = {"chat_id": chat_id, "parse_mode": parse_mode}
+        if caption:
+            payload["caption"] = caption
+        if isinstance(photo, bytes):
+            result = self._call("sendPhoto", payload, timeout=30, files={"photo": ("chart.png", photo, "image/png")})
+        else:
+            result = self._call("sendPhoto", dict(payload, photo=photo))
+        if not isinstance(result, dict) or not result.get("photo"):
+            return None
+        # Largest size last; any of them can be resent by id
+        return result["photo"][-1].get("file_id")
+    
+    def get_recipients(self, wallet_name: str = None, event_type: str = None, usd_value: float = None) -> Set[int]:
+        """Get subscribers interested in an event (all subscribers for general messages)"""
+        if wallet_name is None or event_type is None:
+            return self.subscribers.copy()
+        return self.router.recipients(wallet_name, event_type, usd_value) & self.subscribers
+    
+    @property
+    def broadcasts_to_channel(self) -> bool:
+        """Whether alerts are posted once to a public channel instead of each subscriber"""
+        return self.fanout_mode == "channel"
+    
+    def broadcast_message(self, text: str, parse_mode: str = "HTML", wallet_name: str = None,
+                          event_type: str = None, usd_value: float = None) -> Dict[str, int]:
+        """Broadcast message to all subscribers interested in the event"""
+        recipients = self.get_recipients(wallet_name, event_type, usd_value)
+        return self.deliver(text, recipients, parse_mode)
+    
+    def deliver(self, text, chat_ids: Iterable[int], parse_mode: str = "HTML") -> Dict[str, int]:
+        """Deliver one message to many chats right away using the configured fan-out mode"""
+        jobs = self.plan_delivery(text, chat_ids, parse_mode)
+        results = {"success": 0, "failed": 0, "total": len(jobs)}
+        for job in jobs:
+            if job():
                 results["success"] += 1
             else:
                 results["failed"] += 1
                 # Don't remove failed sends immediately - might be temporary issue
-        
         return results
     
+    def plan_delivery(self, text, chat_ids: Iterable[int], parse_mode: str = "HTML") -> List[Callable[[], bool]]:
+        """
+        Build one send job per chat for the configured fan-out mode.
+        Jobs can run right away (deliver) or through a delivery queue.
+        """
+        # Split once, reuse the chunks for every chat
+        rendered = text if isinstance(text, RenderedMessage) else RenderedMessage(text)
+        
+        if self.broadcasts_to_channel:
+            return [partial(self.send_message, self.channel_id, rendered, parse_mode)]
+        
+        chat_ids = list(chat_ids)
+        if self.fanout_mode in ("copy", "forward") and len(chat_ids) > 1:
+            # Upload the text once (on the first job), then relay it by message id
+            staged = {}
+            
+            def relay(chat_id: int) -> bool:
+                if "ids" not in staged:
+                    staged["ids"] = self._stage_message(rendered, parse_mode)
+                if staged["ids"]:
+                    return self._relay_message(chat_id, staged["ids"])
+                return self.send_message(chat_id, rendered, parse_mode)
+            
+            return [partial(relay, chat_id) for chat_id in chat_ids]
+        
+        return [partial(self.send_message, chat_id, rendered, parse_mode) for chat_id in chat_ids]
+    
+    def _stage_message(self, rendered: RenderedMessage, parse_mode: str) -> Optional[List[int]]:
+        """Post a message to the staging chat and return its message ids"""
+        message_ids = []
+        for chunk in rendered.chunks:
+            result = self._post_message(self.staging_chat_id, chunk, parse_mode)
+            if not isinstance(result, dict) or "message_id" not in result:
+                logger.warning("⚠️  Could not stage message, falling back to direct sends")
+                return None
+            message_ids.append(result["message_id"])
+        return message_ids
+    
+    def _relay_message(self, chat_id: int, message_ids: List[int]) -> bool:
+        """Copy or forward staged messages to a chat"""
+        method = "copyMessage" if self.fanout_mode == "copy" else "forwardMessage"
+        payload = {"chat_id": chat_id, "from_chat_id": self.staging_chat_id}
+        if len(message_ids) == 1:
+            payload["message_id"] = message_ids[0]
+        else:
+            # One request for all chunks of a long message
+            method += "s"
+            payload["message_ids"] = message_ids
+        return self._call(method, payload) is not None
+    
     def _get_updates(self, offset: int = 0) -> Dict[str, Any]:
         """Get updates from Telegram API"""
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/getUpdates"
+            url = f"{self.api_base_url}/getUpdates"
             params = {
                 "offset": offset,
                 "timeout": 30,
@@ -193,11 +380,17 @@ class TelegramBotManager:
                 return response.json()
             return {}
         except Exception as e:
-            print(f"⚠️  Error getting updates: {e}")
+            logger.warning(f"⚠️  Error getting updates: {e}")
             return {}
     
     def _process_update(self, update: Dict[str, Any]):
         """Process a single update"""
+        text = update.get('message', {}).get('text', '')
+        command = text.split()[0].split('@')[0] if text.startswith('/') else "message"
+        with span("telegram.command", command=command):
+            self._handle_update(update)
+    
+    def _handle_update(self, update: Dict[str, Any]):
         try:
             message = update.get('message', {})
             chat_id = message.get('chat', {}).get('id')
@@ -216,7 +409,10 @@ class TelegramBotManager:
                 self.send_message(chat_id, error_msg)
                 # Log unauthorized attempt
                 if chat_type != 'private':
-                    print(f"🚫 Unauthorized admin command attempt by @{username} (ID: {user_id}) in {chat_title} (ID: {chat_id}): {text.split()[0]}")
+                    logger.warning(
+                        f"🚫 Unauthorized admin command attempt by @{username} (ID: {user_id}) in {chat_title} (ID: {chat_id}): {text.split()[0]}",
+                        extra={"stage": "command", "user_id": user_id, "chat_id": chat_id}
+                    )
                 return
             
             # Handle /start command
@@ -237,16 +433,16 @@ class TelegramBotManager:
                     
                     # Log subscription info
                     if chat_type == 'private':
-                        print(f"📱 New subscription from @{username} (ID: {chat_id})")
+                        logger.info(f"📱 New subscription from @{username} (ID: {chat_id})")
                     else:
-                        print(f"👥 New group subscription: {chat_title} (ID: {chat_id})")
+                        logger.info(f"👥 New group subscription: {chat_title} (ID: {chat_id})")
                     
                     # Send wallet analysis to new subscriber
                     if self.on_new_subscriber:
                         try:
                             self.on_new_subscriber(chat_id)
                         except Exception as e:
-                            print(f"⚠️  Error sending initial analysis to {chat_id}: {e}")
+                            logger.warning(f"⚠️  Error sending initial analysis to {chat_id}: {e}")
                 else:
                     self.send_message(
                         chat_id,
@@ -280,7 +476,7 @@ class TelegramBotManager:
                         f"✅ <b>Status:</b> Active\n"
                         f"👥 <b>Total Subscribers:</b> {self.get_subscriber_count()}\n"
                         f"🔔 <b>Notifications:</b> Enabled\n\n"
-                        f"<i>You will receive all wallet updates!</i>"
+                        f"<i>Use /filters to see which wallet updates you receive</i>"
                     )
                     self.send_message(chat_id, status_msg)
                 else:
@@ -300,9 +496,17 @@ class TelegramBotManager:
                         f"/stop - Unsubscribe from notifications\n"
                         f"/status - Check your subscription status\n"
                         f"/analysis - Get latest wallet analysis\n"
+                        f"/portfolio - Exposure across all wallets\n"
+                        f"/chart &lt;wallet&gt; [1h|6h|1d|7d|30d|1y] - Account value chart\n"
                         f"/wallets - View monitored wallet addresses\n"
                         f"/info - View tracker system information\n"
                         f"/help - Show this help message\n\n"
+                        f"<b>Filters:</b>\n"
+                        f"/follow &lt;wallet|all&gt; - Receive alerts for a wallet\n"
+                        f"/unfollow &lt;wallet|all&gt; - Mute alerts for a wallet\n"
+                        f"/events &lt;balance|position|deposit|all&gt; - Choose alert types\n"
+                        f"/minusd &lt;amount&gt; - Ignore alerts smaller than this USD size\n"
+                        f"/filters - Show your current filters\n\n"
                         f"<b>Notification Types:</b>\n"
                         f"🚀 Position Opened\n"
                         f"✅ Position Closed\n"
@@ -324,13 +528,19 @@ class TelegramBotManager:
                         f"🐋 <b>WhaleWallet Bot Commands</b>\n\n"
                         f"<b>🔓 Public Commands (Everyone):</b>\n"
                         f"/analysis - Get latest wallet analysis\n"
+                        f"/portfolio - Exposure across all wallets\n"
+                        f"/chart &lt;wallet&gt; [range] - Account value chart\n"
                         f"/status - Check subscription status\n"
                         f"/wallets - View monitored addresses\n"
                         f"/info - Tracker system information\n"
+                        f"/filters - Show group notification filters\n"
                         f"/help - Show this help message\n\n"
                         f"<b>🔒 Admin Only Commands:</b>\n"
                         f"/start - Subscribe group to notifications\n"
-                        f"/stop - Unsubscribe group from notifications\n\n"
+                        f"/stop - Unsubscribe group from notifications\n"
+                        f"/follow, /unfollow - Choose wallets\n"
+                        f"/events - Choose alert types\n"
+                        f"/minusd - Set minimum USD size\n\n"
                         f"<b>Notification Types:</b>\n"
                         f"🚀 Position Opened\n"
                         f"✅ Position Closed\n"
@@ -356,6 +566,14 @@ class TelegramBotManager:
                     
                     # Get wallet count
                     wallet_count = len(self.wallets) if self.wallets else 1
+                    if self.check_interval is None:
+                        interval = "Unknown"
+                    elif self.check_interval % 60 == 0:
+                        interval = f"{self.check_interval // 60:g} minutes"
+                    else:
+                        interval = f"{self.check_interval:g} seconds"
+                    # Thresholds come from the alert rules (settings-based defaults and ALERT_RULES)
+                    thresholds = "".join(f"  • {html.escape(line)}\n" for line in RULES.describe())
                     
                     # Get system info
                     info_msg = (
@@ -363,7 +581,7 @@ class TelegramBotManager:
                         f"🤖 <b>Bot Status:</b> Active\n"
                         f"👥 <b>Active Subscribers:</b> {self.get_subscriber_count()}\n"
                         f"💼 <b>Monitored Wallets:</b> {wallet_count}\n"
-                        f"⏰ <b>Check Interval:</b> 10 minutes\n"
+                        f"⏰ <b>Check Interval:</b> {interval}\n"
                         f"🔔 <b>Notification System:</b> Telegram\n"
                         f"📊 <b>Monitoring:</b>\n"
                         f"  • ETH Balance\n"
@@ -371,8 +589,7 @@ class TelegramBotManager:
                         f"  • Hyperliquid Positions\n"
                         f"  • Deposits & Withdrawals\n\n"
                         f"⚙️ <b>Thresholds:</b>\n"
-                        f"  • Balance: ≥0.1 ETH change\n"
-                        f"  • Position: ≥5% change\n\n"
+                        f"{thresholds}\n"
                         f"🕐 <b>Current Time:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
                         f"💡 <i>Use /wallets to see wallet details</i>\n"
                         f"<i>System running smoothly! 🟢</i>"
@@ -392,9 +609,15 @@ class TelegramBotManager:
                     
                     for name, address in self.wallets.items():
                         short_addr = f"{address[:6]}...{address[-4:]}"
-                        wallets_msg += f"📍 <b>{name}</b>\n"
+                        # One explorer link per tracked chain, plus the Hyperliquid account
+                        links = [
+                            f"<a href='{explorer_url(chain, address)}'>{CHAINS[chain]['explorer_name']}</a>"
+                            for chain in self.wallet_chains.get(name) or [DEFAULT_CHAIN]
+                        ]
+                        links.append(f"<a href='https://app.hyperliquid.xyz/explorer/address/{address}'>Hyperliquid</a>")
+                        wallets_msg += f"📍 <b>{html.escape(name)}</b>\n"
                         wallets_msg += f"   <code>{short_addr}</code>\n"
-                        wallets_msg += f"   <a href='https://etherscan.io/address/{address}'>View on Etherscan</a>\n\n"
+                        wallets_msg += f"   {' | '.join(links)}\n\n"
                     
                     wallets_msg += f"<i>All wallets are being monitored 24/7</i>"
                     
@@ -402,6 +625,16 @@ class TelegramBotManager:
                 except Exception as e:
                     self.send_message(chat_id, f"⚠️ Error getting wallet info: {str(e)}")
             
+            # Handle subscription filter commands
+            elif text.startswith(('/follow', '/unfollow', '/events', '/minusd', '/filters')):
+                if chat_id not in self.subscribers:
+                    self.send_message(
+                        chat_id,
+                        "⚠️ You need to subscribe first! Send /start to subscribe."
+                    )
+                    return
+                self._handle_filter_command(chat_id, text)
+            
             # Handle /analysis command
             elif text.startswith('/analysis'):
                 # Check if user is subscribed
@@ -429,40 +662,144 @@ class TelegramBotManager:
                         chat_id,
                         "⚠️ Analysis feature is not available at the moment."
                     )
-
+            
+            # Handle /portfolio command
+            elif text.startswith('/portfolio'):
+                if chat_id not in self.subscribers:
+                    self.send_message(
+                        chat_id,
+                        "⚠️ You need to subscribe first! Send /start to subscribe."
+                    )
+                    return
+                if self.on_portfolio_request:
+                    try:
+                        self.on_portfolio_request(chat_id)
+                    except Exception as e:
+                        self.send_message(
+                            chat_id,
+                            f"⚠️ <b>Error generating portfolio</b>\n\n{str(e)}"
+                        )
+                else:
+                    self.send_message(
+                        chat_id,
+                        "⚠️ Portfolio feature is not available at the moment."
+                    )
+            
+            # Handle /chart command
+            elif text.startswith('/chart'):
+                if chat_id not in self.subscribers:
+                    self.send_message(
+                        chat_id,
+                        "⚠️ You need to subscribe first! Send /start to subscribe."
+                    )
+                    return
+                if self.on_chart_request:
+                    try:
+                        self.on_chart_request(chat_id, text)
+                    except Exception as e:
+                        self.send_message(
+                            chat_id,
+                            f"⚠️ <b>Error generating chart</b>\n\n{str(e)}"
+                        )
+                else:
+                    self.send_message(
+                        chat_id,
+                        "⚠️ Chart feature is not available at the moment."
+                    )
             
         except Exception as e:
-            print(f"⚠️  Error processing update: {e}")
+            logger.warning(f"⚠️  Error processing update: {e}", extra={"stage": "command", "error": type(e).__name__})
+    
+    def _handle_filter_command(self, chat_id: int, text: str):
+        """Handle /follow, /unfollow, /events, /minusd and /filters"""
+        command, _, argument = text.partition(' ')
+        command = command.split('@')[0]
+        argument = argument.strip()
+        prefs = self.router.get_preferences(chat_id)
+        
+        if command == '/follow' or command == '/unfollow':
+            if not argument:
+                self.send_message(chat_id, f"⚠️ Usage: {command} &lt;wallet name|all&gt;")
+                return
+            if argument.lower() == 'all':
+                wallets = None if command == '/follow' else []
+            else:
+                wallet = self.router.resolve_wallet(argument)
+                if not wallet:
+                    names = html.escape(", ".join(self.wallets.keys())) or "None"
+                    self.send_message(chat_id, f"⚠️ Unknown wallet: {html.escape(argument)}\n\n💼 <b>Wallets:</b> {names}")
+                    return
+                current = list(self.wallets.keys()) if prefs["wallets"] is None else list(prefs["wallets"])
+                if command == '/follow' and wallet not in current:
+                    current.append(wallet)
+                elif command == '/unfollow' and wallet in current:
+                    current.remove(wallet)
+                wallets = None if set(current) >= set(self.wallets.keys()) else sorted(current)
+            self.update_filters(chat_id, wallets=wallets)
+        
+        elif command == '/events':
+            requested = [e.lower() for e in argument.replace(',', ' ').split()]
+            if not requested:
+                self.send_message(chat_id, f"⚠️ Usage: /events &lt;{'|'.join(EVENT_TYPES)}|all&gt; ...")
+                return
+            if 'all' in requested:
+                events = None
+            else:
+                unknown = [e for e in requested if e not in EVENT_TYPES]
+                if unknown:
+                    self.send_message(chat_id, f"⚠️ Unknown event type: {html.escape(', '.join(unknown))}\n\n🔔 <b>Events:</b> {', '.join(EVENT_TYPES)}")
+                    return
+                events = sorted(set(requested))
+            self.update_filters(chat_id, events=events)
+        
+        elif command == '/minusd':
+            try:
+                min_usd = float(argument.replace('$', '').replace(',', '')) if argument else 0.0
+                # nan would silently switch the filter off, inf mutes everything
+                if not math.isfinite(min_usd) or min_usd < 0:
+                    raise ValueError
+            except ValueError:
+                self.send_message(chat_id, "⚠️ Usage: /minusd &lt;amount&gt; (0 to disable)")
+                return
+            self.update_filters(chat_id, min_usd=min_usd)
+        
+        self.send_message(chat_id, self.format_filters(chat_id))
     
-    def _poll_updates(self):
+    def _poll_updates(self, generation: int):
         """Poll for updates in a loop"""
-        print("🤖 Telegram bot polling started...")
+        logger.info("🤖 Telegram bot polling started...")
         
-        while self.running:
+        while self.running and generation == self._poll_generation:
             try:
                 result = self._get_updates(self.last_update_id + 1)
                 updates = result.get('result', [])
                 
                 for update in updates:
+                    # Stopped during the long poll (e.g. lost the leader lease): leave them to the new poller
+                    if not self.running or generation != self._poll_generation:
+                        break
                     self.last_update_id = update.get('update_id', self.last_update_id)
                     self._process_update(update)
                 
                 time.sleep(1)  # Small delay between polls
                 
             except Exception as e:
-                print(f"⚠️  Error in polling loop: {e}")
+                logger.warning(f"⚠️  Error in polling loop: {e}")
                 time.sleep(5)  # Wait longer on error
     
     def start_polling(self):
         """Start polling for updates in a background thread"""
         if self.running:
-            print("⚠️  Bot is already running")
+            logger.warning("⚠️  Bot is already running")
             return
         
+        # Another replica may have handled commands while this one was standby
+        self.reload_subscribers()
         self.running = True
-        self.thread = threading.Thread(target=self._poll_updates, daemon=True)
+        self._poll_generation += 1
+        self.thread = threading.Thread(target=self._poll_updates, args=(self._poll_generation,), daemon=True)
         self.thread.start()
-        print(f"✅ Telegram bot started (Subscribers: {self.get_subscriber_count()})")
+        logger.info(f"✅ Telegram bot started (Subscribers: {self.get_subscriber_count()})")
     
     def stop_polling(self):
         """Stop polling for updates"""
@@ -472,7 +809,7 @@ class TelegramBotManager:
         self.running = False
         if self.thread:
             self.thread.join(timeout=5)
-        print("🛑 Telegram bot stopped")
+        logger.info("🛑 Telegram bot stopped")
 
 
 if __name__ == "__main__":
@@ -483,6 +820,9 @@ if __name__ == "__main__":
         print("Usage: python telegram_bot.py <BOT_TOKEN>")
         sys.exit(1)
     
+    from structured_logging import setup_logging
+    setup_logging()
+    
     bot_token = sys.argv[1]
     bot = TelegramBotManager(bot_token)
     
@@ -6,17 +6,21 @@ Test script for detailed position notifications
 from wallet_tracker import WalletTracker
 from notification_system import NotificationSystem
 from utils import load_config
+from structured_logging import setup_logging
 
 def test_position_notification():
     # Load configuration
     config = load_config()
+    setup_logging(config["log_level"], config["log_format"])
     
     # Initialize tracker and notification system
     tracker = WalletTracker(
         config["wallet_address"], 
-        config["etherscan_api_key"]
+        config["etherscan_api_key"],
+        base_url=config["etherscan_api_url"],
+        hyperliquid_url=config["hyperliquid_api_url"]
     )
-    notifier = NotificationSystem(config["notification_settings"])
+    notifier = NotificationSystem(config["notification_settings"], start_polling=False)
     
     # Get current positions
     print("📊 Getting current positions...")
@@ -35,6 +39,7 @@ def test_position_notification():
         # Send notification to Telegram
         print("\n📱 Sending to Telegram...")
         notifier.send_notification(message, "POSITION CHANGED")
+        notifier.wait_for_delivery(timeout=30)
         
         print("\n✅ Test completed!")
     else:
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The modules live at the repository root; the fake upstream lives with the benchmarks
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "benchmarks"))
+
+
+@pytest.fixture
+def upstream():
+    """Fake Etherscan/Hyperliquid/Telegram server replaying the benchmark fixtures"""
+    from fake_upstream import FakeUpstream
+
+    server = FakeUpstream(change_rate=1.0).start()
+    yield server
+    server.stop()
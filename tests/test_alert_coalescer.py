@@ -0,0 +1,64 @@
+import time
+
+from alert_coalescer import ALERT_SEPARATOR, AlertCoalescer
+from subscription_router import SubscriptionRouter
+
+
+class FakeBot:
+    broadcasts_to_channel = False
+
+    def __init__(self):
+        self.router = SubscriptionRouter(["Main", "Cold"])
+        self.sent = []
+
+    def get_recipients(self, wallet_name=None, event_type=None, usd_value=None):
+        return self.router.recipients(wallet_name, event_type, usd_value)
+
+    def plan_delivery(self, text, chat_ids):
+        return [lambda chat_id=chat_id: self.sent.append((chat_id, text.text)) or True for chat_id in chat_ids]
+
+
+def test_one_merged_message_per_subscriber():
+    bot = FakeBot()
+    bot.router.add(1)
+    bot.router.add(2)
+    bot.router.add(3, {"wallets": ["Cold"]})
+    coalescer = AlertCoalescer(bot)
+    coalescer.add("main balance", "Main", "balance", 100)
+    coalescer.add("cold deposit", "Cold", "deposit", 100)
+
+    results = coalescer.flush()
+    assert results == {"events": 2, "messages": 3, "total": 3}
+    texts = dict(bot.sent)
+    assert "WALLET UPDATES" in texts[1] and "main balance" in texts[1] and "cold deposit" in texts[1]
+    assert texts[1] == texts[2]
+    # A single alert is sent as is
+    assert texts[3] == "cold deposit"
+    assert coalescer.pending_count() == 0
+
+
+def test_merge_respects_the_length_limit():
+    coalescer = AlertCoalescer(FakeBot(), max_length=200)
+    alerts = [f"alert {i} " + "x" * 60 for i in range(10)]
+    messages = coalescer.merge(alerts)
+    assert len(messages) > 1
+    assert all(len(message.text) <= 200 for message in messages)
+    merged = ALERT_SEPARATOR.join(message.text for message in messages)
+    assert all(alert in merged for alert in alerts)
+
+
+def test_digest_waits_for_its_window():
+    bot = FakeBot()
+    bot.router.add(1)
+    coalescer = AlertCoalescer(bot, digest_interval=3600)
+    assert not coalescer.is_due()
+    coalescer.add("one", "Main", "balance")
+    coalescer.add("two", "Main", "position")
+    coalescer._last_flush = time.time() - 3600
+    assert coalescer.is_due()
+
+    submitted = []
+    results = coalescer.flush(submit=lambda jobs, priority, label: submitted.append((len(jobs), priority)))
+    assert results["messages"] == 1 and submitted == [(1, None)]
+    assert "DIGEST" in coalescer.merge(["a", "b"])[0].text
+
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from alert_rules import AlertRules, default_rules, load_rules, strongest
+
+
+def fact(**fields):
+    base = {"event": "transfer", "wallet": "Main", "chain": "ethereum", "asset": "ETH", "direction": "in",
+            "counterparty": "0x1", "amount": 1.0, "pct": None, "usd": 3000.0, "leverage": None, "margin_usage": None}
+    base.update(fields)
+    return base
+
+
+def test_defaults_follow_threshold_settings():
+    rules = AlertRules(defaults=default_rules({"balance_change_usd": 250, "balance_change_threshold": 0.5}))
+    assert rules.evaluate(fact(event="balance", direction="down", usd=300)) == "alert"
+    assert rules.evaluate(fact(event="balance", direction="down", usd=100)) is None
+    # Unpriced changes fall back to the amount threshold
+    assert rules.evaluate(fact(event="balance", amount=0.6, usd=None)) == "alert"
+    assert rules.evaluate(fact(event="balance", amount=0.4, usd=None)) is None
+
+
+def test_position_defaults():
+    rules = AlertRules(defaults=default_rules({"position_change_threshold": 1000, "critical_margin_usage": 0.8}))
+    assert rules.evaluate(fact(event="position", direction="open", usd=10, margin_usage=0.1)) == "alert"
+    assert rules.evaluate(fact(event="position", direction="increase", usd=10, pct=50, margin_usage=0.1)) is None
+    assert rules.evaluate(fact(event="position", direction="increase", usd=None, pct=6, margin_usage=0.1)) == "alert"
+    assert rules.evaluate(fact(event="position", direction="increase", usd=2000, margin_usage=0.9)) == "critical"
+
+
+def test_most_specific_scope_replaces_broader_rules():
+    rules = AlertRules([
+        {"event": "balance", "min_amount": 1},
+        {"event": "balance", "wallet": "Cold", "min_amount": 5},
+        {"event": "balance", "wallet": "Cold", "asset": "POL", "min_amount": 1000},
+    ], default_rules({}))
+    assert rules.evaluate(fact(event="balance", wallet="Cold", amount=3)) is None
+    assert rules.evaluate(fact(event="balance", wallet="Cold", amount=6)) == "alert"
+    assert rules.evaluate(fact(event="balance", wallet="Cold", asset="POL", amount=6)) is None
+    # Other wallets use the global rule, not the 0.1 default
+    assert rules.evaluate(fact(event="balance", wallet="Hot", amount=0.5)) is None
+    assert rules.evaluate(fact(event="balance", wallet="Hot", amount=2)) == "alert"
+
+
+def test_out_of_scope_rules_fall_through_to_defaults():
+    rules = AlertRules([{"event": "position", "wallet": "Main", "asset": "BTC", "min_usd": 25000}],
+                       default_rules({"position_change_threshold": 1000}))
+    btc = fact(event="position", asset="BTC", direction="increase", usd=2000, margin_usage=0.1)
+    eth = fact(event="position", asset="ETH", direction="increase", usd=2000, margin_usage=0.1)
+    assert rules.evaluate(btc) is None
+    assert rules.evaluate(eth) == "alert"
+
+
+def test_direction_scope_does_not_capture_other_directions():
+    rules = AlertRules([{"event": "transfer", "direction": "out", "min_usd": 100000}], default_rules({}))
+    assert rules.evaluate(fact(direction="out", usd=5000)) is None
+    assert rules.evaluate(fact(direction="in", usd=5000)) == "alert"
+
+
+def test_mute_beats_critical_and_alert():
+    rules = AlertRules([
+        {"event": "transfer", "asset": "USDT", "max_usd": 1000, "action": "mute"},
+        {"event": "transfer", "counterparty": "0xBAD", "action": "critical"},
+    ], default_rules({}))
+    assert rules.evaluate(fact(asset="USDT", usd=500, counterparty="0xbad")) is None
+    assert rules.evaluate(fact(asset="USDT", usd=5000, counterparty="0xbad")) == "critical"
+    # A mute rule whose threshold fails doesn't take over the decision
+    assert rules.evaluate(fact(asset="USDT", usd=5000)) == "alert"
+
+
+def test_critical_rules_escalate_without_replacing_alert_rules():
+    rules = AlertRules([{"event": "position", "direction": "open", "min_leverage": 20, "action": "critical"}],
+                       default_rules({}))
+    low = fact(event="position", direction="open", leverage=3, usd=10, margin_usage=0.1)
+    high = fact(event="position", direction="open", leverage=30, usd=10, margin_usage=0.1)
+    assert rules.evaluate(low) == "alert"
+    assert rules.evaluate(high) == "critical"
+
+
+def test_counterparty_rules_are_keyed_by_address():
+    rules = AlertRules([
+        {"event": "transfer", "wallet": "Main", "counterparty": ["0xAAA", "0xBBB"], "min_usd": 1},
+        {"event": "transfer", "wallet": "Main", "min_usd": 1000000},
+    ], default_rules({}))
+    assert rules.evaluate(fact(counterparty="0xbbb", usd=10)) == "alert"
+    assert rules.evaluate(fact(counterparty="0xccc", usd=10)) is None
+
+
+def test_default_large_withdrawal_is_eth_out_only():
+    rules = AlertRules(defaults=default_rules({"large_withdrawal_eth": 100}))
+    assert rules.evaluate(fact(direction="out", amount=150)) == "critical"
+    assert rules.evaluate(fact(direction="in", amount=150)) == "alert"
+    assert rules.evaluate(fact(direction="out", asset="USDC", amount=150)) == "alert"
+
+
+def test_unpriced_changes_fail_usd_thresholds():
+    rules = AlertRules([{"event": "transfer", "min_usd": 10}], default_rules({}))
+    assert rules.evaluate(fact(usd=None)) is None
+    rules = AlertRules([{"event": "transfer", "min_usd": 10}, {"event": "transfer", "unpriced": True}],
+                       default_rules({}))
+    assert rules.evaluate(fact(usd=None)) == "alert"
+
+
+@pytest.mark.parametrize("rule, message", [
+    ({"wallet": "Main"}, "event is required"),
+    ({"event": "swap"}, "unknown event"),
+    ({"event": "balance", "direction": "in"}, "doesn't apply"),
+    ({"event": "balance", "action": "page"}, "action must be"),
+    ({"event": "balance", "min_usd": "lots"}, "must be numbers"),
+    ({"event": "balance", "minimum": 1}, "unknown field"),
+])
+def test_invalid_rules_are_rejected(rule, message):
+    with pytest.raises(ValueError, match=message):
+        AlertRules([rule])
+
+
+def test_load_rules_appends_file_rules(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([{"event": "balance", "min_amount": 1}]))
+    rules = load_rules([{"event": "transfer"}], str(path))
+    assert [rule["event"] for rule in rules] == ["transfer", "balance"]
+    with pytest.raises(ValueError):
+        load_rules([], str(tmp_path / "missing.json"))
+
+
+def test_strongest():
+    assert strongest([None, "alert", None]) == "alert"
+    assert strongest(["alert", "critical", None]) == "critical"
+    assert strongest([]) is None
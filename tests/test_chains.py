@@ -0,0 +1,56 @@
+import threading
+import time
+
+import pytest
+
+from chains import RequestQuota, chain_info, explorer_url, wallet_chains
+
+
+def test_chain_info():
+    assert chain_info("arbitrum")["chain_id"] == 42161
+    with pytest.raises(ValueError, match="Unknown chain 'solana'"):
+        chain_info("solana")
+    assert explorer_url("base", "0xabc") == "https://basescan.org/address/0xabc"
+
+
+def test_wallet_chains():
+    wallets = {"Main": "0x1", "Bridge": "0x2"}
+    chains = wallet_chains(wallets, ["ethereum", "base"], {"Bridge": ["Arbitrum", "ethereum", "arbitrum"]})
+    assert chains == {"Main": ["ethereum", "base"], "Bridge": ["arbitrum", "ethereum"]}
+    assert wallet_chains({"Main": "0x1"}, []) == {"Main": ["ethereum"]}
+    with pytest.raises(ValueError):
+        wallet_chains(wallets, ["ethereum"], {"Main": ["solana"]})
+
+
+def test_quota_limits_requests_in_flight_per_chain():
+    quota = RequestQuota(concurrency={"ethereum": 1})
+    entered = threading.Event()
+    with quota.slot("ethereum"):
+        def second():
+            with quota.slot("ethereum"):
+                entered.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        assert not entered.wait(0.2)
+        # A busy chain doesn't hold up the others
+        with quota.slot("arbitrum"), quota.slot("arbitrum"):
+            pass
+    assert entered.wait(1)
+    thread.join()
+
+
+def test_quota_shares_one_rate_across_chains():
+    quota = RequestQuota(rate=20)
+    started = time.monotonic()
+    for i in range(30):
+        with quota.slot("ethereum" if i % 2 else "base"):
+            pass
+    # A burst of one second's worth, then 20 per second
+    assert time.monotonic() - started >= 0.4
+    unlimited = RequestQuota()
+    started = time.monotonic()
+    for _ in range(100):
+        with unlimited.slot("ethereum"):
+            pass
+    assert time.monotonic() - started < 0.1
@@ -0,0 +1,62 @@
+import struct
+import zlib
+
+import pytest
+
+import chart_renderer
+from chart_renderer import HEIGHT, WIDTH, ChartCache, parse_chart_args, render_chart
+
+
+def points(count=50):
+    return [{"ts": 1700000000 + i * 60, "account_value_open": 1000 + i, "account_value": 1000 + i * 2,
+             "account_value_min": 990 + i, "account_value_max": 1010 + i * 2, "unrealized_pnl": i - 25,
+             "margin_usage": 0.3, "total_ntl_pos": 5000} for i in range(count)]
+
+
+def test_builtin_renderer_writes_a_valid_png():
+    png = chart_renderer._render_builtin(points(), "Main · 1d")
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", png[16:24])
+    assert (width, height) == (WIDTH, HEIGHT)
+    length = struct.unpack(">I", png[33:37])[0]
+    raw = zlib.decompress(png[41:41 + length])
+    assert len(raw) == HEIGHT * (WIDTH * 3 + 1)
+    # Something was drawn on the white canvas
+    assert raw.count(b"\xff") < len(raw) - HEIGHT
+
+
+@pytest.mark.parametrize("count", [1, 2])
+def test_builtin_renderer_handles_few_points(count):
+    assert chart_renderer._render_builtin(points(count), "Main").startswith(b"\x89PNG")
+
+
+def test_render_chart_uses_the_available_backend():
+    if chart_renderer.BACKEND == "matplotlib":
+        pytest.importorskip("matplotlib")
+    assert render_chart(points(), "Main").startswith(b"\x89PNG")
+
+
+def test_parse_chart_args():
+    wallets = ["Main", "Cold Storage"]
+    assert parse_chart_args("/chart cold storage 7D", wallets) == ("Cold Storage", "7d")
+    assert parse_chart_args("/chart Main", wallets) == ("Main", "1d")
+    assert parse_chart_args("/chart", wallets) == (None, "1d")
+    assert parse_chart_args("/chart 1h", ["Main"]) == ("Main", "1h")
+    assert parse_chart_args("/chart Hot 1h", wallets) == (None, "1h")
+
+
+def test_cache_replaces_older_renders_and_evicts_least_recent():
+    cache = ChartCache(max_entries=2)
+    assert cache.get(("Main", "1d", 100)) is None
+    cache.put(("Main", "1d", 100), b"old", "caption")
+    entry = cache.put(("Main", "1d", 160), b"new", "caption")
+    # A newer sample makes the old render unreachable, so it is dropped
+    assert cache.get(("Main", "1d", 100)) is None
+    assert cache.get(("Main", "1d", 160)) is entry and entry["file_id"] is None
+
+    cache.put(("Cold", "1d", 100), b"cold", "caption")
+    cache.get(("Main", "1d", 160))
+    cache.put(("Main", "7d", 160), b"week", "caption")
+    assert cache.get(("Cold", "1d", 100)) is None
+    assert cache.get(("Main", "1d", 160))["png"] == b"new"
+    assert (cache.hits, cache.misses) == (3, 3)
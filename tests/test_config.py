@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import config
+from config import _json_env
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_json_env_defaults_when_unset_or_empty(monkeypatch):
+    monkeypatch.delenv("TELEGRAM_LANE_RATES", raising=False)
+    assert _json_env("TELEGRAM_LANE_RATES") == {}
+    monkeypatch.setenv("TELEGRAM_LANE_RATES", "")
+    assert _json_env("TELEGRAM_LANE_RATES") == {}
+    monkeypatch.setenv("TELEGRAM_LANE_RATES", '{"critical": 25}')
+    assert _json_env("TELEGRAM_LANE_RATES") == {"critical": 25}
+
+
+def test_json_env_names_the_bad_variable(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_LANE_RATES", "{critical: 25}")
+    with pytest.raises(ValueError, match="TELEGRAM_LANE_RATES"):
+        _json_env("TELEGRAM_LANE_RATES")
+
+
+def test_importing_reads_nothing():
+    script = (
+        "import sys, config, main\n"
+        "print(config._settings is None)\n"
+        "print(sorted(m for m in ('schedule', 'telegram_bot', 'notification_system') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split("\n")[:2] == ["True", "[]"]
+
+
+@pytest.fixture
+def fresh_settings(monkeypatch):
+    # Settings loaded from the test's environment are dropped afterwards
+    monkeypatch.setattr(config, "_settings", None)
+
+
+def test_settings_are_loaded_once_and_reloadable(monkeypatch, fresh_settings):
+    monkeypatch.setenv("WALLETS", '{"Main": "0x1"}')
+    settings = config.load_settings(reload=True)
+    assert settings["WALLETS"] == {"Main": "0x1"}
+    assert config.load_settings() is settings
+    assert config.WALLETS == {"Main": "0x1"}
+    monkeypatch.setenv("WALLETS", '{"Other": "0x2"}')
+    assert config.WALLETS == {"Main": "0x1"}
+    assert config.load_settings(reload=True)["WALLETS"] == {"Other": "0x2"}
+    with pytest.raises(AttributeError):
+        config.NOT_A_SETTING
+
+
+def test_validate_config_raises_instead_of_exiting(monkeypatch, fresh_settings):
+    monkeypatch.setenv("WALLETS", '{"Main": "0x1"}')
+    monkeypatch.setenv("ETHERSCAN_API_KEY", "")
+    settings = config.load_settings(reload=True)
+    with pytest.raises(ValueError, match="ETHERSCAN_API_KEY is not set"):
+        config.validate_config(settings, require_telegram=False)
+    monkeypatch.setenv("ETHERSCAN_API_KEY", "abc123")
+    config.validate_config(config.load_settings(reload=True), require_telegram=False)
@@ -0,0 +1,66 @@
+from delivery_queue import PRIORITY_BALANCE, PRIORITY_CRITICAL, PRIORITY_INFO, PriorityDeliveryQueue, TokenBucket
+
+
+def recorder(delivered, name):
+    def job():
+        delivered.append(name)
+        return True
+    return job
+
+
+def test_higher_priority_lanes_go_first():
+    queue = PriorityDeliveryQueue({"info": 100, "balance": 100, "critical": 100}, global_rate=100)
+    delivered = []
+    queue.submit(PRIORITY_INFO, [recorder(delivered, "info")])
+    queue.submit(PRIORITY_BALANCE, [recorder(delivered, "balance")])
+    queue.submit(PRIORITY_CRITICAL, [recorder(delivered, "critical")])
+    queue.start()
+    try:
+        assert queue.join(timeout=5)
+    finally:
+        queue.stop()
+    assert delivered == ["critical", "balance", "info"]
+
+
+def test_critical_alert_overtakes_a_fan_out_in_progress():
+    queue = PriorityDeliveryQueue({"balance": 100, "critical": 100}, global_rate=100)
+    delivered = []
+
+    def first():
+        delivered.append("balance 0")
+        queue.submit(PRIORITY_CRITICAL, [recorder(delivered, "critical")])
+        return True
+
+    jobs = [first] + [recorder(delivered, f"balance {i}") for i in range(1, 5)]
+    ticket = queue.submit(PRIORITY_BALANCE, jobs, label="balance")
+    queue.start()
+    try:
+        assert queue.join(timeout=5)
+    finally:
+        queue.stop()
+    assert delivered[:3] == ["balance 0", "critical", "balance 1"]
+    assert ticket.results == {"success": 5, "failed": 0, "total": 5}
+
+
+def test_failed_jobs_are_counted():
+    queue = PriorityDeliveryQueue()
+
+    def broken():
+        raise RuntimeError("boom")
+
+    ticket = queue.submit(PRIORITY_INFO, [broken, lambda: False, lambda: True])
+    queue.start()
+    try:
+        assert ticket.wait(timeout=5)
+    finally:
+        queue.stop()
+    assert ticket.results == {"success": 1, "failed": 2, "total": 3}
+
+
+def test_token_bucket_delay():
+    bucket = TokenBucket(rate=2, capacity=1)
+    now = bucket.updated
+    assert bucket.delay(now) == 0
+    bucket.take()
+    assert bucket.delay(now) == 0.5
+    assert bucket.delay(now + 0.5) == 0
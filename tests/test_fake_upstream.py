@@ -0,0 +1,41 @@
+import requests
+
+from price_service import PriceService
+from wallet_tracker import WalletTracker
+
+ADDRESS = "0x" + "ab" * 20
+
+
+def tracker_for(upstream):
+    return WalletTracker(ADDRESS, "key", base_url=upstream.etherscan_url, hyperliquid_url=upstream.hyperliquid_url,
+                         wallet_name="Main", prices=PriceService(upstream.hyperliquid_url))
+
+
+def test_fixtures_are_replayed_for_any_wallet(upstream):
+    tracker = tracker_for(upstream)
+    assert tracker.get_eth_balance() is not None
+    positions = tracker.get_hyperliquid_positions()
+    assert "marginSummary" in positions
+    transfers = tracker.get_normal_transactions(5)
+    assert transfers and all(ADDRESS in (tx["from"], tx["to"]) for tx in transfers)
+    assert upstream.upstream_calls()["etherscan"] == 2
+    assert upstream.upstream_calls()["hyperliquid"] == 1
+
+
+def test_changed_wallets_move_every_cycle(upstream):
+    tracker = tracker_for(upstream)
+    tracker.warm_up()
+    upstream.advance()
+    decision, balance, change = tracker.check_balance_change()
+    assert decision == "alert" and change == 1
+    assert tracker.get_user_fills(0)[0]["tid"]
+
+
+def test_control_endpoints(upstream):
+    requests.get(f"{upstream.url}/_control/advance", timeout=5)
+    assert upstream.cycle == 1
+    tracker_for(upstream).get_eth_balance()
+    stats = requests.get(f"{upstream.url}/_control/stats", timeout=5).json()
+    assert stats["upstream"]["etherscan"] == 1
+    requests.get(f"{upstream.url}/_control/reset", timeout=5)
+    assert upstream.stats["requests"] == 0
@@ -0,0 +1,79 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from history_store import HISTORY, configure_history
+from main import CryptoWalletMonitor
+
+
+class FakeTracker:
+    def __init__(self):
+        self.fills = []
+        self.funding = []
+
+    def get_user_fills(self, start_ms):
+        return [fill for fill in self.fills if fill["time"] >= start_ms]
+
+    def get_user_funding(self, start_ms):
+        return [payment for payment in self.funding if payment["time"] >= start_ms]
+
+
+def fill(tid, ts, pnl, coin="BTC"):
+    return {"tid": tid, "time": ts, "coin": coin, "px": "100", "sz": "1", "closedPnl": str(pnl), "fee": "0.1"}
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    configure_history(str(tmp_path / "history.db"))
+    yield SimpleNamespace(config={"fills_lookback_days": 7}, _fills_synced=set())
+    configure_history(None)
+
+
+def sync(monitor, tracker, until_ms=None):
+    return CryptoWalletMonitor.sync_fills(monitor, "Main", tracker, until_ms=until_ms)
+
+
+def test_first_sync_seeds_without_reporting(monitor):
+    now = int(time.time() * 1000)
+    tracker = FakeTracker()
+    tracker.fills = [fill(1, now - 86400000, 500), fill(2, now - 3600000, 250)]
+    assert sync(monitor, tracker) == {}
+    assert HISTORY.realized("Main")["BTC"]["closed_pnl"] == 750
+
+    tracker.fills.append(fill(3, now, 10))
+    realized = sync(monitor, tracker)
+    assert realized["BTC"]["closed_pnl"] == 10
+    assert realized["BTC"]["fills"] == 1
+    assert realized["BTC"]["total"]["closed_pnl"] == 760
+
+
+def test_fills_are_reported_once_per_snapshot(monitor):
+    now = int(time.time() * 1000)
+    tracker = FakeTracker()
+    sync(monitor, tracker)
+
+    # A fill after the snapshot waits for the next sync
+    tracker.fills = [fill(1, now - 1000, 5), fill(2, now + 1000, 7)]
+    assert sync(monitor, tracker, until_ms=now)["BTC"]["closed_pnl"] == 5
+    assert sync(monitor, tracker, until_ms=now + 2000)["BTC"]["closed_pnl"] == 7
+    # Nothing new: nothing carried over to a later alert
+    assert sync(monitor, tracker, until_ms=now + 3000) == {}
+
+
+def test_record_fills_dedupes_by_tid(monitor):
+    now = int(time.time() * 1000)
+    funding = [{"time": now - 5000, "delta": {"coin": "BTC", "usdc": "-1.5", "szi": "1", "fundingRate": "0.0001"}}]
+    new = HISTORY.record_fills("Main", [fill(1, now - 9000, 100), fill(2, now - 8000, -40, coin="ETH")], funding)
+    assert new["BTC"] == {"closed_pnl": 100, "fees": 0.1, "funding": -1.5, "volume": 100, "fills": 1}
+    assert new["ETH"]["closed_pnl"] == -40
+
+    # Overlapping pages: only the fill with an unseen tid counts
+    new = HISTORY.record_fills("Main", [fill(2, now - 8000, -40, coin="ETH"), fill(3, now - 1000, 20)], funding)
+    assert list(new) == ["BTC"]
+    assert (new["BTC"]["closed_pnl"], new["BTC"]["funding"]) == (20, 0)
+    assert HISTORY.realized("Main")["BTC"]["fills"] == 2
+    assert HISTORY.realized("Main")["BTC"]["closed_pnl"] == 120
+    assert HISTORY.fill_cursor("Main", "fills") == now - 1000
+    assert HISTORY.fill_cursor("Main", "funding") == now - 5000
+    assert HISTORY.realized("Other") == {}
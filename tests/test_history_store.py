@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from history_store import HistoryStore, resolution_for
+
+# Yesterday 00:00 UTC: aligned to every rollup bucket and inside the retention
+T0 = (int(time.time()) // 86400 - 1) * 86400
+
+
+def state(account_value, pnl=0.0, withdrawable=None, eth=1.0):
+    withdrawable = account_value / 2 if withdrawable is None else withdrawable
+    return {
+        "marginSummary": {"accountValue": str(account_value), "totalNtlPos": "3000", "withdrawable": str(withdrawable)},
+        "assetPositions": [{"position": {"coin": "ETH", "szi": str(eth), "positionValue": str(eth * 3000),
+                                         "unrealizedPnl": str(pnl)}}],
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db"))
+
+
+def test_rollups_aggregate_samples_of_a_bucket(store):
+    for offset, value in ((0, 1000), (20, 1200), (40, 900), (70, 1100)):
+        store.add("Main", state(value, pnl=value - 1000), ts=T0 + offset)
+    store.flush()
+
+    assert [point["account_value"] for point in store.series("Main", T0, T0 + 100, bucket=0)] == [1000, 1200, 900, 1100]
+    first, second = store.series("Main", T0, T0 + 100, bucket=60)
+    assert (first["ts"], first["account_value_open"], first["account_value"]) == (T0, 1000, 900)
+    assert (first["account_value_min"], first["account_value_max"]) == (900, 1200)
+    assert (second["ts"], second["account_value"]) == (T0 + 60, 1100)
+    [hour] = store.series("Main", T0, T0 + 100, bucket=3600)
+    assert (hour["account_value_open"], hour["account_value"], hour["unrealized_pnl"]) == (1000, 1100, 100)
+    assert hour["margin_usage"] == 0.5
+
+
+def test_rollups_span_flushes(store):
+    store.add("Main", state(1000), ts=T0)
+    store.flush()
+    store.add("Main", state(1500), ts=T0 + 30)
+    store.flush()
+    [minute] = store.series("Main", T0, T0 + 59, bucket=60)
+    assert (minute["account_value_open"], minute["account_value"], minute["account_value_max"]) == (1000, 1500, 1500)
+
+
+def test_second_sample_in_the_same_second_is_dropped(store):
+    store.add("Main", state(1000), ts=T0)
+    store.add("Main", state(5000), ts=T0)
+    store.flush()
+    [minute] = store.series("Main", T0, T0 + 59, bucket=60)
+    assert minute["account_value_max"] == 1000
+    assert store.last_sample("Main") == T0
+
+
+def test_position_sizes(store):
+    store.add("Main", state(1000, eth=1.0), ts=T0)
+    store.add("Main", state(1000, eth=2.5), ts=T0 + 10)
+    store.flush()
+    assert store.position_sizes("Main", T0, T0 + 59, bucket=0) == {"ETH": [(T0, 1.0, 3000.0), (T0 + 10, 2.5, 7500.0)]}
+    assert store.position_sizes("Main", T0, T0 + 59, bucket=60) == {"ETH": [(T0, 2.5, 7500.0)]}
+
+
+def test_stats(store):
+    for offset, value in ((0, 1000), (3600, 800), (7200, 1250)):
+        store.add("Main", state(value, pnl=50), ts=T0 + offset)
+    store.flush()
+    stats = store.stats("Main", T0)
+    assert (stats["samples"], stats["change"], stats["change_pct"]) == (3, 250, 25)
+    assert (stats["high"], stats["low"], stats["unrealized_pnl"]) == (1250, 800, 50)
+    assert store.stats("Other", T0) is None
+
+
+def test_disabled_store_records_nothing(tmp_path):
+    store = HistoryStore(None)
+    store.add("Main", state(1000), ts=T0)
+    store.flush()
+    assert store.series("Main", T0) == [] and store.stats("Main", T0) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_resolution_for():
+    assert resolution_for(1800) == 0
+    assert resolution_for(6 * 3600) == 60
+    assert resolution_for(7 * 86400) == 3600
+    assert resolution_for(90 * 86400) == 86400
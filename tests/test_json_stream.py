@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from json_stream import load_object, loads
+
+
+def chunked(data, size=7):
+    encoded = json.dumps(data).encode()
+    for start in range(0, len(encoded), size):
+        yield encoded[start:start + size]
+
+
+def test_load_object_matches_json():
+    body = {"status": "1", "message": "OK", "result": [{"hash": "0xa", "value": "1"}, {"hash": "0xb", "value": "2"}]}
+    assert load_object(chunked(body)) == body
+    assert loads(json.dumps(body)) == body
+
+
+def test_limit_stops_reading_after_the_array():
+    reads = []
+
+    def chunks():
+        for chunk in chunked({"result": [{"n": i} for i in range(50)], "status": "1"}):
+            reads.append(chunk)
+            yield chunk
+
+    result = load_object(chunks(), limit=3)
+    assert result == {"result": [{"n": 0}, {"n": 1}, {"n": 2}]}
+    # Later rows and keys are never read
+    assert b"status" not in b"".join(reads)
+
+
+def test_limit_larger_than_array_reads_the_rest():
+    body = {"result": [1, 2], "status": "1"}
+    assert load_object(chunked(body, size=3), limit=10) == body
+    assert load_object(chunked({"result": []}), limit=10) == {"result": []}
+
+
+def test_truncated_stream_raises():
+    with pytest.raises(ValueError):
+        load_object([b'{"result": [1, 2'])
@@ -0,0 +1,98 @@
+import pytest
+
+import leader_lease
+from leader_lease import FileLease, LeaderElector, SQLiteLease, create_lease
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(leader_lease.time, "time", lambda: now[0])
+    return now
+
+
+def test_sqlite_lease_is_exclusive_until_it_expires(tmp_path, clock):
+    path = str(tmp_path / "lease.db")
+    first = SQLiteLease(path, ttl=10, holder="a")
+    second = SQLiteLease(path, ttl=10, holder="b")
+    assert first.acquire()
+    assert not second.acquire()
+    # Renewing pushes the expiry forward
+    clock[0] += 8
+    assert first.acquire()
+    clock[0] += 8
+    assert not second.acquire()
+    # A leader that stops renewing is taken over once the lease expires
+    clock[0] += 3
+    assert second.acquire()
+    assert not first.acquire()
+
+
+def test_sqlite_release_hands_over_immediately(tmp_path, clock):
+    path = str(tmp_path / "lease.db")
+    first = SQLiteLease(path, ttl=10, holder="a")
+    second = SQLiteLease(path, ttl=10, holder="b")
+    assert first.acquire()
+    # Only the holder's own row is deleted
+    second.release()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+
+
+def test_file_lease_is_exclusive(tmp_path):
+    pytest.importorskip("fcntl")
+    path = str(tmp_path / "leader.lock")
+    first, second = FileLease(path, holder="a"), FileLease(path, holder="b")
+    assert first.acquire()
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+
+class FlakyLease:
+    holder = "test"
+
+    def __init__(self):
+        self.results = []
+        self.released = False
+
+    def acquire(self):
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def release(self):
+        self.released = True
+
+
+def test_elector_reports_changes_of_leadership():
+    lease = FlakyLease()
+    events = []
+    elector = LeaderElector(lease, on_elected=lambda: events.append("elected"),
+                            on_demoted=lambda: events.append("demoted"))
+    lease.results = [True, True, False, True, OSError("database is locked")]
+    for _ in range(5):
+        elector._update()
+    # A failed check steps down rather than risk two leaders
+    assert events == ["elected", "demoted", "elected", "demoted"]
+    assert not elector.is_leader
+
+
+def test_elector_stop_releases_the_lease():
+    lease = FlakyLease()
+    lease.results = [True]
+    elector = LeaderElector(lease, interval=60).start()
+    assert elector.is_leader
+    elector.stop()
+    assert lease.released and not elector.is_leader
+
+
+def test_create_lease(tmp_path):
+    assert create_lease("", str(tmp_path / "x")) is None
+    assert isinstance(create_lease("sqlite", str(tmp_path / "lease.db"), ttl=5), SQLiteLease)
+    with pytest.raises(ValueError, match="Unknown leader lease backend"):
+        create_lease("redis", str(tmp_path / "x"))
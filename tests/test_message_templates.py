@@ -0,0 +1,54 @@
+from message_templates import MessageTemplates, RenderedMessage, position_change_notional, split_message
+
+
+def positions(**coins):
+    return {"assetPositions": [
+        {"position": {"coin": coin, "szi": str(size), "positionValue": str(value)}}
+        for coin, (size, value) in coins.items()
+    ]}
+
+
+def test_change_notional_counts_only_changed_coins():
+    before = positions(BTC=(10, 5000000), ETH=(1, 3000))
+    after = positions(BTC=(10, 5000100), ETH=(0.99, 2950))
+    assert position_change_notional(before, after) == 50
+
+
+def test_change_notional_of_a_closed_position():
+    before = positions(BTC=(10, 5000000), ETH=(1, 3000))
+    after = positions(BTC=(10, 5000000))
+    assert position_change_notional(before, after) == 3000
+    assert position_change_notional(None, before) == 5003000
+
+
+def test_split_message_keeps_short_messages_whole():
+    text = "a" * 100
+    assert split_message(text, 100) == [text]
+
+
+def test_split_message_breaks_on_lines():
+    lines = [f"line {i:02d} " + "x" * 20 for i in range(10)]
+    chunks = split_message("\n".join(lines), 70)
+    assert all(len(chunk) <= 70 for chunk in chunks)
+    assert "\n".join(chunks).split("\n") == lines
+
+
+def test_split_message_fills_chunks_up_to_the_limit():
+    # Two 49-character lines and their newline make exactly 99 characters
+    text = "\n".join(["a" * 49, "b" * 49, "c" * 49])
+    assert split_message(text, 99) == ["a" * 49 + "\n" + "b" * 49, "c" * 49]
+
+
+def test_split_message_hard_splits_long_lines():
+    text = "head\n" + "y" * 250 + "\ntail"
+    chunks = split_message(text, 100)
+    assert chunks == ["head", "y" * 100, "y" * 100, "y" * 50 + "\ntail"]
+
+
+def test_rendered_message_and_cached_fragments():
+    templates = MessageTemplates({"<Main>": "0x1"})
+    header = templates.wallet_header("<Main>")
+    assert header == "💼 <b>Wallet:</b> &lt;Main&gt;\n"
+    assert templates.wallet_header("<Main>") is header
+    message = RenderedMessage("x" * 5000)
+    assert [len(chunk) for chunk in message.chunks] == [4096, 904]
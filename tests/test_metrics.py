@@ -0,0 +1,49 @@
+import requests
+
+from metrics import MetricsRegistry, MetricsServer
+
+
+def test_counter_and_gauge_exposition():
+    registry = MetricsRegistry()
+    alerts = registry.counter("alerts_total", "Alerts", ("event_type",))
+    alerts.inc(event_type="balance")
+    alerts.inc(2, event_type="balance")
+    depth = registry.gauge("depth", "Queue depth", ("lane",))
+    depth.set_function(lambda: {("critical",): 0, ("info",): 4})
+    text = registry.render()
+    assert "# TYPE alerts_total counter" in text
+    assert 'alerts_total{event_type="balance"} 3' in text
+    assert 'depth{lane="info"} 4' in text
+    assert alerts.value(event_type="balance") == 3
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("upstream",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 5):
+        latency.observe(value, upstream="etherscan")
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{upstream="etherscan",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{upstream="etherscan",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{upstream="etherscan",le="+Inf"} 4' in lines
+    assert 'latency_seconds_sum{upstream="etherscan"} 6.05' in lines
+    assert latency.count(upstream="etherscan") == 4
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors_total", "Errors", ("error",)).inc(error='HTTP "500"\n')
+    assert 'errors_total{error="HTTP \\"500\\"\\n"} 1' in registry.render()
+
+
+def test_metrics_endpoint():
+    registry = MetricsRegistry()
+    registry.gauge("wallets", "Wallets").set(3)
+    server = MetricsServer(0, "127.0.0.1", registry).start()
+    try:
+        response = requests.get(f"http://127.0.0.1:{server.port}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert "wallets 3" in response.text
+        assert requests.get(f"http://127.0.0.1:{server.port}/other", timeout=5).status_code == 404
+    finally:
+        server.stop()
@@ -0,0 +1,60 @@
+import pytest
+
+import portfolio_stats
+from portfolio_stats import PositionTable, portfolio_stats as compute
+
+
+def state(account_value, *positions):
+    return {
+        "marginSummary": {"accountValue": str(account_value)},
+        "assetPositions": [{"position": {"coin": coin, "szi": str(size), "positionValue": str(value),
+                                         "unrealizedPnl": str(pnl)}} for coin, size, value, pnl in positions],
+    }
+
+
+WALLETS = {
+    "Main": state(10000, ("ETH", 2, 6000, 100), ("BTC", -0.1, 6000, -50), ("SOL", 0, 0, 0)),
+    "Cold": state(5000, ("ETH", 1, 3000, 20)),
+    "Empty": None,
+}
+
+
+def test_wallet_exposure():
+    stats = compute(WALLETS)
+    main = stats["wallets"]["Main"]
+    assert (main["long_value"], main["short_value"], main["net_value"]) == (6000, 6000, 0)
+    assert (main["gross_value"], main["leverage"], main["unrealized_pnl"]) == (12000, 1.2, 50)
+    # Closed (zero size) positions don't count
+    assert main["positions"] == 2
+    assert main["concentration"] == 0.5
+    assert stats["wallets"]["Cold"]["top_coin"] == "ETH"
+    empty = stats["wallets"]["Empty"]
+    assert (empty["positions"], empty["top_coin"], empty["leverage"], empty["concentration"]) == (0, None, 0, 0)
+
+
+def test_coins_and_totals():
+    stats = compute(WALLETS)
+    assert list(stats["coins"]) == ["ETH", "BTC"]
+    eth, btc = stats["coins"]["ETH"], stats["coins"]["BTC"]
+    assert (eth["net_size"], eth["wallets"], eth["share"]) == (3, 2, 0.6)
+    assert (btc["net_value"], btc["net_size"]) == (-6000, -0.1)
+    totals = stats["totals"]
+    assert (totals["wallets"], totals["positions"], totals["account_value"]) == (3, 3, 15000)
+    assert (totals["gross_value"], totals["net_value"], totals["leverage"]) == (15000, 3000, 1.0)
+    assert totals["concentration"] == pytest.approx(0.6 ** 2 + 0.4 ** 2)
+    assert totals["top_coin"] == "ETH"
+
+
+def test_no_positions():
+    stats = compute({})
+    assert stats["coins"] == {} and stats["totals"]["top_coin"] is None
+    assert stats["totals"]["leverage"] == 0
+
+
+def test_backends_agree():
+    pytest.importorskip("numpy")
+    table = PositionTable(WALLETS)
+    vectorized, plain = portfolio_stats._aggregate_numpy(table), portfolio_stats._aggregate_python(table)
+    assert vectorized.keys() == plain.keys()
+    for key in plain:
+        assert vectorized[key] == pytest.approx(plain[key])
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+import price_service
+from price_service import PriceService
+
+
+class FakeResponse:
+    def __init__(self, mids):
+        self.content = json.dumps(mids).encode()
+
+
+class FakeSession:
+    """Counts allMids requests; the mids can be changed between calls"""
+
+    def __init__(self, mids):
+        self.mids = mids
+        self.calls = 0
+        self.fail = False
+
+    def post(self, url, json=None, timeout=None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return FakeResponse(self.mids)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(price_service.time, "time", lambda: now[0])
+    return now
+
+
+def test_lookups_reuse_the_pinned_snapshot(clock):
+    session = FakeSession({"ETH": "3000", "BTC": "60000"})
+    prices = PriceService("http://fake", ttl=30, session=session)
+    prices.refresh()
+    session.mids = {"ETH": "3100", "BTC": "61000"}
+    # A long cycle keeps valuing everything at the snapshot's prices, with one fetch
+    clock[0] += 120
+    assert prices.price("eth") == 3000.0
+    assert prices.price("WBTC") == 60000.0
+    assert session.calls == 1
+    prices.release()
+    assert prices.price("ETH") == 3100.0
+    assert session.calls == 2
+
+
+def test_refresh_reuses_fresh_prices(clock):
+    session = FakeSession({"ETH": "3000"})
+    prices = PriceService("http://fake", ttl=30, session=session)
+    prices.price("ETH")
+    clock[0] += 10
+    prices.refresh()
+    prices.release()
+    assert session.calls == 1
+    clock[0] += 31
+    prices.refresh()
+    assert session.calls == 2
+
+
+def test_failed_fetch_keeps_last_prices_until_the_ttl(clock):
+    session = FakeSession({"ETH": "3000"})
+    prices = PriceService("http://fake", ttl=30, session=session)
+    assert prices.price("ETH") == 3000.0
+    session.fail = True
+    clock[0] += 31
+    assert prices.price("ETH") == 3000.0
+    # The failure isn't retried by every lookup
+    assert prices.price("ETH") == 3000.0
+    assert session.calls == 2
+
+
+def test_stablecoins_aliases_and_overrides(clock):
+    session = FakeSession({"ETH": "3000"})
+    prices = PriceService("http://fake", overrides={"gho": 0.99}, session=session)
+    assert prices.price("USDC") == 1.0
+    assert prices.price("GHO") == 0.99
+    assert prices.price("stETH") == 3000.0
+    assert prices.price("UNKNOWN") is None
+    assert prices.usd_value("USDT", -250) == 250.0
+    assert prices.usd_value("UNKNOWN", 1) is None
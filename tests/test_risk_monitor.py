@@ -0,0 +1,74 @@
+from risk_monitor import RiskMonitor, liquidation_distance
+
+
+class FixedPrices:
+    def __init__(self, mids):
+        self.mids = mids
+
+    def price(self, symbol):
+        return self.mids.get(symbol)
+
+
+def positions(*entries):
+    return {"assetPositions": [
+        {"position": {"coin": coin, "szi": str(size), "liquidationPx": str(liq), "positionValue": str(abs(size) * 100)}}
+        for coin, size, liq in entries
+    ]}
+
+
+def test_liquidation_distance():
+    assert liquidation_distance({"szi": "1", "liquidationPx": "90"}, 100.0) == 0.1
+    assert liquidation_distance({"szi": "-1", "liquidationPx": "130"}, 100.0) == 0.3
+    # Past the liquidation price counts as zero distance
+    assert liquidation_distance({"szi": "1", "liquidationPx": "120"}, 100.0) == 0.0
+    # Without a mid the mark implied by the position value is used
+    assert liquidation_distance({"szi": "2", "liquidationPx": "95", "positionValue": "200"}, None) == 0.05
+    assert liquidation_distance({"szi": "1", "liquidationPx": None}, 100.0) is None
+    assert liquidation_distance({"szi": "0", "liquidationPx": "90"}, 100.0) is None
+
+
+def test_alerts_only_when_moving_into_a_worse_tier():
+    prices = FixedPrices({"ETH": 100.0})
+    monitor = RiskMonitor(prices=prices)
+    assert monitor.assess("Main", positions(("ETH", 1, 70))) == []
+    assert monitor.tier_of("Main") == "safe"
+
+    prices.mids["ETH"] = 85.0
+    [risk] = monitor.assess("Main", positions(("ETH", 1, 70)))
+    assert risk["tier"] == "warning" and risk["side"] == "LONG"
+    # Staying in the tier doesn't alert again
+    assert monitor.assess("Main", positions(("ETH", 1, 70))) == []
+
+    prices.mids["ETH"] = 73.0
+    [risk] = monitor.assess("Main", positions(("ETH", 1, 70)))
+    assert risk["tier"] == "critical"
+    assert monitor.at_risk() == ["Main"]
+
+    # Recovering alerts nothing, and a later relapse alerts again
+    prices.mids["ETH"] = 100.0
+    assert monitor.assess("Main", positions(("ETH", 1, 70))) == []
+    assert monitor.tier_of("Main") == "safe" and monitor.at_risk() == []
+    prices.mids["ETH"] = 77.0
+    assert [risk["tier"] for risk in monitor.assess("Main", positions(("ETH", 1, 70)))] == ["danger"]
+
+
+def test_recovery_margin_avoids_flapping_at_a_limit():
+    prices = FixedPrices({"BTC": 100.0})
+    monitor = RiskMonitor(prices=prices)
+    assert [risk["tier"] for risk in monitor.assess("Main", positions(("BTC", -1, 110)))] == ["danger"]
+    # 10.5% is past the 10% danger limit but within the recovery margin
+    prices.mids["BTC"] = 110 / 1.105
+    monitor.assess("Main", positions(("BTC", -1, 110)))
+    assert monitor.tier_of("Main") == "danger"
+    prices.mids["BTC"] = 110 / 1.15
+    monitor.assess("Main", positions(("BTC", -1, 110)))
+    assert monitor.tier_of("Main") == "warning"
+
+
+def test_escalations_are_sorted_and_closed_positions_forgotten():
+    monitor = RiskMonitor(prices=FixedPrices({"ETH": 100.0, "BTC": 100.0}))
+    risks = monitor.assess("Main", positions(("ETH", 1, 85), ("BTC", 1, 97)))
+    assert [(risk["coin"], risk["tier"]) for risk in risks] == [("BTC", "critical"), ("ETH", "warning")]
+    monitor.assess("Main", positions(("ETH", 1, 85)))
+    assert monitor.tier_of("Main") == "warning"
+    assert monitor.assess("Main", {}) == []
@@ -0,0 +1,37 @@
+from sharding import HashRing, parse_address, shard_api_key, shard_wallets
+
+WALLETS = {f"Wallet {i}": f"0x{i:040x}" for i in range(1000)}
+
+
+def test_assignment_is_stable():
+    ring = HashRing(range(4))
+    assert [ring.node_for(address) for address in WALLETS.values()] == \
+        [HashRing(range(4)).node_for(address) for address in WALLETS.values()]
+    # Addresses are matched case-insensitively
+    upper = {name: address.upper().replace("0X", "0x") for name, address in WALLETS.items()}
+    assert shard_wallets(upper, 4) == [
+        {name: upper[name] for name in shard} for shard in shard_wallets(WALLETS, 4)
+    ]
+
+
+def test_every_wallet_lands_on_exactly_one_shard():
+    shards = shard_wallets(WALLETS, 4)
+    assert sum(len(shard) for shard in shards) == len(WALLETS)
+    assert all(150 < len(shard) < 350 for shard in shards)
+
+
+def test_adding_a_shard_moves_few_wallets():
+    before, after = HashRing(range(4)), HashRing(range(5))
+    moved = sum(before.node_for(address) != after.node_for(address) for address in WALLETS.values())
+    # About 1/5 of the keys move, all of them to the new shard
+    assert moved < len(WALLETS) * 0.3
+    assert all(after.node_for(address) == 4 for address in WALLETS.values()
+               if before.node_for(address) != after.node_for(address))
+
+
+def test_shard_keys_and_hub_address():
+    config = {"etherscan_api_key": "shared", "etherscan_api_keys": ["a", "b"]}
+    assert [shard_api_key(config, i) for i in range(3)] == ["a", "b", "a"]
+    assert shard_api_key({"etherscan_api_key": "shared"}, 2) == "shared"
+    assert parse_address("10.0.0.2:50055") == ("10.0.0.2", 50055)
+    assert parse_address(":50055") == ("127.0.0.1", 50055)
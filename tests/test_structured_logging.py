@@ -0,0 +1,51 @@
+import json
+import logging
+import queue
+
+from structured_logging import JsonFormatter, NonBlockingQueueHandler, SamplingFilter, record_fields
+
+
+def make_record(msg="hello %s", args=("world",), level=logging.INFO, **extra):
+    record = logging.LogRecord("monitor", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_lines_carry_structured_fields():
+    record = make_record(wallet="Main", stage="diff", latency_ms=12.5, sample=True)
+    assert record_fields(record) == {"wallet": "Main", "stage": "diff", "latency_ms": 12.5}
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["wallet"] == "Main" and entry["latency_ms"] == 12.5
+    assert "sample" not in entry
+
+
+def test_sampling_keeps_one_in_n_marked_records():
+    sampler = SamplingFilter(0.25)
+    kept = [sampler.filter(make_record("No changes", (), sample=True)) for _ in range(8)]
+    assert kept.count(True) == 2
+    assert sampler.filter(make_record("Alert", ()))
+    assert not SamplingFilter(0).filter(make_record("No changes", (), sample=True))
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(make_record())
+    handler.handle(make_record())
+    assert handler.dropped == 1
+    record = handler.queue.get_nowait()
+    assert record.msg == "hello world" and record.args is None
+
+
+def test_exceptions_are_rendered_before_queueing():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    try:
+        raise KeyError("missing")
+    except KeyError:
+        logging.getLogger("test").addHandler(handler)
+        logging.getLogger("test").exception("failed")
+        logging.getLogger("test").removeHandler(handler)
+    record = handler.queue.get_nowait()
+    assert record.error == "KeyError"
+    assert "KeyError: 'missing'" in record.exc_text and record.exc_info is None
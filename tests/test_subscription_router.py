@@ -0,0 +1,39 @@
+from subscription_router import SubscriptionRouter
+
+
+def test_default_subscribers_get_everything():
+    router = SubscriptionRouter(["Main", "Cold"])
+    router.add(1)
+    assert router.recipients("Main", "balance") == {1}
+    assert router.recipients("Cold", "deposit", 0.01) == {1}
+
+
+def test_wallet_event_and_usd_filters():
+    router = SubscriptionRouter(["Main", "Cold"])
+    router.add(1, {"wallets": ["Main"]})
+    router.add(2, {"events": ["position"]})
+    router.add(3, {"min_usd": 1000})
+    assert router.recipients("Main", "balance", 50) == {1}
+    assert router.recipients("Cold", "position", 5000) == {2, 3}
+    # Events without a USD value skip the min_usd filter
+    assert router.recipients("Cold", "balance") == {3}
+
+
+def test_update_and_remove_reroute_the_chat():
+    router = SubscriptionRouter(["Main", "Cold"])
+    router.add(1)
+    router.update(1, wallets=["Cold"], min_usd=100)
+    assert router.recipients("Main", "balance", 500) == set()
+    assert router.recipients("Cold", "balance", 50) == set()
+    assert router.recipients("Cold", "balance", 500) == {1}
+    router.remove(1)
+    assert router.recipients("Cold", "balance", 500) == set()
+
+
+def test_set_wallets_keeps_preferences():
+    router = SubscriptionRouter(["Main"])
+    router.add(1, {"events": ["deposit"]})
+    router.set_wallets(["Main", "New"])
+    assert router.recipients("New", "deposit") == {1}
+    assert router.resolve_wallet(" new ") == "New"
+    assert router.export() == {"1": {"wallets": None, "events": ["deposit"], "min_usd": 0.0}}
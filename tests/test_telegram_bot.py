@@ -0,0 +1,85 @@
+import logging
+
+import pytest
+
+from telegram_bot import TelegramBotManager
+
+
+@pytest.fixture
+def bot(tmp_path, monkeypatch):
+    monkeypatch.delenv("SUBSCRIBERS_FILE", raising=False)
+    manager = TelegramBotManager("token", subscribers_file=str(tmp_path / "subscribers.json"))
+    manager.wallets = {"Main": "0x1"}
+    manager.sent = []
+    manager.send_message = lambda chat_id, text, parse_mode="HTML": manager.sent.append((chat_id, text)) or True
+    manager.add_subscriber(1)
+    return manager
+
+
+@pytest.mark.parametrize("argument", ["nan", "inf", "-inf", "1e999", "-5", "lots"])
+def test_minusd_rejects_values_that_are_not_finite(bot, argument):
+    bot._handle_filter_command(1, f"/minusd {argument}")
+    assert bot.router.get_preferences(1)["min_usd"] == 0.0
+    assert "Usage" in bot.sent[-1][1]
+
+
+def test_minusd_accepts_amounts(bot):
+    bot._handle_filter_command(1, "/minusd $1,500")
+    assert bot.router.get_preferences(1)["min_usd"] == 1500.0
+    assert bot.get_recipients("Main", "balance", 100) == set()
+    assert bot.get_recipients("Main", "balance", 2000) == {1}
+
+
+def fanout_bot(tmp_path, monkeypatch, **options):
+    monkeypatch.delenv("SUBSCRIBERS_FILE", raising=False)
+    manager = TelegramBotManager("token", subscribers_file=str(tmp_path / "fanout.json"), **options)
+    manager.calls = []
+
+    def call(method, payload, timeout=10, files=None):
+        manager.calls.append((method, payload))
+        return {"message_id": len(manager.calls)}
+
+    manager._call = call
+    return manager
+
+
+def test_copy_mode_stages_once_and_relays(tmp_path, monkeypatch):
+    manager = fanout_bot(tmp_path, monkeypatch, fanout_mode="copy", staging_chat_id=-100)
+    results = manager.deliver("alert", [1, 2, 3])
+    assert results == {"success": 3, "failed": 0, "total": 3}
+    assert [method for method, _ in manager.calls] == ["sendMessage", "copyMessage", "copyMessage", "copyMessage"]
+    assert manager.calls[0][1]["chat_id"] == -100
+    assert {payload["chat_id"] for _, payload in manager.calls[1:]} == {1, 2, 3}
+    assert all(payload["message_id"] == 1 for _, payload in manager.calls[1:])
+
+
+def test_long_messages_are_relayed_in_one_request(tmp_path, monkeypatch):
+    manager = fanout_bot(tmp_path, monkeypatch, fanout_mode="forward", staging_chat_id=-100)
+    manager.deliver("x" * 5000, [1, 2])
+    assert [method for method, _ in manager.calls] == ["sendMessage", "sendMessage", "forwardMessages", "forwardMessages"]
+    assert manager.calls[2][1]["message_ids"] == [1, 2]
+
+
+def test_fanout_falls_back_to_direct_sends(tmp_path, monkeypatch):
+    # A single recipient isn't worth staging; copy mode without a staging chat is direct
+    manager = fanout_bot(tmp_path, monkeypatch, fanout_mode="copy", staging_chat_id=-100)
+    manager.deliver("alert", [1])
+    assert [method for method, _ in manager.calls] == ["sendMessage"]
+    assert fanout_bot(tmp_path, monkeypatch, fanout_mode="copy").fanout_mode == "direct"
+
+
+def test_channel_mode_posts_once(tmp_path, monkeypatch):
+    manager = fanout_bot(tmp_path, monkeypatch, fanout_mode="channel", channel_id="@alerts")
+    manager.deliver("alert", [1, 2, 3])
+    assert manager.calls == [("sendMessage", {"chat_id": "@alerts", "text": "alert", "parse_mode": "HTML"})]
+
+
+def test_unauthorized_group_commands_are_warnings(bot, monkeypatch, caplog):
+    monkeypatch.setattr(bot, "_is_user_admin", lambda chat_id, user_id: False)
+    update = {"update_id": 1, "message": {"chat": {"id": -50, "type": "group", "title": "Desk"},
+                                          "from": {"id": 7, "username": "someone"}, "text": "/stop"}}
+    with caplog.at_level(logging.INFO, logger="telegram_bot"):
+        bot._handle_update(update)
+    [record] = [record for record in caplog.records if "Unauthorized" in record.getMessage()]
+    assert record.levelno == logging.WARNING
+    assert (record.user_id, record.chat_id) == (7, -50)
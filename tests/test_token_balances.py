@@ -0,0 +1,71 @@
+import json
+import threading
+
+from token_balances import BALANCE_OF_SELECTOR, balance_of_call, create_reader
+
+
+class FakeResponse:
+    def __init__(self, replies):
+        self.content = json.dumps(replies).encode()
+
+
+class FakeRPC:
+    """Answers balanceOf batches with balances[(wallet, contract)]; unknown pairs revert"""
+
+    def __init__(self, balances):
+        self.balances = balances
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, timeout=None):
+        with self._lock:
+            self.batches.append(len(json))
+        replies = []
+        for call in json:
+            params = call["params"][0]
+            wallet = "0x" + params["data"][-40:]
+            balance = self.balances.get((wallet, params["to"]))
+            if balance is None:
+                replies.append({"jsonrpc": "2.0", "id": call["id"], "error": {"message": "execution reverted"}})
+            else:
+                replies.append({"jsonrpc": "2.0", "id": call["id"], "result": "0x" + format(balance, "064x")})
+        return FakeResponse(list(reversed(replies)))
+
+
+def test_balance_of_call_encodes_the_wallet():
+    call = balance_of_call("0xABCDEF0000000000000000000000000000000001", "0xtoken", 7)
+    assert call["id"] == 7
+    assert call["params"][0]["to"] == "0xtoken"
+    assert call["params"][0]["data"] == BALANCE_OF_SELECTOR + "0" * 24 + "abcdef0000000000000000000000000000000001"
+
+
+def test_fetch_batches_pairs_and_matches_replies_by_id():
+    wallets = [f"0x{i:040x}" for i in range(25)]
+    balances = {(wallet, "0xtoken"): i * 10 for i, wallet in enumerate(wallets)}
+    rpc = FakeRPC(balances)
+    reader = create_reader("http://rpc", batch_size=10, workers=2)
+    reader._session = rpc
+    # Duplicates are read once
+    result = reader.fetch([(wallet, "0xtoken") for wallet in wallets] + [(wallets[0], "0xtoken")])
+    assert result == balances
+    assert sorted(rpc.batches) == [5, 10, 10]
+
+
+def test_reverted_calls_and_failed_batches_are_left_out():
+    wallet = "0x" + "1" * 40
+    rpc = FakeRPC({(wallet, "0xgood"): 5})
+    reader = create_reader("http://rpc")
+    reader._session = rpc
+    assert reader.fetch([(wallet, "0xgood"), (wallet, "0xbad")]) == {(wallet, "0xgood"): 5}
+
+    class Down:
+        def post(self, *args, **kwargs):
+            raise ConnectionError("rpc down")
+
+    reader._session = Down()
+    assert reader.fetch([(wallet, "0xgood")]) == {}
+    assert reader.fetch([]) == {}
+
+
+def test_reader_is_off_without_rpc_url():
+    assert create_reader("") is None
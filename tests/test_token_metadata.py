@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from token_metadata import TokenMetadataCache
+
+ARBITRUM_USDC = "0xaf88d065e77c8cc2239327c5edb3a432268e5831"
+MAINNET_USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+
+
+def transfer(address, symbol, decimals="6", value="1000000", name=""):
+    return {"contractAddress": address, "tokenSymbol": symbol, "tokenName": name, "tokenDecimal": decimals,
+            "value": value}
+
+
+@pytest.fixture
+def cache():
+    return TokenMetadataCache()
+
+
+def test_canonical_tokens_are_verified_on_their_own_chain(cache):
+    token = cache.learn(transfer(ARBITRUM_USDC.upper().replace("0X", "0x"), "USDC"), "arbitrum")
+    assert token["verified"] and token["spam"] is None
+    assert cache.allows(token, transfer(ARBITRUM_USDC, "USDC"))
+    assert cache.get(MAINNET_USDC)["verified"]
+
+
+def test_impersonation_is_checked_against_the_same_chain(cache):
+    # Arbitrum's USDC address used on mainnet is a look-alike there
+    assert cache.learn(transfer(ARBITRUM_USDC, "USDC"), "ethereum")["spam"] == "imitates USDC"
+    assert cache.learn(transfer("0x" + "1" * 40, "USDC"), "base")["spam"] == "imitates USDC"
+    # Metadata is not shared between chains
+    assert cache.get(ARBITRUM_USDC, "arbitrum")["verified"]
+    assert cache.get(ARBITRUM_USDC, "base") is None
+
+
+def test_spam_filter(cache):
+    link = cache.learn(transfer("0x" + "2" * 40, "FREE", name="Claim at free.xyz"), "polygon")
+    assert link["spam"] == "link in name"
+    plain = cache.learn(transfer("0x" + "3" * 40, "PEPE", decimals="18"), "polygon")
+    assert cache.allows(plain, transfer("0x" + "3" * 40, "PEPE", value="5"))
+    # Zero-value transfers are address poisoning
+    assert not cache.allows(plain, transfer("0x" + "3" * 40, "PEPE", value="0"))
+
+
+def test_metadata_comes_from_the_first_row(cache):
+    first = cache.learn(transfer("0x" + "8" * 40, "AAA", decimals="0"))
+    later = cache.learn(transfer("0x" + "8" * 40, "BBB", decimals="18"))
+    assert later is first
+    assert (later["symbol"], later["decimals"]) == ("AAA", 0)
+
+
+def test_verified_filter_only_allows_verified_tokens():
+    cache = TokenMetadataCache(token_filter="verified")
+    assert cache.allows(cache.get(MAINNET_USDC), transfer(MAINNET_USDC, "USDC"))
+    assert not cache.allows(cache.learn(transfer("0x" + "9" * 40, "PEPE")), transfer("0x" + "9" * 40, "PEPE"))
+
+
+def test_verified_tokens_setting():
+    cache = TokenMetadataCache(verified=["arbitrum:0x" + "4" * 40, "0x" + "5" * 40])
+    assert cache.learn(transfer("0x" + "4" * 40, "USDC"), "arbitrum")["verified"]
+    assert not cache.learn(transfer("0x" + "4" * 40, "USDC"), "base")["verified"]
+    assert cache.learn(transfer("0x" + "5" * 40, "USDT"), "bsc")["verified"]
+
+
+def test_cache_file_round_trip(tmp_path):
+    path = tmp_path / "tokens.json"
+    # Files from before multi-chain tracking hold bare mainnet addresses
+    path.write_text(json.dumps({"0x" + "6" * 40: {"symbol": "OLD", "name": "", "decimals": 9}}))
+    cache = TokenMetadataCache(str(path))
+    assert cache.get("0x" + "6" * 40)["decimals"] == 9
+    cache.learn(transfer("0x" + "7" * 40, "NEW", decimals="4"), "base")
+    cache.save()
+
+    saved = json.loads(path.read_text())
+    assert saved[f"base:0x{'7' * 40}"]["decimals"] == 4
+    assert not any(MAINNET_USDC in key for key in saved)
+    reloaded = TokenMetadataCache(str(path))
+    assert reloaded.get("0x" + "7" * 40, "base")["symbol"] == "NEW"
+    assert reloaded.get("0x" + "6" * 40)["symbol"] == "OLD"
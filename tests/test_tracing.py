@@ -0,0 +1,79 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tracing import STATUS_ERROR, FileSpanExporter, Tracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.batches = []
+
+    def export(self, spans):
+        self.batches.append(spans)
+
+
+def test_a_trace_is_exported_when_its_root_ends():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+    with tracer.span("cycle") as root:
+        with tracer.span("fetch", wallet="Main") as child:
+            pass
+        assert exporter.batches == []
+    [spans] = exporter.batches
+    assert [span.name for span in spans] == ["fetch", "cycle"]
+    assert child.parent_id == root.context.span_id
+    assert child.context.trace_id == root.context.trace_id
+    assert child.attributes == {"wallet": "Main"}
+
+
+def test_bound_work_in_a_thread_pool_stays_in_the_trace():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    def work():
+        with tracer.span("worker"):
+            pass
+
+    with tracer.span("cycle") as root:
+        with ThreadPoolExecutor(2) as pool:
+            for future in [pool.submit(tracer.bind(work)) for _ in range(3)]:
+                future.result()
+    [spans] = exporter.batches
+    workers = [span for span in spans if span.name == "worker"]
+    assert len(workers) == 3
+    assert all(span.parent_id == root.context.span_id for span in workers)
+
+
+def test_errors_are_recorded():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+    with pytest.raises(ValueError):
+        with tracer.span("deliver"):
+            raise ValueError("boom")
+    [[span]] = exporter.batches
+    assert span.status == STATUS_ERROR
+    assert span.status_message == "ValueError: boom"
+
+
+def test_unsampled_and_disabled_tracing():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, sample_rate=0)
+    with tracer.span("cycle"):
+        with tracer.span("fetch"):
+            pass
+    assert exporter.batches == []
+    with Tracer().span("cycle") as span:
+        assert span is None
+
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(FileSpanExporter(str(path)))
+    with tracer.span("cycle", wallets=2):
+        pass
+    document = json.loads(path.read_text())
+    [span] = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert span["name"] == "cycle"
+    assert span["attributes"] == [{"key": "wallets", "value": {"intValue": "2"}}]
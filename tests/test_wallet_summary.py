@@ -0,0 +1,35 @@
+import pytest
+
+from price_service import PriceService
+from wallet_tracker import WalletTracker
+
+
+@pytest.fixture
+def tracker(upstream):
+    return WalletTracker("0x" + "ef" * 20, "key", base_url=upstream.etherscan_url,
+                         hyperliquid_url=upstream.hyperliquid_url, wallet_name="Main",
+                         prices=PriceService(upstream.hyperliquid_url))
+
+
+def test_only_requested_sections_are_fetched(tracker, upstream):
+    summary = tracker.get_summary(("balance",))
+    assert "eth_balance" in summary
+    assert "hyperliquid_positions" not in summary and "recent_transactions" not in summary
+    assert upstream.calls == {"etherscan.balance": 1}
+
+
+def test_sections_are_served_from_cache(tracker, upstream):
+    tracker.get_summary(("balance", "positions"))
+    upstream.reset_stats()
+    summary = tracker.get_summary()
+    # Only the sections not fetched within cache_ttl go upstream
+    assert upstream.calls == {"etherscan.txlist": 1, "etherscan.tokentx": 1}
+    assert summary["position_stats"] and len(summary["recent_transactions"]) <= 5
+    upstream.reset_stats()
+    tracker.get_summary(("balance",), max_age=0)
+    assert upstream.calls == {"etherscan.balance": 1}
+
+
+def test_unknown_sections_are_rejected(tracker):
+    with pytest.raises(ValueError, match="fills"):
+        tracker.get_summary(("balance", "fills"))
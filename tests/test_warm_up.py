@@ -0,0 +1,43 @@
+import time
+from types import SimpleNamespace
+
+from main import CryptoWalletMonitor
+from price_service import PriceService
+from wallet_tracker import WalletTracker
+
+
+class SlowTracker:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def warm_up(self):
+        time.sleep(0.2)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return {"eth_balance": 1.0}
+
+
+def test_wallets_warm_up_in_parallel():
+    monitor = SimpleNamespace(
+        config={"startup_workers": 4},
+        trackers={"A": SlowTracker(), "B": SlowTracker(fail=True), "C": SlowTracker(), "D": SlowTracker()},
+        chain_trackers={},
+        _warm_up_wallet=lambda wallet_name, tracker: tracker.warm_up()
+    )
+    started = time.perf_counter()
+    summaries = CryptoWalletMonitor.warm_up(monitor)
+    assert time.perf_counter() - started < 0.6
+    assert [name for name, _, _ in summaries] == ["A", "B", "C", "D"]
+    assert summaries[0] == ("A", {"eth_balance": 1.0}, None)
+    assert summaries[1] == ("B", None, "upstream down")
+
+
+def test_warm_up_is_the_first_cycle_baseline(upstream):
+    tracker = WalletTracker("0x" + "cd" * 20, "key", base_url=upstream.etherscan_url,
+                            hyperliquid_url=upstream.hyperliquid_url, wallet_name="Main",
+                            prices=PriceService(upstream.hyperliquid_url))
+    summary = tracker.warm_up()
+    assert summary["eth_balance"] == tracker.last_known_balance
+    assert tracker.last_known_positions == summary["hyperliquid_positions"]
+    assert tracker.check_balance_change()[0] is None
+    assert tracker.check_position_changes()[2] == "none"
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Token Balances
+ERC-20 balanceOf reads for every (wallet, token) pair of a cycle, sent as
+JSON-RPC batches of eth_call to ETH_RPC_URL so hundreds of wallets with
+hundreds of tokens cost a handful of HTTP requests instead of one
+Etherscan call each
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from json_stream import loads
+from metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from tracing import bind, span
+
+logger = logging.getLogger(__name__)
+
+# keccak256("balanceOf(address)")[:4]
+BALANCE_OF_SELECTOR = "0x70a08231"
+
+
+def balance_of_call(wallet: str, contract: str, request_id: int) -> Dict:
+    """eth_call request reading a wallet's balance of one token contract"""
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "eth_call",
+        "params": [{"to": contract, "data": BALANCE_OF_SELECTOR + wallet[2:].lower().rjust(64, "0")}, "latest"]
+    }
+
+
+class TokenBalanceReader:
+    def __init__(self, rpc_url: str, batch_size: int = 500, workers: int = 4):
+        self.rpc_url = rpc_url
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+        self._session = requests.Session()
+
+    def _post_batch(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        started = time.perf_counter()
+        try:
+            with span("rpc.balanceOf", calls=len(pairs)):
+                response = self._session.post(
+                    self.rpc_url,
+                    json=[balance_of_call(wallet, contract, i) for i, (wallet, contract) in enumerate(pairs)],
+                    timeout=30
+                )
+                replies = loads(response.content)
+            if not isinstance(replies, list):
+                raise ValueError(f"unexpected RPC reply: {str(replies)[:200]}")
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(upstream="rpc", endpoint="eth_call", error=type(e).__name__)
+            logger.error(f"❌ Error reading {len(pairs)} token balance(s): {e}",
+                         extra={"stage": "fetch", "upstream": "rpc", "error": type(e).__name__})
+            return {}
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, upstream="rpc", endpoint="eth_call")
+
+        balances = {}
+        for reply in replies:
+            # Reverted calls (not a token, self-destructed contract) are left out
+            result = reply.get("result")
+            if isinstance(reply.get("id"), int) and 0 <= reply["id"] < len(pairs) and result and result != "0x":
+                try:
+                    balances[pairs[reply["id"]]] = int(result[:66], 16)
+                except ValueError:
+                    pass
+        return balances
+
+    def fetch(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], int]:
+        """Raw balances keyed by (wallet, contract); pairs whose call failed are missing"""
+        pairs = list(dict.fromkeys(pairs))
+        batches = [pairs[i:i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
+        if len(batches) <= 1:
+            return self._post_batch(batches[0]) if batches else {}
+        balances = {}
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(batches)), thread_name_prefix="rpc") as pool:
+            for result in pool.map(bind(self._post_batch), batches):
+                balances.update(result)
+        return balances
+
+
+def create_reader(rpc_url: str, batch_size: int = 500, workers: int = 4) -> Optional[TokenBalanceReader]:
+    """Reader for ETH_RPC_URL, None when token balance tracking is off"""
+    return TokenBalanceReader(rpc_url, batch_size, workers) if rpc_url else None
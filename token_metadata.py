@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Token Metadata
+Decimals, symbol and name of ERC-20 tokens keyed by chain and contract
+address, learnt from the first transfer row seen for a contract and kept
+in a JSON file shared by every tracker. Tokens are marked verified (the
+chain's well-known contracts plus VERIFIED_TOKENS) or spam (symbols copied
+from a token verified on the same chain, links in the name), so fake
+transfers are dropped before they reach formatting and the broadcast path
+"""
+
+import atexit
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from chains import DEFAULT_CHAIN, KNOWN_TOKENS
+
+logger = logging.getLogger(__name__)
+
+# Airdrop scams advertise a site in the token name or symbol
+_LINK_PATTERN = re.compile(r"https?:|www\.|t\.me|\.(com|io|org|net|xyz|app|site|gift)\b|visit|claim", re.IGNORECASE)
+
+# Transfers let through by TOKEN_FILTER
+TOKEN_FILTERS = ("off", "spam", "verified")
+
+
+class TokenMetadataCache:
+    def __init__(self, path: str = None, verified: Iterable[str] = (), token_filter: str = "spam"):
+        self._lock = threading.Lock()
+        self.configure(path, verified, token_filter)
+
+    def configure(self, path: str = None, verified: Iterable[str] = (), token_filter: str = "spam"):
+        """
+        (Re)load from path with the given extra verified contracts
+        ("chain:0x..." for one chain, a bare address for every chain) and filter
+        """
+        self.path = path
+        self.token_filter = token_filter if token_filter in TOKEN_FILTERS else "spam"
+        self.verified: Set[Tuple[str, str]] = {
+            (chain, address) for chain, tokens in KNOWN_TOKENS.items() for address in tokens
+        }
+        self._verified_everywhere: Set[str] = set()
+        for entry in verified:
+            chain, _, address = entry.lower().rpartition(":")
+            if chain:
+                self.verified.add((chain, address))
+            else:
+                self._verified_everywhere.add(address)
+        # Symbols that only a chain's well-known contracts may use on that chain
+        self._verified_symbols: Dict[str, Dict[str, Set[str]]] = {}
+        for chain, tokens in KNOWN_TOKENS.items():
+            for address, (symbol, _, _) in tokens.items():
+                self._verified_symbols.setdefault(chain, {}).setdefault(symbol.upper(), set()).add(address)
+        self._tokens: Dict[Tuple[str, str], Dict] = {
+            (chain, address): self._entry(chain, address, symbol, name, decimals)
+            for chain, tokens in KNOWN_TOKENS.items()
+            for address, (symbol, name, decimals) in tokens.items()
+        }
+        self._dirty = False
+        self.load()
+
+    def _entry(self, chain: str, address: str, symbol: str, name: str, decimals: Optional[int]) -> Dict:
+        verified = (chain, address) in self.verified or address in self._verified_everywhere
+        return {
+            "chain": chain,
+            "address": address,
+            "symbol": symbol or "Unknown",
+            "name": name or "",
+            "decimals": decimals,
+            "verified": verified,
+            "spam": None if verified else self._spam_reason(chain, address, symbol or "", name or "")
+        }
+
+    def _spam_reason(self, chain: str, address: str, symbol: str, name: str) -> Optional[str]:
+        impersonated = self._verified_symbols.get(chain, {}).get(symbol.upper())
+        if impersonated and address not in impersonated:
+            return f"imitates {symbol}"
+        if _LINK_PATTERN.search(symbol) or _LINK_PATTERN.search(name):
+            return "link in name"
+        return None
+
+    def load(self):
+        """Add tokens saved by earlier runs (verified/spam are re-evaluated)"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️  Error loading token metadata: {e}")
+            return
+        with self._lock:
+            for key, token in saved.items():
+                # "chain:address"; files written before multi-chain tracking hold mainnet addresses
+                chain, _, address = key.rpartition(":")
+                chain = chain or DEFAULT_CHAIN
+                if (chain, address) not in self._tokens:
+                    self._tokens[chain, address] = self._entry(chain, address, token.get("symbol"),
+                                                               token.get("name"), token.get("decimals"))
+
+    def save(self):
+        """Write the cache if new tokens were learnt (merging with other processes' entries)"""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            tokens = {f"{chain}:{address}": {"symbol": t["symbol"], "name": t["name"], "decimals": t["decimals"]}
+                      for (chain, address), t in self._tokens.items()
+                      if address not in KNOWN_TOKENS.get(chain, {})}
+            self._dirty = False
+        try:
+            if os.path.exists(self.path):
+                with open(self.path) as f:
+                    tokens = {**json.load(f), **tokens}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(tokens, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"⚠️  Error saving token metadata: {e}")
+
+    def get(self, address: str, chain: str = DEFAULT_CHAIN) -> Optional[Dict]:
+        return self._tokens.get((chain, (address or "").lower()))
+
+    def learn(self, transfer: Dict, chain: str = DEFAULT_CHAIN) -> Dict:
+        """Metadata of a transfer's token, taken from the row the first time a contract is seen on a chain"""
+        address = (transfer.get("contractAddress") or "").lower()
+        token = self._tokens.get((chain, address))
+        if token is not None:
+            return token
+        decimals = transfer.get("tokenDecimal")
+        token = self._entry(
+            chain,
+            address,
+            transfer.get("tokenSymbol"),
+            transfer.get("tokenName"),
+            int(decimals) if str(decimals or "").isdigit() else None
+        )
+        with self._lock:
+            token = self._tokens.setdefault((chain, address), token)
+            self._dirty = True
+        if token["spam"]:
+            logger.info(f"🚫 Spam token {token['symbol']} ({address[:10]}... on {chain}): {token['spam']}",
+                        extra={"stage": "diff", "token": address, "chain": chain})
+        return token
+
+    def allows(self, token: Dict, transfer: Dict) -> bool:
+        """Whether a transfer should raise an alert under TOKEN_FILTER"""
+        if self.token_filter == "off":
+            return True
+        if self.token_filter == "verified":
+            return token["verified"]
+        # Zero-value transfers from look-alike addresses are address poisoning
+        return not token["spam"] and str(transfer.get("value", "0")).strip("0") != ""
+
+
+TOKENS = TokenMetadataCache()
+
+
+def configure_token_cache(path: str = None, verified: Iterable[str] = (), token_filter: str = "spam") -> TokenMetadataCache:
+    """Point the shared cache at its file (saved after each cycle and at exit)"""
+    TOKENS.configure(path, verified, token_filter)
+    return TOKENS
+
+
+@atexit.register
+def _save_at_exit():
+    TOKENS.save()
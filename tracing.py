@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Tracing
+Lightweight spans around the stages of a check cycle and bot commands,
+exported as OpenTelemetry-style JSON lines to a local file
+"""
+
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STATUS_UNSET = "STATUS_CODE_UNSET"
+STATUS_ERROR = "STATUS_CODE_ERROR"
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanContext:
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+
+class Span:
+    def __init__(self, tracer: "Tracer", name: str, context: SpanContext, parent_id: str = None,
+                 attributes: Dict[str, Any] = None, start_time: float = None):
+        self.tracer = tracer
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_time = start_time if start_time is not None else time.time()
+        self.end_time = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_time: float = None):
+        self.end_time = end_time if end_time is not None else time.time()
+        if self.context.sampled:
+            self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """OTLP/JSON span representation"""
+        span = {
+            "traceId": self.context.trace_id,
+            "spanId": self.context.span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(int(self.start_time * 1e9)),
+            "endTimeUnixNano": str(int(self.end_time * 1e9)),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class FileSpanExporter:
+    """Appends one OTLP/JSON resourceSpans document per line"""
+
+    def __init__(self, path: str, service_name: str = "whalewallet"):
+        self.path = path
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        document = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}}
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "whalewallet.tracing"},
+                    "spans": [span.to_dict() for span in spans]
+                }]
+            }]
+        }
+        line = json.dumps(document, separators=(",", ":"))
+        with self._lock:
+            try:
+                with open(self.path, "a") as f:
+                    f.write(line + "\n")
+            except Exception as e:
+                logger.warning(f"⚠️  Error writing trace file: {e}")
+
+
+class Tracer:
+    def __init__(self, exporter: FileSpanExporter = None, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        # Active span of this thread/context; bind() carries it into thread pools
+        self._current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+        # Spans of a trace are exported together when its root span ends
+        self._pending: Dict[str, List[Span]] = {}
+        self._open: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def current_context(self) -> Optional[SpanContext]:
+        """Context of the active span, for continuing a trace elsewhere"""
+        current = self._current.get()
+        return current.context if current is not None else None
+
+    def bind(self, function: Callable) -> Callable:
+        """Wrap a callable for a worker thread so its spans are children of the current span"""
+        parent = self._current.get()
+        if parent is None:
+            return function
+
+        @wraps(function)
+        def run(*args, **kwargs):
+            token = self._current.set(parent)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self._current.reset(token)
+        return run
+
+    def start_span(self, name: str, parent: SpanContext = None, start_time: float = None, **attributes) -> Span:
+        """Start a span under the given (or current) parent; sampling is decided at the root"""
+        if parent is None:
+            parent = self.current_context()
+        if parent is not None:
+            context = SpanContext(parent.trace_id, _new_id(8), parent.sampled)
+            parent_id = parent.span_id
+        else:
+            sampled = self.enabled and random.random() < self.sample_rate
+            context = SpanContext(_new_id(16), _new_id(8), sampled)
+            parent_id = None
+        if context.sampled:
+            with self._lock:
+                self._open[context.trace_id] = self._open.get(context.trace_id, 0) + 1
+        return Span(self, name, context, parent_id, attributes, start_time)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Trace a block as a child of the current span"""
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, **attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            self._current.reset(token)
+            span.end()
+
+    def export(self, span: Span):
+        trace_id = span.context.trace_id
+        with self._lock:
+            self._pending.setdefault(trace_id, []).append(span)
+            self._open[trace_id] -= 1
+            if self._open[trace_id] > 0:
+                return
+            del self._open[trace_id]
+            spans = self._pending.pop(trace_id)
+        self.exporter.export(spans)
+
+
+TRACER = Tracer()
+
+
+def configure_tracing(trace_file: str = None, sample_rate: float = 1.0) -> Tracer:
+    """Enable span export to a JSONL file (an empty path keeps tracing off)"""
+    TRACER.exporter = FileSpanExporter(trace_file) if trace_file else None
+    TRACER.sample_rate = max(0.0, min(1.0, sample_rate))
+    if trace_file:
+        logger.info(f"🔎 Tracing {TRACER.sample_rate:.0%} of cycles to {trace_file}")
+    return TRACER
+
+
+def span(name: str, **attributes):
+    """Shortcut for TRACER.span"""
+    return TRACER.span(name, **attributes)
+
+
+def bind(function: Callable) -> Callable:
+    """Shortcut for TRACER.bind"""
+    return TRACER.bind(function)
@@ -1,18 +1,73 @@
+import logging
 import json
 from datetime import datetime
 import os
 
-def load_config(config_path: str = "config.py") -> dict:
-    """Load configuration from file"""
+logger = logging.getLogger(__name__)
+
+def load_config(config_path: str = "config.py", validate: bool = False, require_telegram: bool = True) -> dict:
+    """Load configuration from file (validate raises ValueError for missing settings)"""
     import config
+    config.load_settings()
+    if validate:
+        config.validate_config(require_telegram=require_telegram)
     return {
         "wallets": config.WALLETS,  # Multi-wallet support
         "wallet_address": config.WALLET_ADDRESS,  # Legacy support
         "etherscan_api_key": config.ETHERSCAN_API_KEY,
+        "etherscan_api_url": config.ETHERSCAN_API_URL,
+        "chains": config.CHAINS,
+        "wallet_chains": config.WALLET_CHAINS,
+        "chain_concurrency": config.CHAIN_CONCURRENCY,
+        "etherscan_rate": config.ETHERSCAN_RATE,
+        "chain_workers": config.CHAIN_WORKERS,
+        "hyperliquid_api_url": config.HYPERLIQUID_API_URL,
         "check_interval": config.CHECK_INTERVAL,
         "notification_settings": config.NOTIFICATION_SETTINGS,
         "balance_change_threshold": config.BALANCE_CHANGE_THRESHOLD,
-        "position_change_threshold": config.POSITION_CHANGE_THRESHOLD
+        "balance_change_usd": config.BALANCE_CHANGE_USD,
+        "position_change_threshold": config.POSITION_CHANGE_THRESHOLD,
+        "position_change_pct": config.POSITION_CHANGE_PCT,
+        "transfer_min_usd": config.TRANSFER_MIN_USD,
+        "alert_rules": config.ALERT_RULES,
+        "alert_rules_file": config.ALERT_RULES_FILE,
+        "price_cache_ttl": config.PRICE_CACHE_TTL,
+        "price_overrides": config.PRICE_OVERRIDES,
+        "critical_margin_usage": config.CRITICAL_MARGIN_USAGE,
+        "large_withdrawal_eth": config.LARGE_WITHDRAWAL_ETH,
+        "history_db": config.HISTORY_DB,
+        "history_retention_days": config.HISTORY_RETENTION_DAYS,
+        "fills_lookback_days": config.FILLS_LOOKBACK_DAYS,
+        "liquidation_warning_pct": config.LIQUIDATION_WARNING_PCT,
+        "liquidation_danger_pct": config.LIQUIDATION_DANGER_PCT,
+        "liquidation_critical_pct": config.LIQUIDATION_CRITICAL_PCT,
+        "risk_recheck_interval": config.RISK_RECHECK_INTERVAL,
+        "metrics_port": config.METRICS_PORT,
+        "metrics_host": config.METRICS_HOST,
+        "trace_file": config.TRACE_FILE,
+        "trace_sample_rate": config.TRACE_SAMPLE_RATE,
+        "log_level": config.LOG_LEVEL,
+        "log_format": config.LOG_FORMAT,
+        "log_sample_rate": config.LOG_SAMPLE_RATE,
+        "startup_workers": config.STARTUP_WORKERS,
+        "summary_cache_ttl": config.SUMMARY_CACHE_TTL,
+        "shard_count": config.SHARD_COUNT,
+        "shard_role": config.SHARD_ROLE,
+        "shard_index": config.SHARD_INDEX,
+        "shard_hub_address": config.SHARD_HUB_ADDRESS,
+        "shard_hub_authkey": config.SHARD_HUB_AUTHKEY,
+        "etherscan_api_keys": config.ETHERSCAN_API_KEYS,
+        "token_cache_file": config.TOKEN_CACHE_FILE,
+        "token_filter": config.TOKEN_FILTER,
+        "verified_tokens": config.VERIFIED_TOKENS,
+        "eth_rpc_url": config.ETH_RPC_URL,
+        "token_balance_change_usd": config.TOKEN_BALANCE_CHANGE_USD,
+        "token_balance_change_pct": config.TOKEN_BALANCE_CHANGE_PCT,
+        "token_balance_batch_size": config.TOKEN_BALANCE_BATCH_SIZE,
+        "token_balance_workers": config.TOKEN_BALANCE_WORKERS,
+        "leader_lease": config.LEADER_LEASE,
+        "leader_lease_path": config.LEADER_LEASE_PATH,
+        "leader_lease_ttl": config.LEADER_LEASE_TTL
     }
 
 def save_transaction_log(tx_data: dict, log_file: str = "/app/logs/transactions.log"):
@@ -26,7 +81,7 @@ def save_transaction_log(tx_data: dict, log_file: str = "/app/logs/transactions.
         with open(log_file, "a") as f:
             f.write(f"{datetime.now().isoformat()}: {json.dumps(tx_data)}\n")
     except Exception as e:
-        print(f"Error saving transaction log: {e}")
+        logger.warning(f"Error saving transaction log: {e}")
 
 def format_wei_to_ether(wei_amount: int) -> float:
     """Convert Wei to Ether"""
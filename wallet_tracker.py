@@ -1,229 +1,526 @@
+import logging
 import requests
 import json
 from datetime import datetime
+import threading
 import time
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from metrics import UPSTREAM_LATENCY, UPSTREAM_ERRORS
+from tracing import bind, span
+from json_stream import load_object, loads
+from token_metadata import TOKENS
+from price_service import PRICES, PriceService
+from chains import DEFAULT_CHAIN, RequestQuota, chain_info
+from alert_rules import RULES, AlertRules, strongest
+from message_templates import position_metrics
+
+logger = logging.getLogger(__name__)
+
+# Sections get_summary() can fetch; each is one upstream request
+SUMMARY_SECTIONS = ("balance", "positions", "transactions", "token_transfers")
+
+# Most rows Hyperliquid returns per userFillsByTime / userFunding request
+FILLS_PAGE_SIZE = 2000
+FUNDING_PAGE_SIZE = 500
 
 class WalletTracker:
-    def __init__(self, wallet_address: str, etherscan_api_key: str):
+    def __init__(self, wallet_address: str, etherscan_api_key: str,
+                 base_url: str = "https://api.etherscan.io/v2/api",
+                 hyperliquid_url: str = "https://api.hyperliquid.xyz/info",
+                 cache_ttl: float = 60, wallet_name: str = "", rules: AlertRules = RULES,
+                 transfer_lookback: float = 600,
+                 prices: PriceService = PRICES, chain: str = DEFAULT_CHAIN, track_positions: bool = True,
+                 session: requests.Session = None, quota: RequestQuota = None):
         self.wallet_address = wallet_address
+        self.wallet_name = wallet_name
+        # Etherscan V2 chain of balance/transfers; Hyperliquid is only tracked by a wallet's first chain
+        self.chain = chain
+        self.chain_id = chain_info(chain)["chain_id"]
+        self.native_symbol = chain_info(chain)["native"]
+        self.track_positions = track_positions
+        # Connection pool and Etherscan quota shared by the trackers of every wallet and chain
+        self.http = session or requests
+        self.quota = quota
         self.etherscan_api_key = etherscan_api_key
-        self.base_url = "https://api.etherscan.io/api"
-        self.hyperliquid_url = "https://api.hyperliquid.xyz/info"
+        self.base_url = base_url
+        self.hyperliquid_url = hyperliquid_url
         self.last_known_balance = None
         self.last_known_positions = None
+        # Latest successful response per summary section: section -> (fetched_at, value)
+        self.cache_ttl = cache_ttl
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        self._cache_lock = threading.Lock()
+        # Alert rules decide which changes alert; USD values come from the shared price feed
+        self.rules = rules
+        self.prices = prices
+        # Newest transfer time seen per list (txlist/tokentx) and the rows seen at that
+        # second; the first check reports transfers of the last transfer_lookback seconds
+        self.transfer_lookback = transfer_lookback
+        self._transfer_cursors: Dict[str, Tuple[int, set]] = {}
+        # ERC-20 contracts seen in this wallet's transfers -> last raw balance read
+        self.tokens_held: Dict[str, None] = {}
+        self.last_token_balances: Dict[str, int] = {}
+    
+    def _remember(self, section: str, value: Any):
+        with self._cache_lock:
+            self._cache[section] = (time.time(), value)
+    
+    def _cached(self, section: str, max_age: float) -> Tuple[bool, Any]:
+        with self._cache_lock:
+            entry = self._cache.get(section)
+        if entry and time.time() - entry[0] <= max_age:
+            return True, entry[1]
+        return False, None
+    
+    def _etherscan_get(self, params: Dict[str, Any], limit: int = None) -> Dict:
+        """
+        GET an Etherscan endpoint, recording latency and errors. With a limit,
+        list endpoints return only the first page of that many rows, and the
+        body is parsed as a stream that stops after them in case the server
+        ignores the page size.
+        """
+        endpoint = params.get("action", "")
+        if self.quota is not None:
+            with self.quota.slot(self.chain):
+                return self._etherscan_request(params, endpoint, limit)
+        return self._etherscan_request(params, endpoint, limit)
+    
+    def _etherscan_request(self, params: Dict[str, Any], endpoint: str, limit: int = None) -> Dict:
+        started = time.perf_counter()
+        try:
+            with span(f"etherscan.{endpoint}", address=self.wallet_address, chain=self.chain):
+                params = {**params, "chainid": self.chain_id, "apikey": self.etherscan_api_key}
+                if limit is None:
+                    response = self.http.get(self.base_url, params=params)
+                    return loads(response.content)
+                params.update({"page": 1, "offset": limit})
+                with self.http.get(self.base_url, params=params, stream=True) as response:
+                    return load_object(response.iter_content(chunk_size=65536), "result", limit)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(upstream="etherscan", endpoint=endpoint, error=type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_LATENCY.observe(elapsed, upstream="etherscan", endpoint=endpoint)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"etherscan {endpoint} for {self.wallet_address} on {self.chain}",
+                    extra={"wallet": self.wallet_address, "stage": "fetch", "upstream": "etherscan",
+                           "endpoint": endpoint, "chain": self.chain, "latency_ms": round(elapsed * 1000, 1)}
+                )
+    
+    def _hyperliquid_post(self, payload: Dict[str, Any]) -> Any:
+        """POST a Hyperliquid info request, recording latency and errors"""
+        endpoint = payload.get("type", "")
+        started = time.perf_counter()
+        try:
+            with span(f"hyperliquid.{endpoint}", address=self.wallet_address):
+                response = self.http.post(self.hyperliquid_url, json=payload)
+                return loads(response.content)
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(upstream="hyperliquid", endpoint=endpoint, error=type(e).__name__)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_LATENCY.observe(elapsed, upstream="hyperliquid", endpoint=endpoint)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"hyperliquid {endpoint} for {self.wallet_address}",
+                    extra={"wallet": self.wallet_address, "stage": "fetch", "upstream": "hyperliquid",
+                           "endpoint": endpoint, "latency_ms": round(elapsed * 1000, 1)}
+                )
+        
+    def _log_error(self, action: str, error: Exception, stage: str = "fetch"):
+        logger.warning(
+            f"⚠️  Error {action} for {self.wallet_address}: {error}",
+            extra={"wallet": self.wallet_address, "stage": stage, "error": type(error).__name__}
+        )
         
     def get_eth_balance(self) -> Optional[float]:
-        """Get current ETH balance"""
+        """Get current native balance (ETH, or the chain's native asset)"""
         try:
-            params = {
+            data = self._etherscan_get({
                 "module": "account",
                 "action": "balance",
                 "address": self.wallet_address,
-                "tag": "latest",
-                "apikey": self.etherscan_api_key
-            }
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
+                "tag": "latest"
+            })
             if data["status"] == "1":
-                return float(data["result"]) / 10**18  # Convert from Wei to ETH
+                balance = float(data["result"]) / 10**18  # Convert from Wei (all tracked chains use 18 decimals)
+                self._remember("balance", balance)
+                return balance
             return None
         except Exception as e:
-            print(f"Error getting ETH balance: {e}")
+            self._log_error("getting ETH balance", e)
             return None
     
     def get_token_transfers(self, limit: int = 10) -> List[Dict]:
         """Get recent token transfers"""
         try:
-            params = {
+            data = self._etherscan_get({
                 "module": "account",
                 "action": "tokentx",
                 "address": self.wallet_address,
-                "sort": "desc",
-                "apikey": self.etherscan_api_key
-            }
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
+                "sort": "desc"
+            }, limit=limit)
             if data["status"] == "1":
-                return data["result"][:limit]
+                self._remember("token_transfers", data["result"])
+                return data["result"]
             return []
         except Exception as e:
-            print(f"Error getting token transfers: {e}")
+            self._log_error("getting token transfers", e)
             return []
     
     def get_normal_transactions(self, limit: int = 10) -> List[Dict]:
         """Get recent normal transactions"""
         try:
-            params = {
+            data = self._etherscan_get({
                 "module": "account",
                 "action": "txlist",
                 "address": self.wallet_address,
-                "sort": "desc",
-                "apikey": self.etherscan_api_key
-            }
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
+                "sort": "desc"
+            }, limit=limit)
             if data["status"] == "1":
-                return data["result"][:limit]
+                self._remember("transactions", data["result"])
+                return data["result"]
             return []
         except Exception as e:
-            print(f"Error getting transactions: {e}")
+            self._log_error("getting transactions", e)
             return []
     
-    def check_deposit_withdrawal(self) -> Tuple[bool, List[Dict]]:
-        """Check for new deposit or withdrawal transactions (ETH and tokens)"""
+    def check_deposit_withdrawal(self) -> Tuple[Optional[str], List[Dict]]:
+        """
+        Check for deposits/withdrawals (ETH and tokens) since the last check.
+        Returns the alert decision ("alert"/"critical", None = nothing to
+        report) and the transfers the alert rules let through
+        """
         try:
             # Get recent transactions and token transfers
             recent_eth_txs = self.get_normal_transactions(5)
             recent_token_txs = self.get_token_transfers(10)
             
             all_transfers = []
-            current_time = int(time.time())
             
             # Check ETH transfers
-            for tx in recent_eth_txs:
+            for tx in self._since_last_check("txlist", recent_eth_txs):
                 # Check if it's a simple ETH transfer (not contract interaction)
                 if (tx.get("to") == self.wallet_address.lower() or 
                     tx.get("from") == self.wallet_address.lower()) and \
                    tx.get("isError", "0") == "0" and \
                    float(tx.get("value", 0)) > 0:  # Has ETH value
-                    
-                    tx_time = int(tx.get("timeStamp", 0))
-                    
-                    # Check if transaction is within last check interval (10 minutes)
-                    if current_time - tx_time <= 600:  # 600 seconds = 10 minutes
-                        tx["asset"] = "ETH"
+                    tx["asset"] = self.native_symbol
+                    if self._evaluate_transfer(tx, float(tx.get("value", 0)) / 10**18):
                         all_transfers.append(tx)
             
             # Check token transfers (including BTC and other ERC-20 tokens)
+            new_token_txs = {id(tx) for tx in self._since_last_check("tokentx", recent_token_txs)}
             for tx in recent_token_txs:
-                tx_time = int(tx.get("timeStamp", 0))
+                # Symbol and decimals come from the contract's cached metadata, not the row
+                token = TOKENS.learn(tx, self.chain)
+                if not TOKENS.allows(token, tx):
+                    continue
+                # Tokens the wallet has touched get their balance tracked (ETH_RPC_URL)
+                self.tokens_held.setdefault(token["address"])
                 
-                # Check if transaction is within last check interval (10 minutes)
-                if current_time - tx_time <= 600:  # 600 seconds = 10 minutes
-                    tx["asset"] = tx.get("tokenSymbol", "Unknown")
-                    all_transfers.append(tx)
+                if id(tx) in new_token_txs:
+                    tx["asset"] = token["symbol"]
+                    tx["tokenDecimal"] = token["decimals"]
+                    tx["verified"] = token["verified"]
+                    decimals = 18 if token["decimals"] is None else token["decimals"]
+                    if self._evaluate_transfer(tx, float(tx.get("value", 0)) / 10**decimals):
+                        all_transfers.append(tx)
             
-            if all_transfers:
-                return True, all_transfers
-            return False, []
+            return strongest(tx["alert"] for tx in all_transfers), all_transfers
             
         except Exception as e:
-            print(f"Error checking deposits/withdrawals: {e}")
-            return False, []
+            self._log_error("checking deposits/withdrawals", e, stage="diff")
+            return None, []
+    
+    @staticmethod
+    def _transfer_key(tx: Dict) -> tuple:
+        # One transaction can hold several token transfers
+        return (tx.get("hash"), tx.get("contractAddress"), tx.get("from"), tx.get("to"), tx.get("value"))
+    
+    def _since_last_check(self, kind: str, transactions: List[Dict]) -> List[Dict]:
+        """
+        Rows not reported yet of this list, advancing its cursor. Rows of the
+        cursor's second are checked against the ones already seen, so a row
+        Etherscan indexes after others of the same block is still reported
+        """
+        cursor, seen = self._transfer_cursors.get(kind) or (int(time.time() - self.transfer_lookback), set())
+        newer = []
+        for tx in transactions:
+            timestamp = int(tx.get("timeStamp", 0))
+            if timestamp > cursor or (timestamp == cursor and self._transfer_key(tx) not in seen):
+                newer.append(tx)
+        latest = max([cursor] + [int(tx.get("timeStamp", 0)) for tx in newer])
+        if latest != cursor:
+            seen = set()
+        seen.update(self._transfer_key(tx) for tx in newer if int(tx.get("timeStamp", 0)) == latest)
+        self._transfer_cursors[kind] = (latest, seen)
+        return newer
+    
+    def _evaluate_transfer(self, tx: Dict, amount: float) -> Optional[str]:
+        """Set a transfer's usd_value and the alert rules' decision on it"""
+        tx["usd_value"] = self.prices.usd_value(tx["asset"], amount)
+        outgoing = tx.get("from", "").lower() == self.wallet_address.lower()
+        tx["alert"] = self.rules.evaluate({
+            "event": "transfer",
+            "wallet": self.wallet_name,
+            "chain": self.chain,
+            "asset": str(tx["asset"]).upper(),
+            "direction": "out" if outgoing else "in",
+            "counterparty": ((tx.get("to") if outgoing else tx.get("from")) or "").lower(),
+            "amount": amount,
+            "usd": tx["usd_value"]
+        })
+        return tx["alert"]
+    
+    def check_token_balances(self, balances: Dict[str, int]) -> List[Dict]:
+        """
+        Diff raw ERC-20 balances (contract -> amount, read in bulk by the
+        monitor) against the last read. Returns the changes the alert rules
+        let through (token_balance rules, by default TOKEN_BALANCE_CHANGE_USD
+        or TOKEN_BALANCE_CHANGE_PCT for unpriced tokens)
+        """
+        changes = []
+        for contract, raw in balances.items():
+            previous = self.last_token_balances.get(contract)
+            self.last_token_balances[contract] = raw
+            if previous is None or raw == previous:
+                continue
+            token = TOKENS.get(contract, self.chain) or {"symbol": "Unknown", "decimals": None, "verified": False}
+            scale = 10 ** (18 if token["decimals"] is None else token["decimals"])
+            change = (raw - previous) / scale
+            usd_value = self.prices.usd_value(token["symbol"], change)
+            decision = self.rules.evaluate({
+                "event": "token_balance",
+                "wallet": self.wallet_name,
+                "chain": self.chain,
+                "asset": str(token["symbol"]).upper(),
+                "direction": "up" if change > 0 else "down",
+                "amount": abs(change),
+                "pct": abs(raw - previous) / previous * 100 if previous else float("inf"),
+                "usd": usd_value
+            })
+            if decision:
+                changes.append({
+                    "contract": contract,
+                    "symbol": token["symbol"],
+                    "verified": token["verified"],
+                    "old_balance": previous / scale,
+                    "new_balance": raw / scale,
+                    "change": change,
+                    "usd_value": usd_value,
+                    "alert": decision
+                })
+        return changes
     
     def get_hyperliquid_positions(self) -> Optional[Dict]:
         """Get Hyperliquid perpetual positions"""
         try:
-            payload = {
+            data = self._hyperliquid_post({
                 "type": "clearinghouseState",
                 "user": self.wallet_address
-            }
-            response = requests.post(self.hyperliquid_url, json=payload)
-            data = response.json()
+            })
             if data and "marginSummary" in data:
+                self._remember("positions", data)
                 return data
             return None
         except Exception as e:
-            print(f"Error getting Hyperliquid positions: {e}")
+            self._log_error("getting Hyperliquid positions", e)
             return None
     
-    def check_balance_change(self) -> Tuple[bool, float, float]:
-        """Check if balance has changed significantly"""
+    def _get_paged(self, request_type: str, start_ms: int, page_size: int) -> List[Dict]:
+        """
+        Rows of a time-ordered Hyperliquid endpoint from start_ms on. Each page
+        starts at the last row's time, so rows sharing that millisecond are
+        returned again; callers dedupe them by id
+        """
+        rows = []
+        while True:
+            page = self._hyperliquid_post({"type": request_type, "user": self.wallet_address, "startTime": start_ms})
+            if not isinstance(page, list):
+                break
+            rows.extend(page)
+            last = max((row.get("time", 0) for row in page), default=start_ms)
+            if len(page) < page_size or last <= start_ms:
+                break
+            start_ms = last
+        return rows
+    
+    def get_user_fills(self, start_ms: int) -> List[Dict]:
+        """Hyperliquid fills since start_ms (ms), all pages"""
+        return self._get_paged("userFillsByTime", start_ms, FILLS_PAGE_SIZE)
+    
+    def get_user_funding(self, start_ms: int) -> List[Dict]:
+        """Hyperliquid funding payments since start_ms (ms), all pages"""
+        return self._get_paged("userFunding", start_ms, FUNDING_PAGE_SIZE)
+    
+    def check_balance_change(self) -> Tuple[Optional[str], float, float]:
+        """
+        Check if the native balance has changed enough to alert (balance
+        rules; by default BALANCE_CHANGE_USD, or BALANCE_CHANGE_THRESHOLD while
+        unpriced or off). Returns the decision, balance and signed change
+        """
         current_balance = self.get_eth_balance()
         if current_balance is None:
-            return False, 0, 0
+            return None, 0, 0
         
         if self.last_known_balance is None:
             self.last_known_balance = current_balance
-            return False, current_balance, 0
-        
-        change = abs(current_balance - self.last_known_balance)
-        if change > 0.1:  # Significant change threshold
-            significant_change = True
-        else:
-            significant_change = False
+            return None, current_balance, 0
         
+        previous = self.last_known_balance
+        change = current_balance - previous
         self.last_known_balance = current_balance
-        return significant_change, current_balance, change
+        if change == 0:
+            return None, current_balance, 0
+        decision = self.rules.evaluate({
+            "event": "balance",
+            "wallet": self.wallet_name,
+            "chain": self.chain,
+            "asset": self.native_symbol,
+            "direction": "up" if change > 0 else "down",
+            "amount": abs(change),
+            "pct": abs(change) / previous * 100 if previous else float("inf"),
+            "usd": self.prices.usd_value(self.native_symbol, change)
+        })
+        return decision, current_balance, change
     
-    def check_position_changes(self) -> Tuple[bool, Dict, str]:
-        """Check if positions have opened, closed, or significantly changed"""
+    def check_position_changes(self) -> Tuple[Optional[str], Dict, str]:
+        """
+        Check if positions have opened, closed, flipped or changed in size.
+        Each changed coin is put to the position rules; returns the strongest
+        decision, the positions and the change type of the alerting coins
+        """
         current_positions = self.get_hyperliquid_positions()
         if current_positions is None:
-            return False, {}, "position_data_unavailable"
+            return None, {}, "position_data_unavailable"
         
         if self.last_known_positions is None:
             self.last_known_positions = current_positions
-            return False, current_positions, "initial_setup"
-        
-        # Extract current and previous positions
-        current_asset_positions = current_positions.get("assetPositions", [])
-        previous_asset_positions = self.last_known_positions.get("assetPositions", [])
+            return None, current_positions, "initial_setup"
         
-        # Create dictionaries of positions by coin for easier comparison
-        current_pos_dict = {}
-        previous_pos_dict = {}
+        # Positions by coin for easier comparison
+        current_pos_dict = self._positions_by_coin(current_positions)
+        previous_pos_dict = self._positions_by_coin(self.last_known_positions)
+        self.last_known_positions = current_positions
         
-        for pos in current_asset_positions:
-            if "position" in pos and pos["position"]:
-                coin = pos["position"].get("coin", "")
-                size = float(pos["position"].get("szi", 0))
-                current_pos_dict[coin] = size
+        margin_usage = None
+        decisions = {}
+        for coin in set(current_pos_dict) | set(previous_pos_dict):
+            position = current_pos_dict.get(coin) or previous_pos_dict.get(coin)
+            size = float(current_pos_dict[coin]["szi"]) if coin in current_pos_dict else 0.0
+            previous = float(previous_pos_dict[coin]["szi"]) if coin in previous_pos_dict else 0.0
+            if size == previous:
+                continue
+            if previous == 0:
+                direction = "open"
+            elif size == 0:
+                direction = "close"
+            elif (size > 0) != (previous > 0):
+                direction = "flip"
+            else:
+                direction = "increase" if abs(size) > abs(previous) else "decrease"
+            if margin_usage is None:
+                margin_usage = position_metrics(current_positions)["margin_usage"]
+            delta = size - previous
+            decision = self.rules.evaluate({
+                "event": "position",
+                "wallet": self.wallet_name,
+                "asset": coin.upper(),
+                "direction": direction,
+                "side": "long" if (size or previous) > 0 else "short",
+                "amount": abs(delta),
+                "pct": abs(delta) / abs(previous) * 100 if previous else None,
+                "usd": self.prices.usd_value(coin, delta),
+                "leverage": float((position.get("leverage") or {}).get("value") or 0) or None,
+                "margin_usage": margin_usage
+            })
+            if decision:
+                decisions[direction] = strongest((decisions.get(direction), decision))
         
-        for pos in previous_asset_positions:
+        if not decisions:
+            return None, current_positions, "none"
+        # One message covers every coin; its type follows the most telling change
+        if "open" in decisions:
+            change_type = "position_opened"
+        elif "close" in decisions and len(decisions) == 1:
+            change_type = "position_closed"
+        else:
+            change_type = "position_changed"
+        return strongest(decisions.values()), current_positions, change_type
+    
+    @staticmethod
+    def _positions_by_coin(positions: Dict) -> Dict[str, Dict]:
+        result = {}
+        for pos in positions.get("assetPositions", []):
             if "position" in pos and pos["position"]:
-                coin = pos["position"].get("coin", "")
-                size = float(pos["position"].get("szi", 0))
-                previous_pos_dict[coin] = size
-        
-        # Check for position changes
-        changes_detected = False
-        change_type = "none"
-        
-        # Check for new positions opened
-        for coin, size in current_pos_dict.items():
-            if size != 0:
-                if coin not in previous_pos_dict or previous_pos_dict[coin] == 0:
-                    changes_detected = True
-                    change_type = "position_opened"
-                    break
-                # Check for significant size change (more than 5% change)
-                elif abs(size - previous_pos_dict[coin]) / abs(previous_pos_dict[coin]) > 0.05:
-                    changes_detected = True
-                    change_type = "position_changed"
-                    break
-        
-        # Check for positions closed
-        if not changes_detected:
-            for coin, size in previous_pos_dict.items():
-                if size != 0 and (coin not in current_pos_dict or current_pos_dict[coin] == 0):
-                    changes_detected = True
-                    change_type = "position_closed"
-                    break
-        
-        self.last_known_positions = current_positions
-        return changes_detected, current_positions, change_type
+                result[pos["position"].get("coin", "")] = pos["position"]
+        return result
+    
+    def warm_up(self) -> Dict:
+        """Fetch balance and positions once and keep them as the change-detection baseline"""
+        summary = self.get_summary(("balance", "positions") if self.track_positions else ("balance",), max_age=0)
+        if summary["eth_balance"] is not None:
+            self.last_known_balance = summary["eth_balance"]
+        if summary.get("hyperliquid_positions") is not None:
+            self.last_known_positions = summary["hyperliquid_positions"]
+        return summary
     
-    def get_summary(self) -> Dict:
-        """Get comprehensive wallet summary"""
-        balance = self.get_eth_balance()
-        positions = self.get_hyperliquid_positions()
-        recent_txs = self.get_normal_transactions(5)
-        token_txs = self.get_token_transfers(5)
+    def get_summary(self, sections: Iterable[str] = None, max_age: float = None) -> Dict:
+        """
+        Get a wallet summary with only the requested sections (all by default).
+        Sections fetched within max_age seconds (default cache_ttl) are served
+        from cache; the rest are fetched in parallel.
+        """
+        sections = tuple(sections) if sections else SUMMARY_SECTIONS
+        unknown = set(sections) - set(SUMMARY_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown summary section(s): {', '.join(sorted(unknown))}")
+        max_age = self.cache_ttl if max_age is None else max_age
+        
+        fetchers = {
+            "balance": self.get_eth_balance,
+            "positions": self.get_hyperliquid_positions,
+            "transactions": lambda: self.get_normal_transactions(5),
+            "token_transfers": lambda: self.get_token_transfers(5)
+        }
+        values = {}
+        missing = []
+        for section in sections:
+            fresh, value = self._cached(section, max_age)
+            if fresh:
+                values[section] = value[:5] if isinstance(value, list) else value
+            else:
+                missing.append(section)
         
-        # Calculate additional statistics
-        stats = self.calculate_position_stats(positions) if positions else {}
+        if len(missing) == 1:
+            values[missing[0]] = fetchers[missing[0]]()
+        elif missing:
+            with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="summary") as pool:
+                futures = {section: pool.submit(bind(fetchers[section])) for section in missing}
+            for section, future in futures.items():
+                values[section] = future.result()
         
-        return {
+        summary = {
             "wallet_address": self.wallet_address,
-            "eth_balance": balance,
-            "hyperliquid_positions": positions,
-            "position_stats": stats,
-            "recent_transactions": recent_txs,
-            "token_transfers": token_txs,
             "timestamp": datetime.now().isoformat()
         }
+        if "balance" in values:
+            summary["eth_balance"] = values["balance"]
+        if "positions" in values:
+            positions = values["positions"]
+            summary["hyperliquid_positions"] = positions
+            # Calculate additional statistics
+            summary["position_stats"] = self.calculate_position_stats(positions) if positions else {}
+        if "transactions" in values:
+            summary["recent_transactions"] = values["transactions"]
+        if "token_transfers" in values:
+            summary["token_transfers"] = values["token_transfers"]
+        return summary
     
     def calculate_position_stats(self, positions: Dict) -> Dict:
         """Calculate detailed position statistics"""
@@ -282,5 +579,5 @@ class WalletTracker:
                 "short_percentage": (short_value / total_ntl_pos * 100) if total_ntl_pos > 0 else 0
             }
         except Exception as e:
-            print(f"Error calculating position stats: {e}")
+            self._log_error("calculating position stats", e, stage="stats")
             return {}